@@ -0,0 +1,112 @@
+"""
+Compares the columnar value set with the object based one for sources with many values.
+
+For each number of values a value set with two labels is created and written by the
+prometheus writer. The time to build the set, its allocated memory and the write time are recorded.
+
+Usage: python -m benchmarks.bench_columnar [--output result.json]
+"""
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Dict, Callable
+
+from pollect.core.Log import Log
+from pollect.core.ValueSet import ValueSet, Value, ColumnarValueSet
+from pollect.writers.PrometheusWriter import PrometheusWriter
+
+ZONES = 100
+"""
+Number of distinct values of the first label
+"""
+
+
+def build_objects(count: int) -> ValueSet:
+    value_set = ValueSet(['zone', 'type'])
+    value_set.name = 'bench'
+    for idx in range(count):
+        value_set.add(Value(idx, [f'zone{idx % ZONES}', f'type{idx // ZONES}'], 'rrsets'))
+    return value_set
+
+
+def build_columnar(count: int) -> ValueSet:
+    value_set = ColumnarValueSet(['zone', 'type'])
+    value_set.name = 'bench'
+    for idx in range(count):
+        value_set.append(idx, [f'zone{idx % ZONES}', f'type{idx // ZONES}'], 'rrsets')
+    return value_set
+
+
+BUILDERS: Dict[str, Callable[[int], ValueSet]] = {
+    'objects': build_objects,
+    'columnar': build_columnar,
+}
+
+
+def bench(kind: str, count: int, repeat: int) -> Dict[str, any]:
+    """
+    :param kind: Key of BUILDERS
+    :param count: Number of values
+    :param repeat: Number of measured builds and writes
+    :return: Results
+    """
+    build = BUILDERS[kind]
+    writer = PrometheusWriter({})
+    try:
+        # The first write creates the metrics
+        writer.write([build(count)], 'bench')
+
+        build_times = []
+        write_times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value_set = build(count)
+            built = time.perf_counter()
+            writer.write([value_set], 'bench')
+            build_times.append((built - start) * 1000)
+            write_times.append((time.perf_counter() - built) * 1000)
+
+        gc.collect()
+        tracemalloc.start()
+        value_set = build(count)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del value_set
+
+        return {
+            'kind': kind,
+            'values': count,
+            'build_ms': statistics.median(build_times),
+            'write_ms': statistics.median(write_times),
+            'memory_bytes': size,
+        }
+    finally:
+        writer.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', dest='output', help='JSON file the results should be written to')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=5,
+                        help='Number of measured runs per scenario')
+    args = parser.parse_args()
+    Log.set_level('warning')
+
+    results = []
+    for count in [1000, 10000, 100000]:
+        for kind in BUILDERS.keys():
+            item = bench(kind, count, args.repeat)
+            results.append(item)
+            print(f'{kind:>8} {count:>7} values: build {item["build_ms"]:9.3f} ms | '
+                  f'prometheus write {item["write_ms"]:9.3f} ms | {item["memory_bytes"] / 1024:9.0f} KiB')
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Measures the overhead of running a source in a worker process (`isolation: process`).
+
+Usage: python -m benchmarks.bench_isolation [--output result.json]
+"""
+import argparse
+import json
+import pickle
+import time
+from typing import List, Dict
+
+from pollect.core.Core import Configuration
+from pollect.core.Factories import SourceFactory
+from pollect.core.ValueSet import ValueSet, Value
+
+
+def _create_value_sets(value_count: int) -> List[ValueSet]:
+    value_set = ValueSet(labels=['device', 'type'])
+    value_set.name = 'bench'
+    for x in range(value_count):
+        value_set.add(Value(x * 1.5, label_values=[f'device{x % 100}', f'type{x % 7}'], name='value'))
+    return [value_set]
+
+
+def _measure(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_serialization(value_count: int) -> Dict[str, any]:
+    """
+    Compares pickling the value sets directly with pickling their compact serialized form
+    """
+    value_sets = _create_value_sets(value_count)
+    repeat = max(1, 100000 // value_count)
+
+    def plain():
+        pickle.loads(pickle.dumps(value_sets, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def compact():
+        data = pickle.dumps([value_set.serialize() for value_set in value_sets], protocol=pickle.HIGHEST_PROTOCOL)
+        [ValueSet.deserialize(value_set) for value_set in pickle.loads(data)]
+
+    return {
+        'values': value_count,
+        'plain_bytes': len(pickle.dumps(value_sets, protocol=pickle.HIGHEST_PROTOCOL)),
+        'compact_bytes': len(pickle.dumps([value_set.serialize() for value_set in value_sets],
+                                          protocol=pickle.HIGHEST_PROTOCOL)),
+        'plain_ms': _measure(plain, repeat),
+        'compact_ms': _measure(compact, repeat),
+    }
+
+
+def bench_probe(repeat: int = 200) -> Dict[str, any]:
+    """
+    Compares probing a source in the current process with probing it through a worker process
+    """
+    factory = SourceFactory(Configuration({}))
+    local = factory.create({'type': 'Dummy', 'value': 1})
+    isolated = factory.create({'type': 'Dummy', 'value': 1}, 'process')
+    try:
+        # Warm up
+        isolated.probe()
+        return {
+            'local_ms': _measure(local.probe, repeat),
+            'process_ms': _measure(isolated.probe, repeat),
+        }
+    finally:
+        isolated.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', dest='output', help='JSON file the results should be written to')
+    args = parser.parse_args()
+
+    results = {
+        'serialization': [bench_serialization(count) for count in [10, 1000, 100000]],
+        'probe': bench_probe(),
+    }
+    for item in results['serialization']:
+        print(f'{item["values"]:>7} values: pickle {item["plain_bytes"]:>9} bytes {item["plain_ms"]:8.3f} ms | '
+              f'compact {item["compact_bytes"]:>9} bytes {item["compact_ms"]:8.3f} ms')
+    print(f'Probe round trip: local {results["probe"]["local_ms"]:.3f} ms, '
+          f'process {results["probe"]["process_ms"]:.3f} ms')
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
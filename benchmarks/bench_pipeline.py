@@ -0,0 +1,230 @@
+"""
+Measures the core pipeline (probe, merge and write) of a single executor with dummy sources.
+
+Sweeps the number of sources, the number of values per source, the number of labels per value
+and the writer (non-partial, partial and prometheus). For each scenario the tick latency,
+the allocated memory of a tick and the RSS of the process are recorded.
+
+Usage: python -m benchmarks.bench_pipeline [--quick] [--output result.json]
+                                           [--compare baseline.json [--threshold 1.2]]
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import List, Dict
+
+from pollect.core.Core import Configuration, Executor
+from pollect.core.Factories import SourceFactory
+from pollect.core.Log import Log
+
+WRITERS = {
+    'in_memory': 'InMemory',
+    'parallel_in_memory': 'ParallelInMemory',
+    'prometheus': 'Prometheus',
+}
+"""
+Writers which are benchmarked, mapped by their name in the results
+"""
+
+
+def _get_rss() -> int:
+    """
+    Returns the current resident set size in bytes
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Not linux, fall back to the peak RSS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _create_executor(sources: int, values: int, labels: int, writer: str) -> Executor:
+    config = Configuration({
+        'tickTime': 60,
+        'writer': {'type': writer, 'port': 0},
+        'executors': [{
+            'collection': 'bench',
+            'threads': 4,
+            'sources': [{'type': 'Dummy', 'name': f's{idx}', 'value': 1, 'count': values, 'labelCount': labels}
+                        for idx in range(sources)]
+        }]
+    })
+    return config.create_executors()[0]
+
+
+def _tick(executor: Executor):
+    executor.execute()
+    # Partial writes are done in the worker pool, wait until they are complete
+    for future in executor._running.values():
+        future.result()
+    for writer in executor.writers:
+        if hasattr(writer, 'data'):
+            # The in memory writers keep all ticks
+            writer.data.clear()
+
+
+def bench_scenario(sources: int, values: int, labels: int, writer: str, ticks: int) -> Dict[str, any]:
+    """
+    Executes the given scenario
+
+    :param sources: Number of sources
+    :param values: Number of values each source returns
+    :param labels: Number of labels of each value
+    :param writer: Name of the writer (key of WRITERS)
+    :param ticks: Number of measured ticks
+    :return: Results
+    """
+    executor = _create_executor(sources, values, max(labels, 1 if values > 1 else 0), WRITERS[writer])
+    try:
+        # The first tick creates all metrics in the writer
+        _tick(executor)
+
+        durations = []
+        for _ in range(ticks):
+            start = time.perf_counter()
+            _tick(executor)
+            durations.append((time.perf_counter() - start) * 1000)
+
+        gc.collect()
+        tracemalloc.start()
+        _tick(executor)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'sources': sources,
+            'values': values,
+            'labels': labels,
+            'writer': writer,
+            'tick_ms': statistics.median(durations),
+            'tick_min_ms': min(durations),
+            'tick_max_ms': max(durations),
+            'alloc_peak_bytes': peak,
+            'rss_bytes': _get_rss(),
+        }
+    finally:
+        for writer_obj in executor.writers:
+            if hasattr(writer_obj, 'clear'):
+                # Unregister the prometheus metrics
+                writer_obj.clear()
+        executor.shutdown()
+
+
+def bench_components(values: int, repeat: int) -> Dict[str, any]:
+    """
+    Measures Source.probe, Executor._merge and PrometheusWriter.write on their own
+    """
+    executor = _create_executor(0, values, 1 if values > 1 else 0, 'Prometheus')
+    source = SourceFactory(executor.global_config).create({'type': 'Dummy', 'value': 1, 'count': values})
+    writer = executor.writers[0]
+    try:
+        timings = {'probe': 0, 'merge': 0, 'prometheus_write': 0}
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value_sets = source.probe()
+            merged = []
+            probed = time.perf_counter()
+            executor._merge(value_sets, merged)
+            done = time.perf_counter()
+            writer.write(merged, source)
+            written = time.perf_counter()
+            timings['probe'] += probed - start
+            timings['merge'] += done - probed
+            timings['prometheus_write'] += written - done
+
+        results = {'values': values}
+        results.update((f'{name}_ms', total / repeat * 1000) for name, total in timings.items())
+        return results
+    finally:
+        writer.clear()
+        executor.shutdown()
+
+
+def get_scenarios(quick: bool) -> List[Dict[str, any]]:
+    source_counts = [10, 100, 1000] if quick else [10, 100, 1000, 10000]
+    value_counts = [1, 100, 10000] if quick else [1, 100, 10000, 100000]
+    label_counts = [1, 4, 16]
+
+    scenarios = []
+    for writer in WRITERS.keys():
+        scenarios.extend({'sources': count, 'values': 1, 'labels': 0, 'writer': writer} for count in source_counts)
+        scenarios.extend({'sources': 1, 'values': count, 'labels': 1, 'writer': writer}
+                         for count in value_counts if count > 1)
+        scenarios.extend({'sources': 10, 'values': 1000, 'labels': count, 'writer': writer} for count in label_counts)
+    return scenarios
+
+
+def compare(results: Dict[str, any], baseline_file: str, threshold: float) -> List[str]:
+    """
+    Compares the tick latency of all scenarios with a previous result
+
+    :return: Description of each scenario which is slower than the baseline by more than the threshold
+    """
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+
+    def key(item: Dict[str, any]):
+        return item['sources'], item['values'], item['labels'], item['writer']
+
+    previous = dict((key(item), item) for item in baseline['scenarios'])
+    regressions = []
+    for item in results['scenarios']:
+        old = previous.get(key(item))
+        if old is None or old['tick_ms'] <= 0:
+            continue
+        ratio = item['tick_ms'] / old['tick_ms']
+        if ratio > threshold:
+            regressions.append(f'{key(item)}: {old["tick_ms"]:.3f} ms -> {item["tick_ms"]:.3f} ms ({ratio:.2f}x)')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', dest='output', help='JSON file the results should be written to')
+    parser.add_argument('--quick', dest='quick', action='store_true',
+                        help='Skips the largest scenarios')
+    parser.add_argument('--ticks', dest='ticks', type=int, default=5,
+                        help='Number of measured ticks per scenario')
+    parser.add_argument('--compare', dest='compare',
+                        help='JSON file of a previous run, exits with an error if any scenario got slower')
+    parser.add_argument('--threshold', dest='threshold', type=float, default=1.2,
+                        help='Max. allowed ratio between the current and the previous tick latency')
+    args = parser.parse_args()
+    Log.set_level('warning')
+
+    results = {'scenarios': [], 'components': []}
+    for scenario in get_scenarios(args.quick):
+        item = bench_scenario(ticks=args.ticks, **scenario)
+        results['scenarios'].append(item)
+        print(f'{item["writer"]:>18} {item["sources"]:>6} sources {item["values"]:>7} values {item["labels"]:>3} labels: '
+              f'{item["tick_ms"]:10.3f} ms/tick {item["alloc_peak_bytes"] / 1024:10.0f} KiB alloc '
+              f'{item["rss_bytes"] / 1024 / 1024:8.1f} MiB rss')
+
+    for values in [1, 100, 10000]:
+        item = bench_components(values, repeat=max(1, 10000 // values))
+        results['components'].append(item)
+        print(f'{values:>7} values: probe {item["probe_ms"]:8.3f} ms | merge {item["merge_ms"]:8.3f} ms | '
+              f'prometheus write {item["prometheus_write_ms"]:8.3f} ms')
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        regressions = compare(results, args.compare, args.threshold)
+        for regression in regressions:
+            print(f'Regression {regression}')
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
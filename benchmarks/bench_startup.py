@@ -0,0 +1,71 @@
+"""
+Measures the startup time and memory of pollect for a small configuration.
+
+Each measurement runs in a fresh interpreter. `lazy` only imports the modules of the configured
+sources and writers, `eager` additionally imports all modules like the factories did before the plugin index.
+
+Usage: python -m benchmarks.bench_startup [--repeat 5] [--output result.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+_CHILD = '''
+import json, resource, sys, time
+start = time.perf_counter()
+from pollect.core.Core import Configuration
+from pollect.core.Factories import SourceFactory, WriterFactory
+config = Configuration({
+    'writer': {'type': 'InMemory'},
+    'executors': [{'collection': 'bench', 'sources': [{'type': 'Dummy', 'value': 1}, {'type': 'LoadAvg'}]}],
+})
+executors = config.create_executors()
+if sys.argv[1] == 'eager':
+    for factory in [SourceFactory(config)._object_factory, WriterFactory()._object_factory]:
+        factory._get_modules(factory._files)
+duration = time.perf_counter() - start
+for executor in executors:
+    executor.shutdown()
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'startup_ms': duration * 1000,
+    'max_rss_bytes': max_rss if sys.platform == 'darwin' else max_rss * 1024,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def bench_mode(mode: str, repeat: int) -> Dict[str, any]:
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _CHILD, mode], check=True, capture_output=True, text=True)
+        runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return {
+        'mode': mode,
+        'startup_ms': statistics.median(run['startup_ms'] for run in runs),
+        'max_rss_bytes': statistics.median(run['max_rss_bytes'] for run in runs),
+        'modules': runs[-1]['modules'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', dest='output', help='JSON file the results should be written to')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=5, help='Number of runs per mode')
+    args = parser.parse_args()
+
+    results = [bench_mode(mode, args.repeat) for mode in ['lazy', 'eager']]
+    for item in results:
+        print(f'{item["mode"]:>5}: {item["startup_ms"]:8.1f} ms {item["max_rss_bytes"] / 1024 / 1024:6.1f} MiB '
+              f'{item["modules"]:>5} modules')
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({'startup': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
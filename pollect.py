@@ -1,9 +1,12 @@
 def debug_signal_handler(signal, frame):
     import pdb
     pdb.set_trace()
-import signal
-signal.signal(signal.SIGINT, debug_signal_handler)
 
-import pollect.Pollect
-pollect.Pollect.main()
 
+if __name__ == '__main__':
+    # Guarded since worker processes import the main module
+    import signal
+    signal.signal(signal.SIGINT, debug_signal_handler)
+
+    import pollect.Pollect
+    pollect.Pollect.main()
@@ -1,30 +1,39 @@
 import argparse
 import json
+import os
 import signal
 import sys
 from typing import Dict
 
 import yaml
 
+from pollect.core.ConfigWatcher import ConfigWatcher
 from pollect.core.Core import Configuration
 from pollect.core.ExecutionScheduler import ExecutionScheduler
 from pollect.core.Log import Log
+from pollect.core.Profiler import Profiler
+from pollect.core.Supervisor import Supervisor
 from pollect.libs.DependencyResolver import DependencyResolver
 
 
+def get_config_path(config: str) -> str:
+    """
+    Returns the path of the configuration file, resolving a missing file extension
+    """
+    if config.endswith('.json') or config.endswith('.yml'):
+        return config
+    # File has an unknown or no extension, try all supported formats
+    if os.path.isfile(config + '.yml'):
+        return config + '.yml'
+    return config + '.json'
+
+
 def load_config(config: str) -> Dict[str, any]:
-    if config.endswith('.json'):
-        with open(config, 'r') as f:
+    path = get_config_path(config)
+    with open(path, 'r') as f:
+        if path.endswith('.json'):
             return json.load(f)
-    if config.endswith('.yml'):
-        with open(config, 'r') as f:
-            return yaml.safe_load(f)
-
-    # File has an unknown or no extension, try all supported formats
-    try:
-        return load_config(config + '.yml')
-    except FileNotFoundError:
-        return load_config(config + '.json')
+        return yaml.safe_load(f)
 
 
 def main():
@@ -43,6 +52,20 @@ def main():
                         help='Prints all required dependencies for the given configuration in a requirements.txt format')
     parser.add_argument('-r', '--dry-run', dest='dry_run', action='store_true',
                         help='Prints the probed data to stdout instead of sending it to the writer')
+    parser.add_argument('-w', '--workers', dest='workers', type=int, default=1,
+                        help='Number of worker processes the executors are distributed across. '
+                             'The writers are always run in the main process')
+    parser.add_argument('--profile', dest='profile', action='store_true',
+                        help='Samples the stacks of all threads and writes them as collapsed stacks for flame graphs')
+    parser.add_argument('--profile-dir', dest='profile_dir', default='profile',
+                        help='Directory the profiles are written to')
+    parser.add_argument('--profile-interval', dest='profile_interval', type=float, default=60,
+                        help='Time in seconds covered by each profile file')
+    parser.add_argument('--profile-rate', dest='profile_rate', type=float, default=100,
+                        help='Number of samples per second')
+    parser.add_argument('--watch', dest='watch', action='store_true',
+                        help='Reloads the configuration when the file has been modified. '
+                             'The configuration can also be reloaded with SIGHUP')
     args = parser.parse_args()
 
     if args.version:
@@ -57,14 +80,19 @@ def main():
     Log.set_level(log_level)
 
     scheduler = None
+    profiler = None
 
     def signal_handler(signal, frame):
         nonlocal scheduler
         if scheduler is not None:
             scheduler.stop()
+        if profiler is not None:
+            profiler.stop()
         sys.exit(0)
 
     signal.signal(signal.SIGINT, signal_handler)
+    # Sent by docker and kubernetes when the container is stopped
+    signal.signal(signal.SIGTERM, signal_handler)
 
     raw_config = load_config(args.config)
     config = Configuration(raw_config, args.dry_run)
@@ -72,8 +100,28 @@ def main():
         DependencyResolver(config).print()
         return
 
+    if args.profile:
+        profiler = Profiler(args.profile_dir, args.profile_interval, args.profile_rate)
+        profiler.start()
+
+    if args.workers > 1:
+        if args.watch:
+            parser.error('--watch is not supported with multiple workers')
+        scheduler = Supervisor(raw_config, args.workers, args.dry_run)
+        scheduler.create()
+        scheduler.run()
+        return
+
     scheduler = ExecutionScheduler(config, config.create_executors())
     scheduler.create()
+
+    def reload():
+        scheduler.request_reload(lambda: load_config(args.config))
+
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload())
+    if args.watch:
+        ConfigWatcher(get_config_path(args.config), reload).start()
     scheduler.run()
 
 
@@ -39,6 +39,7 @@ class DependencyRequirements:
             'SmartCtlSource': [],
             'SnmpGetSource': [],
             'TcpTimeSource': [],
+            'TelemetrySource': [],
             'TpLinkEapSource': [],
             'ViessmannSource': [],
             'ZfsSource': [],
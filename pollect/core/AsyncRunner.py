@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Optional, Callable, Awaitable
+
+from pollect.core.Log import Log
+
+
+class AsyncRunner(Log):
+    """
+    Runs coroutines on a single, long living event loop in a background thread.
+    The number of coroutines which are executed at the same time is limited by the concurrency.
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+
+    def __init__(self, name: str, concurrency: int = 100):
+        super().__init__()
+        self._name = name
+        self._concurrency = concurrency
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, coro_func: Callable[..., Awaitable], *args) -> Future:
+        """
+        Schedules the given coroutine function on the event loop
+
+        :param coro_func: Coroutine function
+        :param args: Arguments for the function
+        :return: Future which completes once the coroutine has finished
+        """
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._run_limited(coro_func, *args), loop)
+
+    def stop(self):
+        """
+        Stops the event loop. Pending coroutines are cancelled
+        """
+        with self._lock:
+            loop = self._loop
+            if loop is None:
+                return
+            self._loop = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(5)
+
+    async def _run_limited(self, coro_func: Callable[..., Awaitable], *args):
+        async with self._semaphore:
+            return await coro_func(*args)
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                # The semaphore must be created inside the loop it's used in
+                self._semaphore = asyncio.Semaphore(self._concurrency)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+                pending = asyncio.all_tasks(loop)
+                for task in pending:
+                    task.cancel()
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                loop.close()
+
+            self._thread = threading.Thread(target=run, name=f'async-{self._name}', daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            return loop
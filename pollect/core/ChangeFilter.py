@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import List, Optional, Callable, Tuple, Dict
+
+from pollect.core.Log import Log
+from pollect.core.SeriesRegistry import SeriesKey
+from pollect.core.ValueSet import ValueSet, Value, intern_labels
+from pollect.sources.Source import Source
+
+
+class Deadband:
+    """
+    Min. change of a metric before its value is written again
+    """
+
+    __slots__ = ('absolute', 'relative', 'max_silence')
+
+    absolute: float
+    """
+    Min. absolute difference to the last written value
+    """
+
+    relative: float
+    """
+    Min. difference relative to the last written value (0.01 = 1%)
+    """
+
+    max_silence: Optional[float]
+    """
+    Time in seconds after which the value is written even if it didn't change, None to never force a write
+    """
+
+    DEFAULT_MAX_SILENCE = 300
+    """
+    Max. silence in seconds if none is configured, so a lost write doesn't stay unnoticed forever
+    """
+
+    def __init__(self, absolute: float = 0, relative: float = 0,
+                 max_silence: Optional[float] = DEFAULT_MAX_SILENCE):
+        if absolute < 0 or relative < 0:
+            raise ValueError(f'Invalid deadband {absolute}/{relative}, must not be negative')
+        if max_silence is not None and max_silence <= 0:
+            raise ValueError(f'Invalid max silence {max_silence}, must be positive')
+        self.absolute = absolute
+        self.relative = relative
+        self.max_silence = max_silence
+
+    def exceeds(self, last: float, value: float) -> bool:
+        """
+        Checks if the given value differs enough from the last written value
+
+        :param last: Last written value
+        :param value: Current value
+        :return: True if the value should be written
+        """
+        if math.isnan(last) or math.isnan(value):
+            return math.isnan(last) != math.isnan(value)
+        delta = abs(value - last)
+        return delta > 0 and delta > self.absolute and delta > self.relative * abs(last)
+
+    @staticmethod
+    def from_config(config, default: Optional[Deadband] = None) -> Deadband:
+        """
+        :param config: Config with the optional keys `absolute`, `relative` and `maxSilence`
+        :param default: Deadband which provides the values which aren't configured
+        """
+        if default is None:
+            default = Deadband()
+        max_silence = config.get('maxSilence', default.max_silence)
+        return Deadband(float(config.get('absolute', default.absolute)),
+                        float(config.get('relative', default.relative)),
+                        None if max_silence is None else float(max_silence))
+
+
+class Changes:
+    """
+    Result of the change filter for the data of a single source
+    """
+
+    __slots__ = ('data', 'unchanged', 'removed', 'source', '_filter')
+
+    data: List[ValueSet]
+    """
+    Value sets with the values which changed, or which have been silent for too long
+    """
+
+    unchanged: List[SeriesKey]
+    """
+    Series of the values which didn't change enough and have been left out
+    """
+
+    removed: List[SeriesKey]
+    """
+    Series which have been written before, but are no longer returned by the source
+    """
+
+    source: Optional[Source]
+    """
+    Source which collected the data
+    """
+
+    def __init__(self, data: List[ValueSet], unchanged: List[SeriesKey], removed: List[SeriesKey],
+                 source: Optional[Source] = None, change_filter: Optional[ChangeFilter] = None):
+        self.data = data
+        self.unchanged = unchanged
+        self.removed = removed
+        self.source = source
+        self._filter = change_filter
+
+    def reset(self):
+        """
+        Marks the changes as not written (e.g. because the write failed or has been dropped),
+        so the changed and removed series are written again with the next data of the source
+        """
+        if self._filter is not None:
+            self._filter.reset(self)
+
+    @staticmethod
+    def reset_batch(batch: ChangeBatch):
+        """
+        Marks all changes of the given batch as not written
+        """
+        for changes, _ in batch:
+            changes.reset()
+
+
+ChangeBatch = List[Tuple[Changes, Optional[Source]]]
+"""
+Changes of multiple sources, each with the source which collected the data
+"""
+
+
+class ChangeFilter(Log):
+    """
+    Only passes on the values which changed since they have been written the last time.
+
+    The last written value of each series is kept per source. A value is only written again once it differs
+    by more than the deadband of its metric, or once it hasn't been written for `max_silence` seconds.
+    Series which have been written before but are no longer part of the data are reported as removed.
+    If the changes couldn't be written, `Changes.reset` makes sure they are written again.
+    """
+
+    default: Deadband
+    """
+    Deadband of all metrics without their own configuration
+    """
+
+    metrics: Dict[str, Deadband]
+    """
+    Deadband of each metric name (value set name, followed by `.` and the value name if the value has one)
+    """
+
+    _last: Dict[Optional[Source], Dict[SeriesKey, Optional[Tuple[float, float]]]]
+    """
+    Last written value and the time at which it has been written of each series, per source.
+    None if the series has to be written again
+    """
+
+    def __init__(self, name: str, config, clock: Callable[[], float] = time.monotonic):
+        """
+        :param name: Name of the executor (used for logging)
+        :param config: Change filter config
+        :param clock: Clock used for the max. silence
+        """
+        super().__init__()
+        self.name = name
+        try:
+            self.default = Deadband.from_config(config)
+            metrics = config.get('metrics', {})
+            self.metrics = {key: Deadband.from_config(metrics.get(key), self.default) for key in metrics.keys()}
+        except ValueError as e:
+            raise ValueError(f'Invalid change filter of {name}: {e}')
+        self._clock = clock
+        self._last = {}
+        self._deadbands: Dict[Tuple[str, Optional[str]], Deadband] = {}
+        self._lock = threading.Lock()
+
+    def apply(self, data: List[ValueSet], source: Optional[Source]) -> Changes:
+        """
+        Removes the values which didn't change from the data of a single source
+
+        :param data: Data of the source
+        :param source: Source which collected the data, None for the merged data of all sources
+        :return: Changed values, unchanged and removed series
+        """
+        now = self._clock()
+        changed_sets = []
+        unchanged = []
+        with self._lock:
+            previous = self._last.get(source, {})
+            current = {}
+            for value_set in data:
+                changed = None
+                set_name = value_set.name
+                label_names = intern_labels(value_set.get_labels())
+                for name, label_values, value in value_set.rows():
+                    key = (set_name, name, label_names, label_values)
+                    last = previous.get(key)
+                    deadband = self._get_deadband(value_set, name)
+                    if last is not None and not deadband.exceeds(last[0], value) and \
+                            (deadband.max_silence is None or now - last[1] < deadband.max_silence):
+                        current[key] = last
+                        unchanged.append(key)
+                        continue
+                    current[key] = (value, now)
+                    if changed is None:
+                        changed = self._create_set(value_set)
+                        changed_sets.append(changed)
+                    changed.add(Value(value, label_values, name))
+            removed = [key for key in previous.keys() if key not in current]
+            self._last[source] = current
+        return Changes(changed_sets, unchanged, removed, source, self)
+
+    def apply_batch(self, batch: List[Tuple[List[ValueSet], Optional[Source]]]) -> ChangeBatch:
+        """
+        Removes the values which didn't change from the data of multiple sources
+        """
+        return [(self.apply(data, source), source) for data, source in batch]
+
+    def reset(self, changes: Changes):
+        """
+        Forgets the written values of the given changes, so they are written again with the next data of the source.
+        Removed series are reported as removed again, unless they are part of the next data
+
+        :param changes: Changes which haven't been written
+        """
+        with self._lock:
+            last = self._last.get(changes.source)
+            if last is None:
+                return
+            for value_set in changes.data:
+                label_names = intern_labels(value_set.get_labels())
+                for name, label_values, _ in value_set.rows():
+                    key = (value_set.name, name, label_names, label_values)
+                    if key in last:
+                        last[key] = None
+            for key in changes.removed:
+                if key not in last:
+                    last[key] = None
+
+    def _get_deadband(self, value_set: ValueSet, name: Optional[str]) -> Deadband:
+        key = (value_set.name, name)
+        deadband = self._deadbands.get(key)
+        if deadband is None:
+            metric = value_set.name if name is None else value_set.name + '.' + name
+            deadband = self._deadbands[key] = self.metrics.get(metric, self.default)
+        return deadband
+
+    @staticmethod
+    def _create_set(value_set: ValueSet) -> ValueSet:
+        # The static labels are copied as regular labels
+        changed = ValueSet(list(value_set.get_labels()))
+        changed.name = value_set.name
+        changed.time = value_set.time
+        changed.start_ms = value_set.start_ms
+        changed.end_ms = value_set.end_ms
+        return changed
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from pollect.core.Log import Log
+
+
+class CircuitBreaker(Log):
+    """
+    Tracks the failures of a single source.
+
+    After `failure_threshold` consecutive failures the circuit opens and the source isn't probed
+    until the backoff passed. Then a single trial probe is allowed (half-open). If it succeeds the circuit
+    closes again, otherwise it opens with twice the previous backoff, up to `max_backoff`.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    state: str = CLOSED
+
+    failures: int = 0
+    """
+    Number of consecutive failures
+    """
+
+    backoff: float = 0
+    """
+    Time in seconds the circuit stays open after the last failure
+    """
+
+    def __init__(self, name: str, failure_threshold: int, backoff: float, max_backoff: float,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param name: Name of the source (used for logging)
+        :param failure_threshold: Number of consecutive failures after which the circuit opens
+        :param backoff: Initial time in seconds the circuit stays open
+        :param max_backoff: Upper limit of the backoff in seconds
+        :param clock: Monotonic clock returning the current time in seconds
+        """
+        super().__init__()
+        if failure_threshold < 1:
+            raise ValueError(f'Invalid failure threshold {failure_threshold} for {name}')
+        if backoff <= 0 or max_backoff < backoff:
+            raise ValueError(f'Invalid backoff {backoff} (max. {max_backoff}) for {name}')
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.initial_backoff = backoff
+        self.max_backoff = max_backoff
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.backoff = 0
+        self._clock = clock
+        self._open_until = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Checks if the source may be probed right now
+
+        :return: True if the probe should be executed
+        """
+        with self._lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return True
+            if self.state == CircuitBreaker.HALF_OPEN or self._clock() < self._open_until:
+                # Either the trial probe is still running or the backoff didn't pass yet
+                return False
+            self.state = CircuitBreaker.HALF_OPEN
+            self.log.info(f'Retrying {self.name} after {self.backoff:.0f} seconds')
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CircuitBreaker.CLOSED:
+                self.log.info(f'{self.name} recovered after {self.failures} failures')
+            self.state = CircuitBreaker.CLOSED
+            self.failures = 0
+            self.backoff = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == CircuitBreaker.HALF_OPEN:
+                self.backoff = min(self.max_backoff, self.backoff * 2)
+            elif self.state == CircuitBreaker.CLOSED and self.failures >= self.failure_threshold:
+                self.backoff = self.initial_backoff
+            else:
+                return
+            self.state = CircuitBreaker.OPEN
+            self._open_until = self._clock() + self.backoff
+            self.log.warning(f'{self.name} failed {self.failures} times in a row, '
+                             f'pausing it for {self.backoff:.0f} seconds')
@@ -0,0 +1,58 @@
+import os
+import threading
+from typing import Callable, Optional
+
+from pollect.core.Log import Log
+
+
+class ConfigWatcher(Log):
+    """
+    Polls the modification time of the configuration file and calls the callback when it changed
+    """
+
+    def __init__(self, path: str, callback: Callable[[], None], interval: float = 2):
+        """
+        :param path: Path of the configuration file
+        :param callback: Called after the file has been changed
+        :param interval: Time in seconds between two checks
+        """
+        super().__init__()
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_modified = self._get_modified()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self._thread.start()
+        self.log.info(f'Watching {self.path} for changes')
+
+    def stop(self):
+        self._stopped.set()
+
+    def check(self) -> bool:
+        """
+        Checks if the file has been modified since the last check
+
+        :return: True if the file has been modified
+        """
+        modified = self._get_modified()
+        if modified is None or modified == self._last_modified:
+            return False
+        self._last_modified = modified
+        return True
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            if self.check():
+                self.log.info(f'{self.path} has been modified')
+                self.callback()
+
+    def _get_modified(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            # The file might be replaced right now
+            return None
@@ -1,16 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import math
+import threading
 import time
 import traceback
-from concurrent.futures.thread import ThreadPoolExecutor
-from typing import List, Dict, Optional
+import zlib
+from concurrent.futures import Future, TimeoutError, CancelledError
+from typing import List, Dict, Optional, Tuple, Set, Callable
 
+from pollect.core.AsyncRunner import AsyncRunner
+from pollect.core.ChangeFilter import ChangeFilter, Changes
+from pollect.core.CircuitBreaker import CircuitBreaker
 from pollect.core.Factories import WriterFactory, SourceFactory
 from pollect.core.Log import Log
-from pollect.core.ValueSet import ValueSet
+from pollect.core.Profiler import Activity
+from pollect.core.ResultCache import ResultCache
+from pollect.core.Shutdown import Shutdown, get_remaining
+from pollect.core.Telemetry import telemetry
+from pollect.core.ValueSet import ValueSet, Value
+from pollect.core.WorkerPool import WorkerPool, WorkQueue
+from pollect.core.WriteBatcher import WriteBatcher
+from pollect.core.WriterQueue import QueuedWriter
 from pollect.core.config.ConfigContainer import ConfigContainer
-from pollect.sources.Source import Source
-from pollect.writers.Writer import Writer
+from pollect.sources.Source import Source, BaseSource
+from pollect.writers.Writer import Writer, Batch
 
 
 class Configuration:
@@ -26,17 +41,45 @@ class Configuration:
     Global data writers which should be used by default
     """
 
-    tick_time: int
+    tick_time: float
     """
-    Time for a single probe tick in seconds       
+    Time for a single probe tick in seconds, may be fractional
     """
 
-    def __init__(self, config, dry_run: bool = False):
+    thread_count: int
+    """
+    Default number of threads each executor may use at the same time
+    """
+
+    worker_pool: Optional[WorkerPool] = None
+    """
+    Worker threads shared by all executors
+    """
+
+    shutdown_timeout: float
+    """
+    Max. time in seconds the whole shutdown may take
+    """
+
+    stop_timeout: float
+    """
+    Max. time in seconds a single source or writer may take to stop
+    """
+
+    def __init__(self, config, dry_run: bool = False, writer_factory: Optional[WriterFactory] = None):
+        """
+        :param config: Raw configuration
+        :param dry_run: True if the data should be logged instead of written
+        :param writer_factory: Factory of a previous configuration whose writers should be reused
+        """
         self.writers = []
+        self.raw_config = config
         self.config = ConfigContainer(config)
         self.tick_time = self.config.get('tickTime', 10)
         self.thread_count = self.config.get('threads', 5)
-        self.writer_factory = WriterFactory(dry_run)
+        self.shutdown_timeout = float(self.config.get('shutdownTimeout', 25))
+        self.stop_timeout = float(self.config.get('stopTimeout', 10))
+        self.writer_factory = WriterFactory(dry_run) if writer_factory is None else writer_factory
 
     def create_global_writers(self):
         writer_configs = self.config.get(self.WRITERS, [])
@@ -46,17 +89,62 @@ class Configuration:
         for config in writer_configs:
             self.writers.append(self.writer_factory.create(config))
 
-    def create_executors(self) -> List[Executor]:
-        self.create_global_writers()
-        executors = []
+    def create_executors(self, include: Optional[Callable[[int, ConfigContainer], bool]] = None,
+                         with_writers: bool = True) -> List[Executor]:
+        """
+        Creates the executors and their sources
+
+        :param include: Filter which receives the index and config of each executor,
+        by default all executors are created
+        :param with_writers: False if the caller assigns the writers of the executors
+        :return: Executors
+        """
+        if with_writers:
+            self.create_global_writers()
         source_factory = SourceFactory(self)
-        for item in self.config.get('executors'):
-            thread_pool = ThreadPoolExecutor(max_workers=self.thread_count)
-            executor = Executor(thread_pool, item, self)
-            executor.create_writers(self.writers, self.writer_factory)
-            executor.initialize_objects(source_factory)
-            executors.append(executor)
-        return executors
+        executor_configs = [item for idx, item in enumerate(self.config.get('executors'))
+                            if include is None or include(idx, item)]
+        self.worker_pool = WorkerPool(self.get_max_workers(executor_configs))
+        return [self.create_executor(item, source_factory, with_writers) for item in executor_configs]
+
+    def create_executor(self, item: ConfigContainer, source_factory: SourceFactory, with_writers: bool = True,
+                        previous: Optional[Executor] = None) -> Executor:
+        """
+        Creates a single executor and its sources
+
+        :param item: Executor configuration
+        :param source_factory: Factory for creating the sources
+        :param with_writers: False if the caller assigns the writers of the executor
+        :param previous: Executor of a previous configuration whose unchanged sources should be reused
+        :return: Executor
+        """
+        thread_pool = self.worker_pool.create_queue(item.get('collection'),
+                                                    int(item.get('threads', self.thread_count)),
+                                                    int(item.get('priority', 0)))
+        executor = Executor(thread_pool, item, self)
+        try:
+            if with_writers:
+                executor.create_writers(self.writers, self.writer_factory)
+            executor.initialize_objects(source_factory, previous)
+        except Exception:
+            thread_pool.shutdown()
+            raise
+        return executor
+
+    def get_max_workers(self, executor_configs: List[ConfigContainer]) -> int:
+        """
+        Returns the number of worker threads for the given executors
+        """
+        # By default the pool can run as many threads as all executors together may use
+        max_workers = sum(int(item.get('threads', self.thread_count)) for item in executor_configs)
+        return int(self.config.get('workers', max(max_workers, 1)))
+
+    def get_executor_defaults(self) -> tuple:
+        """
+        Returns the global settings which are inherited by the executors.
+        If they didn't change, unchanged executors can be kept when reloading the configuration
+        """
+        return self.tick_time, self.thread_count, self.config.get(self.WRITERS), self.config.get(self.WRITER)
 
     def get_all_sources(self) -> List[Dict[str, ConfigContainer]]:
         """
@@ -86,7 +174,7 @@ class Executor(Log):
 
     config: Dict[str, any]
     writers: List[Writer]
-    tick_time: int = 0
+    tick_time: float = 0
     collection_name: str
     global_config: Configuration
 
@@ -95,19 +183,136 @@ class Executor(Log):
     List of all sources which should be probed
     """
 
-    thread_pool: ThreadPoolExecutor
+    thread_pool: WorkQueue
     """
-    Thread pool for probing
+    Queue of the shared worker pool for probing
     """
 
-    def __init__(self, thread_pool: ThreadPoolExecutor, exec_config: Dict[str, any], global_config: Configuration):
+    async_runner: Optional[AsyncRunner] = None
+    """
+    Event loop for probing async sources, only created if the executor contains any async source
+    """
+
+    adaptive: bool = False
+    """
+    True if the tick time should be stretched while the executor can't keep up
+    """
+
+    max_tick_time: float = 0
+    """
+    Upper limit of the stretched tick time of an adaptive executor
+    """
+
+    spread: float = 0
+    """
+    Fraction of the tick time across which the start of the sources is distributed
+    """
+
+    _probe_order: List[Tuple[float, int, Source]]
+    """
+    Start offset in seconds and index of each source, ordered by the offset
+    """
+
+    _intervals: List[int]
+    """
+    Probe interval of each source in ticks
+    """
+
+    _last_results: Dict[Source, List[ValueSet]]
+    """
+    Last merged result of each source, used for sources which aren't due in a tick
+    """
+
+    TIMEOUT_DROP = 'drop'
+    TIMEOUT_LAST = 'last'
+    TIMEOUT_NAN = 'nan'
+    TIMEOUT_POLICIES = (TIMEOUT_DROP, TIMEOUT_LAST, TIMEOUT_NAN)
+
+    probe_timeout: Optional[float] = None
+    """
+    Default max. duration of a probe in seconds, None to wait forever
+    """
+
+    on_timeout: str = TIMEOUT_LAST
+    """
+    Default policy which is applied if a probe didn't complete in time
+    """
+
+    _running: Dict[Source, Future]
+    """
+    Last submitted probe of each source
+    """
+
+    _caches: Dict[Source, ResultCache]
+    """
+    Result cache of each source with a cache ttl
+    """
+
+    circuit_breaker: bool = True
+    """
+    Default for pausing sources after consecutive failures
+    """
+
+    _breakers: Dict[Source, CircuitBreaker]
+    """
+    Circuit breaker of each source which should be paused after consecutive failures
+    """
+
+    skipped_probes: int = 0
+    """
+    Number of probes which have been skipped because the previous probe of the source was still running
+    """
+
+    _batcher: Optional[WriteBatcher] = None
+    """
+    Coalesces the partial writes of the sources, None if each result is written directly
+    """
+
+    _change_filter: Optional[ChangeFilter] = None
+    """
+    Removes the unchanged values for the writers which support it, None if all values are written
+    """
+
+    def __init__(self, thread_pool: WorkQueue, exec_config: Dict[str, any], global_config: Configuration):
         super().__init__()
         self.thread_pool = thread_pool
         self.config = exec_config
-        self.tick_time = int(self.config.get('tickTime', 0))
+        self.tick_time = float(self.config.get('tickTime', 0))
+        if self.tick_time <= 0:
+            # Use global tick time
+            self.tick_time = float(global_config.tick_time)
+        self.adaptive = bool(self.config.get('adaptive', False))
+        self.max_tick_time = float(self.config.get('maxTickTime', self.tick_time * 4))
         self.collection_name = exec_config.get('collection')
+        self.async_concurrency = int(self.config.get('asyncConcurrency', 100))
+        self.spread = float(self.config.get('spread', 0))
+        if not 0 <= self.spread <= 1:
+            raise ValueError(f'Invalid spread {self.spread} for {self.collection_name}, must be between 0 and 1')
         self.global_config = global_config
         self._sources = []
+        self._probe_order = []
+        self._intervals = []
+        self._last_results = {}
+        self._running = {}
+        self._caches = {}
+        self._breakers = {}
+        self.circuit_breaker = bool(self.config.get('circuitBreaker', True))
+        probe_timeout = self.config.get('probeTimeout')
+        self.probe_timeout = None if probe_timeout is None else float(probe_timeout)
+        self.on_timeout = self._check_timeout_policy(self.config.get('onTimeout', Executor.TIMEOUT_LAST))
+        batch_window = self.config.get('batchWindow')
+        if batch_window is not None:
+            # The window is configured in milliseconds
+            self._batcher = WriteBatcher(self.collection_name, float(batch_window) / 1000,
+                                         lambda batch: self._write_batch(batch, True))
+        change_only = self.config.get('changeOnly', False)
+        if change_only is True:
+            # Write every change
+            change_only = {}
+        if change_only not in (None, False):
+            self._change_filter = ChangeFilter(self.collection_name, change_only)
+        self._tick = 0
+        self._stopped = threading.Event()
         self.writers = []
 
     def create_writers(self, writers: List[Writer], writer_factory: WriterFactory):
@@ -126,31 +331,119 @@ class Executor(Log):
                 if partial_write != writer.supports_partial_write():
                     raise ValueError('Multiple writers must all have the same "partial_write" feature support')
 
-    def initialize_objects(self, factory: SourceFactory):
+    def initialize_objects(self, factory: SourceFactory, previous: Optional[Executor] = None):
         """
         Initializes all source objects for the execution phase
 
         :param factory: Factory for creating the source objects
+        :param previous: Executor of a previous configuration.
+        Its sources are reused if their configuration didn't change, so they keep their state
         """
         source_items = self.config.get(Configuration.SOURCES)
+        reusable = []
+        if previous is not None and previous.config.get('isolation') == self.config.get('isolation'):
+            reusable = list(previous._sources)
         sources = []
         for item in source_items:
-            source = factory.create(item)
+            source = self._take_source(reusable, item)
+            if source is not None:
+                self._adopt_source(previous, source)
+                sources.append(source)
+                continue
+
+            source = factory.create(item, self.config.get('isolation'))
             if source is None:
                 raise KeyError('Source of type ' + str(item) + ' not found')
+            if source.on_timeout is not None:
+                self._check_timeout_policy(source.on_timeout)
+            if source.cache_ttl is not None:
+                self._caches[source] = ResultCache(f'{self.collection_name}/{source}', source.cache_ttl,
+                                                   source.refresh_ahead)
+            circuit_breaker = source.circuit_breaker
+            if circuit_breaker is None:
+                circuit_breaker = self.circuit_breaker
+            if circuit_breaker:
+                backoff = self.tick_time if source.backoff is None else source.backoff
+                self._breakers[source] = CircuitBreaker(f'{self.collection_name}/{source}', source.failure_threshold,
+                                                        backoff, max(backoff, source.max_backoff))
             sources.append(source)
         self._sources = sources
+        self._probe_order = sorted(((self._get_start_offset(idx, source), idx, source)
+                                    for idx, source in enumerate(sources)), key=lambda item: item[:2])
+        self._intervals = [self._get_interval(source) for source in sources]
+
+        if any(source.is_async() for source in sources):
+            self.async_runner = AsyncRunner(self.collection_name, self.async_concurrency)
+
+    @staticmethod
+    def _take_source(sources: List[Source], item: ConfigContainer) -> Optional[Source]:
+        """
+        Removes the source with the given configuration from the list
+
+        :return: Source, None if no source has the same configuration
+        """
+        for idx, source in enumerate(sources):
+            if source.config == item:
+                return sources.pop(idx)
+        return None
 
-    def shutdown(self):
+    def _adopt_source(self, previous: Executor, source: Source):
+        """
+        Takes over the state of a source from the executor of a previous configuration
+        """
+        self.log.debug(f'Keeping unchanged source {self.collection_name}/{source}')
+        if source in previous._last_results:
+            self._last_results[source] = previous._last_results[source]
+        if source in previous._caches:
+            self._caches[source] = previous._caches[source]
+        if source in previous._breakers:
+            self._breakers[source] = previous._breakers[source]
+
+    def shutdown(self, stop_writers: bool = True, keep_sources: Optional[Set[Source]] = None,
+                 clear_values: bool = False, deadline: Optional[float] = None):
         """
-        Terminates all sources and writers
+        Terminates all sources and writers.
+        The sources (and writers) are stopped concurrently, components which didn't stop
+        until the deadline are left behind
+
+        :param stop_writers: False if the writers are still used by other executors
+        :param keep_sources: Sources which have been taken over by another executor and must not be terminated
+        :param clear_values: True to remove the values of the sources from the writers, which keep running
+        :param deadline: Monotonic clock time at which the shutdown returns at the latest,
+        by default the shutdown timeout of the configuration
         """
         self.log.info(f'Shutting down {self.collection_name}')
-        self.thread_pool.shutdown()
+        if deadline is None:
+            deadline = time.monotonic() + self.global_config.shutdown_timeout
+        self._stopped.set()
+        # Running probes are abandoned after the stop timeout, or once the deadline passed
+        self.thread_pool.shutdown(timeout=min(self.global_config.stop_timeout, get_remaining(deadline)))
+        if self.async_runner is not None:
+            self.async_runner.stop()
+        if self._batcher is not None:
+            # Write the pending results before the values of the sources are removed
+            self._batcher.stop(get_remaining(deadline))
+
+        shutdown = Shutdown(self.collection_name, deadline, self.global_config.stop_timeout)
         for source in self._sources:
-            source.shutdown()
-        for writer in self.writers:
-            writer.stop()
+            if keep_sources is not None and source in keep_sources:
+                continue
+            shutdown.add(str(source), functools.partial(self._shutdown_source, source, clear_values))
+        shutdown.run()
+        if stop_writers:
+            Shutdown.stop_writers(self.writers, deadline, self.global_config.stop_timeout)
+
+    def interrupt(self):
+        """
+        Aborts the current execution before the remaining sources are probed
+        """
+        self._stopped.set()
+
+    def _shutdown_source(self, source: Source, clear_values: bool):
+        if clear_values:
+            # Remove the values of the source from writers which keep running
+            self._write([], source, True, allow_empty=True)
+        source.shutdown()
 
     def execute(self):
         """
@@ -158,33 +451,217 @@ class Executor(Log):
         """
         self.log.debug(f'Executing {self.collection_name}')
         partial_write = self.writers[0].supports_partial_write()
-        futures = []
+        futures: Dict[Source, Future] = {}
+        deadlines: Dict[Source, float] = {}
+        timed_out: Set[Source] = set()
+        tick = self._tick
+        self._tick += 1
+
+        start = time.monotonic()
+        for offset, idx, source in self._probe_order:
+            assert isinstance(source, BaseSource)
+            if tick % self._intervals[idx] != 0:
+                # Source is not due in this tick
+                continue
+            running = self._running.get(source)
+            if running is not None and not running.done():
+                self.log.warning(f'Previous probe of {self.collection_name}/{source} is still running, skipping')
+                self.skipped_probes += 1
+                timed_out.add(source)
+                continue
 
-        for source in self._sources:
-            assert isinstance(source, Source)
-            future = self.thread_pool.submit(self._probe_and_write if partial_write else self._probe, source)
-            futures.append(future)
+            delay = start + offset - time.monotonic()
+            if delay > 0 and self._stopped.wait(delay):
+                # Executor has been shut down while waiting for the next source
+                return
+            try:
+                future = self._submit(source, partial_write)
+            except RuntimeError:
+                if self._stopped.is_set():
+                    # Executor has been shut down during the execution
+                    return
+                raise
+            self._running[source] = future
+            futures[source] = future
+            timeout = self._get_timeout(source)
+            if timeout is not None:
+                deadlines[source] = time.monotonic() + timeout
+
+        timed_out.update(self._wait_for_deadlines(futures, deadlines))
+        for source in timed_out:
+            telemetry.record_timeout(self.collection_name, str(source))
+            self._last_results[source] = self._get_timeout_results(source)
+            if partial_write:
+                self._write_source(self._last_results[source], source)
 
         if partial_write:
             # Data has already been written to the exporter
             return
 
-        # Wait and merge the results
+        # Wait and merge the results in the order of the sources,
+        # so all writers get a single consistent snapshot
         data = []
-        for future in futures:
-            # noinspection PyTypeChecker
-            self._merge(future.result(), data)
+        for source in self._sources:
+            future = futures.get(source)
+            if future is not None and source not in timed_out:
+                results = []
+                try:
+                    # noinspection PyTypeChecker
+                    self._merge(future.result(), results)
+                except CancelledError:
+                    # Probes which didn't start yet are cancelled by the shutdown
+                    telemetry.record_timeout(self.collection_name, str(source))
+                    results = self._get_timeout_results(source)
+                self._last_results[source] = results
+            # Sources which haven't been due in this tick contribute their previous values
+            data.extend(self._last_results.get(source, []))
         self._write(data, None, False)
 
+    def _wait_for_deadlines(self, futures: Dict[Source, Future], deadlines: Dict[Source, float]) -> Set[Source]:
+        """
+        Waits until all probes with a timeout have completed or reached their deadline.
+        Probes which didn't complete in time are cancelled if possible.
+
+        :param futures: Futures of the submitted probes
+        :param deadlines: Monotonic deadline of each source with a timeout
+        :return: Sources which timed out
+        """
+        timed_out = set()
+        for source, deadline in sorted(deadlines.items(), key=lambda item: item[1]):
+            future = futures[source]
+            try:
+                future.result(max(0.0, deadline - time.monotonic()))
+            except CancelledError:
+                timed_out.add(source)
+            except TimeoutError:
+                # Running threads can't be interrupted, but queued probes and coroutines are cancelled
+                future.cancel()
+                self.log.warning(f'Probe of {self.collection_name}/{source} timed out after '
+                                 f'{self._get_timeout(source)} seconds')
+                timed_out.add(source)
+        return timed_out
+
+    def _get_timeout(self, source: Source) -> Optional[float]:
+        if source.probe_timeout is not None:
+            return source.probe_timeout
+        return self.probe_timeout
+
+    def _get_timeout_results(self, source: Source) -> List[ValueSet]:
+        """
+        Returns the values which should be written for a source which didn't complete in time
+
+        :param source: Source
+        :return: Value sets depending on the timeout policy
+        """
+        policy = self.on_timeout
+        if source.on_timeout is not None:
+            policy = self._check_timeout_policy(source.on_timeout)
+        if policy == Executor.TIMEOUT_DROP:
+            return []
+
+        last_results = self._last_results.get(source, [])
+        if policy == Executor.TIMEOUT_NAN:
+            return [self._nan_copy(value_set) for value_set in last_results]
+        return last_results
+
+    @staticmethod
+    def _nan_copy(value_set: ValueSet) -> ValueSet:
+        # The static labels are copied as regular labels
+        copy = ValueSet(list(value_set.get_labels()))
+        copy.name = value_set.name
+        copy.time = value_set.time
+        copy.start_ms = value_set.start_ms
+        copy.end_ms = value_set.end_ms
+        for name, label_values, _ in value_set.rows():
+            copy.add(Value(math.nan, label_values, name))
+        return copy
+
+    def _check_timeout_policy(self, policy: str) -> str:
+        if policy not in Executor.TIMEOUT_POLICIES:
+            raise ValueError(f'Invalid timeout policy {policy} for {self.collection_name}, '
+                             f'must be one of {Executor.TIMEOUT_POLICIES}')
+        return policy
+
+    def _get_interval(self, source: Source) -> int:
+        """
+        Returns the probe interval of the given source in ticks of this executor
+
+        :param source: Source
+        :return: Interval in ticks, 1 if the source should be probed in every tick
+        """
+        if source.every is not None:
+            if source.every < 1:
+                raise ValueError(f'Invalid interval every={source.every} for {self.collection_name}/{source}')
+            return source.every
+        if source.tick_time is None:
+            return 1
+
+        ticks = max(1, round(source.tick_time / self.tick_time))
+        if abs(ticks * self.tick_time - source.tick_time) > 1e-6:
+            self.log.warning(f'Tick time {source.tick_time} of {self.collection_name}/{source} is not a multiple '
+                             f'of the executor tick time {self.tick_time}, using {ticks * self.tick_time}')
+        return ticks
+
+    def _get_start_offset(self, idx: int, source: Source) -> float:
+        """
+        Returns the delay of the given source relative to the start of the tick.
+        The delay is derived from a hash of the source name so it's stable across restarts
+
+        :param idx: Index of the source in the executor
+        :param source: Source
+        :return: Delay in seconds
+        """
+        if self.spread <= 0:
+            return 0
+        key = f'{self.collection_name}/{source}/{idx}'.encode('utf-8')
+        fraction = zlib.crc32(key) / 2 ** 32
+        return fraction * self.spread * self.tick_time
+
+    def _submit(self, source: Source, partial_write: bool) -> Future:
+        """
+        Submits the probe of a single source.
+        Async sources are executed on the event loop, all other sources in the thread pool
+        :param source: Source
+        :param partial_write: True if the result should be written directly after probing
+        :return: Future of the probe
+        """
+        if source.is_async():
+            return self.async_runner.submit(self._probe_and_write_async if partial_write else self._probe_async,
+                                            source)
+        return self.thread_pool.submit(self._probe_and_write if partial_write else self._probe, source)
+
     def _probe_and_write(self, source: Source):
         """
         Probes a single source and writes the data to the writer
         :param source: Source
         """
-        value_sets = self._probe(source)
+        self._write_partial(self._probe(source), source)
+
+    async def _probe_and_write_async(self, source: Source):
+        """
+        Probes a single async source and writes the data to the writer.
+        The write itself is blocking and therefore done in the thread pool
+        :param source: Source
+        """
+        value_sets = await self._probe_async(source)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.thread_pool, self._write_partial, value_sets, source)
+
+    def _write_partial(self, value_sets: List[ValueSet], source: Source):
         data = []
         self._merge(value_sets, data)
-        self._write(data, source, True)
+        self._last_results[source] = data
+        if len(data) > 0:
+            self._write_source(data, source)
+
+    def _write_source(self, data: List[ValueSet], source: Source):
+        """
+        Writes the result of a single source to the partial writers, either directly or as part of the next batch
+        """
+        if self._batcher is not None:
+            self._batcher.add(data, source)
+            return
+        self._write(data, source, True, allow_empty=True)
 
     def _probe(self, source: Source) -> List[ValueSet]:
         """
@@ -192,22 +669,155 @@ class Executor(Log):
         :param source: Source
         :return: The probe result data
         """
+        cache = self._caches.get(source)
+        if cache is not None:
+            cached = self._get_cached(source, cache)
+            if cached is not None:
+                return cached
+        if not self._allow_probe(source):
+            return []
+
+        start = self._before_probe(source)
+        try:
+            with Activity(f'source:{self.collection_name}/{source}'):
+                value_sets = source.probe()
+            self._after_probe(source, start, value_sets)
+            if cache is not None:
+                cache.put(value_sets)
+            return value_sets
+        except Exception as e:
+            self._probe_failed(source, start, e)
+        return []
 
-        log_tag = f'{self.collection_name}/{source}'
-        self.log.info(f'Collecting data from {log_tag}')
-        now = int(time.time())
+    async def _probe_async(self, source: Source) -> List[ValueSet]:
+        """
+        Probes a single async source
+        :param source: Source
+        :return: The probe result data
+        """
+        cache = self._caches.get(source)
+        if cache is not None:
+            cached = self._get_cached(source, cache)
+            if cached is not None:
+                return cached
+        if not self._allow_probe(source):
+            return []
+
+        start = self._before_probe(source)
         try:
-            value_sets = source.probe()
-            delta = int(time.time()) - now
-            if delta > 10:
-                self.log.warning(f'Probing of {log_tag} took {delta} seconds')
+            value_sets = await source.probe_async()
+            self._after_probe(source, start, value_sets)
+            if cache is not None:
+                cache.put(value_sets)
             return value_sets
+        except asyncio.CancelledError:
+            self._probe_cancelled(source)
+            raise
         except Exception as e:
-            # Catch all errors that could occur and ignore them
-            traceback.print_exc()
-            self.log.error(f'Error while probing using source {log_tag}: {e}')
+            self._probe_failed(source, start, e)
         return []
 
+    def _allow_probe(self, source: Source) -> bool:
+        """
+        Checks if the circuit breaker of the given source allows probing it
+        """
+        breaker = self._breakers.get(source)
+        if breaker is None or breaker.allow():
+            return True
+        self.log.debug(f'Skipping {self.collection_name}/{source}, circuit is open')
+        return False
+
+    def _get_cached(self, source: Source, cache: ResultCache) -> Optional[List[ValueSet]]:
+        """
+        Returns the cached results of the given source and starts a background refresh if required
+
+        :param source: Source
+        :param cache: Cache of the source
+        :return: Value sets, None if the source has to be probed
+        """
+        cached = cache.get()
+        if cached is None:
+            return None
+        if cache.start_refresh():
+            self.log.debug(f'Refreshing cached results of {self.collection_name}/{source}')
+            if source.is_async():
+                self.async_runner.submit(self._refresh_async, source, cache)
+            else:
+                self.thread_pool.submit(self._refresh, source, cache)
+        return cached
+
+    def _refresh(self, source: Source, cache: ResultCache):
+        """
+        Probes a cached source in the background
+        """
+        if not self._allow_probe(source):
+            cache.refresh_failed()
+            return
+        start = self._before_probe(source)
+        try:
+            with Activity(f'source:{self.collection_name}/{source}'):
+                value_sets = source.probe()
+            self._after_probe(source, start, value_sets)
+            cache.put(value_sets)
+        except Exception as e:
+            cache.refresh_failed()
+            self._probe_failed(source, start, e)
+
+    async def _refresh_async(self, source: Source, cache: ResultCache):
+        """
+        Probes a cached async source in the background
+        """
+        if not self._allow_probe(source):
+            cache.refresh_failed()
+            return
+        start = self._before_probe(source)
+        try:
+            value_sets = await source.probe_async()
+            self._after_probe(source, start, value_sets)
+            cache.put(value_sets)
+        except asyncio.CancelledError:
+            cache.refresh_failed()
+            self._probe_cancelled(source)
+            raise
+        except Exception as e:
+            cache.refresh_failed()
+            self._probe_failed(source, start, e)
+
+    def _before_probe(self, source: Source) -> float:
+        self.log.info(f'Collecting data from {self.collection_name}/{source}')
+        return time.monotonic()
+
+    def _after_probe(self, source: Source, start: float, value_sets: List[ValueSet]):
+        breaker = self._breakers.get(source)
+        if breaker is not None:
+            breaker.record_success()
+        delta = time.monotonic() - start
+        if delta > 10:
+            self.log.warning(f'Probing of {self.collection_name}/{source} took {int(delta)} seconds')
+        if telemetry.enabled:
+            telemetry.record_probe(self.collection_name, str(source), delta,
+                                   sum(value_set.size() for value_set in value_sets))
+
+    def _probe_failed(self, source: Source, start: float, e: Exception):
+        # Catch all errors that could occur and ignore them
+        breaker = self._breakers.get(source)
+        if breaker is None or breaker.failures == 0:
+            # Repeated failures of the same source are only logged as single line
+            traceback.print_exc()
+        self.log.error(f'Error while probing using source {self.collection_name}/{source}: {e}')
+        if breaker is not None:
+            breaker.record_failure()
+        telemetry.record_probe(self.collection_name, str(source), time.monotonic() - start, 0, failed=True)
+
+    def _probe_cancelled(self, source: Source):
+        """
+        Called if an async probe has been cancelled because it timed out
+        """
+        breaker = self._breakers.get(source)
+        if breaker is not None:
+            # Counts as failure, otherwise a half-open circuit would never be closed or opened again
+            breaker.record_failure()
+
     def _merge(self, value_sets: List[ValueSet], results: List[ValueSet]):
         """
         Merges the given value sets
@@ -216,30 +826,64 @@ class Executor(Log):
         """
         now = int(time.time())
         for value_set in value_sets:
-            value_set.time = now
+            # Use the time of the probe if the source recorded it
+            value_set.time = value_set.end_ms // 1000 if value_set.end_ms > 0 else now
             if len(value_set.name) > 0:
                 value_set.name = self.collection_name + '.' + value_set.name
             else:
                 value_set.name = self.collection_name
             results.append(value_set)
 
-    def _write(self, value_sets: List[ValueSet], source_ref: Optional[Source], partial_writers_filter: bool):
+    def _write(self, value_sets: List[ValueSet], source_ref: Optional[Source], partial_writers_filter: bool,
+               allow_empty: bool = False):
         """
         Writes the given value sets using the current exporter
         :param value_sets: Value sets
         :param source_ref: Reference object which collected the data.
         :param partial_writers_filter: True to only write the partial writers, False to write the full writer
         This is used to detect if a metric has been removed
+        :param allow_empty: True to write even if there are no values, so the writer removes the previous values
         """
-        if len(value_sets) == 0:
+        if len(value_sets) == 0 and not allow_empty:
             return
+        self._write_batch([(value_sets, source_ref)], partial_writers_filter)
 
-        # Write the data
+    def _write_batch(self, batch: Batch, partial_writers_filter: bool):
+        """
+        Writes the data of one or more sources using the current exporter
+        :param batch: Data and source of each write
+        :param partial_writers_filter: True to only write the partial writers, False to write the full writer
+        """
         self.log.debug(f'Writing data for {self.collection_name}')
+        change_batch = None
         for writer in self.writers:
             if partial_writers_filter != writer.supports_partial_write():
                 continue
+            change_only = self._change_filter is not None and writer.supports_change_only()
+            if change_only and change_batch is None:
+                # All change only writers share the same state, so the changes are only determined once
+                change_batch = self._change_filter.apply_batch(batch)
+            if isinstance(writer, QueuedWriter):
+                # Only enqueues the data, the dispatcher thread of the writer records the actual write
+                if change_only:
+                    writer.write_changes(change_batch)
+                else:
+                    writer.write_batch(batch)
+                continue
+            start = time.monotonic()
+            failed = False
             try:
-                writer.write(value_sets, source_ref)
+                with Activity(f'writer:{type(writer).__name__}'):
+                    if change_only:
+                        writer.write_changes(change_batch)
+                    elif len(batch) == 1:
+                        writer.write(*batch[0])
+                    else:
+                        writer.write_batch(batch)
             except Exception as e:
-                self.log.error(f'Could not write data: {e}, source: {source_ref}')
+                failed = True
+                self.log.error(f'Could not write data: {e}, sources: {[str(item[1]) for item in batch]}')
+                if change_only:
+                    # Write the changes again with the next data
+                    Changes.reset_batch(change_batch)
+            telemetry.record_write(type(writer).__name__, time.monotonic() - start, failed)
@@ -1,12 +1,222 @@
+from __future__ import annotations
+
+import functools
+import heapq
+import itertools
+import math
 import queue
 import threading
 import time
-from typing import List, Dict
+from typing import List, Dict, Callable, Optional, Tuple, Set
 
-import schedule
 from pollect.core.Log import Log
+from pollect.core.Telemetry import telemetry
 
 from pollect.core.Core import Configuration, Executor
+from pollect.core.Factories import SourceFactory
+from pollect.core.Shutdown import Shutdown, get_remaining
+from pollect.writers.Writer import Writer
+
+
+class ScheduledJob:
+    """
+    A job which is executed periodically.
+    The due times are always derived from a fixed anchor, so the job doesn't drift
+    even if the execution itself is delayed.
+    """
+
+    interval: float
+    """
+    Interval in seconds
+    """
+
+    next_run: float
+    """
+    Clock time at which the job is due next
+    """
+
+    def __init__(self, interval: float, callback: Callable, args: tuple, start: float):
+        if interval <= 0:
+            raise ValueError(f'Invalid interval {interval}')
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.next_run = start
+        self.cancelled = False
+        self._anchor = start
+
+    def reset_anchor(self):
+        """
+        Uses the next due time as new phase anchor
+        """
+        self._anchor = self.next_run
+
+    def advance(self, now: float):
+        """
+        Moves the due time to the next slot after now.
+        Slots which have been missed completely are skipped, the phase stays the same
+
+        :param now: Current clock time
+        """
+        slots = math.floor((now - self._anchor) / self.interval) + 1
+        self.next_run = self._anchor + max(slots, 1) * self.interval
+
+
+class JobQueue(Log):
+    """
+    Priority queue of periodic jobs, ordered by their next due time
+    """
+
+    _heap: List[Tuple[float, int, ScheduledJob]]
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        :param clock: Monotonic clock returning the current time in seconds
+        """
+        super().__init__()
+        self._clock = clock
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, interval: float, callback: Callable, *args, start: Optional[float] = None) -> ScheduledJob:
+        """
+        Adds a new periodic job
+
+        :param interval: Interval in seconds, may be fractional
+        :param callback: Function which should be called
+        :param args: Arguments for the function
+        :param start: Clock time of the first execution, by default the job is due immediately
+        :return: Job
+        """
+        if start is None:
+            start = self._clock()
+        job = ScheduledJob(interval, callback, args, start)
+        with self._lock:
+            self._push(job)
+        return job
+
+    def set_interval(self, job: ScheduledJob, interval: float):
+        """
+        Changes the interval of the given job.
+        The next execution stays as scheduled, all following executions use the new interval
+
+        :param job: Job
+        :param interval: New interval in seconds
+        """
+        if interval <= 0:
+            raise ValueError(f'Invalid interval {interval}')
+        with self._lock:
+            job.interval = interval
+            job.reset_anchor()
+
+    def remove(self, job: ScheduledJob):
+        """
+        Removes the given job. The job won't be executed anymore
+        """
+        job.cancelled = True
+
+    def run_pending(self) -> int:
+        """
+        Executes all jobs which are due
+
+        :return: Number of executed jobs
+        """
+        executed = 0
+        now = self._clock()
+        while True:
+            with self._lock:
+                if len(self._heap) == 0 or self._heap[0][0] > now:
+                    break
+                job = heapq.heappop(self._heap)[2]
+                if job.cancelled:
+                    continue
+                job.advance(now)
+                self._push(job)
+
+            executed += 1
+            try:
+                job.callback(*job.args)
+            except Exception as e:
+                self.log.error(f'Error while executing scheduled job: {e}')
+        return executed
+
+    def next_delay(self) -> Optional[float]:
+        """
+        Returns the time until the next job is due
+
+        :return: Time in seconds, None if no job is scheduled
+        """
+        with self._lock:
+            while len(self._heap) > 0 and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            if len(self._heap) == 0:
+                return None
+            return max(0.0, self._heap[0][0] - self._clock())
+
+    def _push(self, job: ScheduledJob):
+        # The counter keeps the order stable for jobs with the same due time
+        heapq.heappush(self._heap, (job.next_run, next(self._counter), job))
+
+
+class ExecutorStats:
+    """
+    Scheduling statistics of a single executor
+    """
+
+    scheduled: int = 0
+    """
+    Number of ticks in which the executor was due
+    """
+
+    executions: int = 0
+    """
+    Number of completed executions
+    """
+
+    overruns: int = 0
+    """
+    Number of ticks which have been skipped because the previous execution was still pending
+    """
+
+    queue_wait: float = 0
+    """
+    Time in seconds the last execution waited in the queue before it was started
+    """
+
+    duration: float = 0
+    """
+    Duration of the last execution in seconds
+    """
+
+    achieved_interval: float = 0
+    """
+    Moving average of the time between two execution starts in seconds
+    """
+
+    interval: float = 0
+    """
+    Current scheduling interval in seconds, differs from the tick time if the executor is adaptive
+    """
+
+    behind: bool = False
+    """
+    True if the last tick has been skipped
+    """
+
+    last_start: Optional[float] = None
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    @property
+    def achieved_rate(self) -> float:
+        """
+        Effective number of executions per second
+        """
+        if self.achieved_interval <= 0:
+            return 0
+        return 1 / self.achieved_interval
 
 
 class ExecutionScheduler(Log):
@@ -17,57 +227,229 @@ class ExecutionScheduler(Log):
     """
     _queues: Dict[Executor, queue.Queue]
 
-    def __init__(self, config: Configuration, executors: List[Executor]):
+    ADAPTIVE_FACTOR = 1.5
+    """
+    Factor by which the interval of an adaptive executor is stretched or shrunk
+    """
+
+    EMA_WEIGHT = 0.2
+    """
+    Weight of the latest sample in the moving average of the achieved interval
+    """
+
+    def __init__(self, config: Configuration, executors: List[Executor],
+                 clock: Callable[[], float] = time.monotonic):
         super().__init__()
         self.config = config
         self.executors = executors
         self._active = False
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._stopping = False
+        self._clock = clock
+        self._jobs = JobQueue(clock)
+        self._worker_threads: Dict[Executor, threading.Thread] = {}
         self._queues = {}
+        self._scheduled_jobs: Dict[Executor, ScheduledJob] = {}
+        self._stats: Dict[Executor, ExecutorStats] = {}
+        self._pending_reload: Optional[Callable[[], Dict[str, any]]] = None
         for executor in executors:
             self._queues[executor] = queue.Queue(2)
+            self._stats[executor] = ExecutorStats(executor.tick_time)
+
+    def get_stats(self, executor: Executor) -> ExecutorStats:
+        """
+        Returns the scheduling statistics of the given executor
+        """
+        return self._stats[executor]
+
+    def get_queue_depth(self, executor: Executor) -> int:
+        """
+        Returns the number of executions of the given executor waiting for their start
+        """
+        return self._queues[executor].qsize()
 
     def create(self):
         """
-        Creates the schedulers for the executors
+        Creates the schedulers for the executors.
+        All executors are executed once at the beginning
         """
+        telemetry.register_scheduler(self)
         for executor in self.executors:
-            exec_time = executor.tick_time
-            if exec_time <= 0:
-                # Use global tick time
-                schedule.every(self.config.tick_time).seconds.do(self._schedule_execution, executor)
-                continue
-
-            # Executor has its own tick time defined
-            schedule.every(exec_time).seconds.do(self._schedule_execution, executor)
+            self._scheduled_jobs[executor] = self._jobs.add(executor.tick_time, self._schedule_execution, executor)
 
     def run(self):
         """
         Starts the scheduling
         """
         self._active = True
-        for executor, exec_queue in self._queues.items():
-            worker_thread = threading.Thread(target=self._work_on_queue, args=[executor])
-            worker_thread.start()
+        for executor in self.executors:
+            self._start_worker(executor)
 
-        # Run them all once at the beginning
-        schedule.run_all()
         while self._active:
-            schedule.run_pending()
-            time.sleep(1)
+            self._jobs.run_pending()
+            # Sleep until the next executor is due (or the scheduler gets stopped or reloaded)
+            self._wakeup.wait(self._jobs.next_delay())
+            self._wakeup.clear()
+            loader = self._pending_reload
+            if loader is not None and self._active:
+                self._pending_reload = None
+                self._reload(loader)
+        self._join_workers()
+        # Return once the executors have completed their pending probes and writes
+        self._stopped.wait(self.config.shutdown_timeout)
         self.log.debug('Stopped scheduler execution')
 
+    def request_reload(self, loader: Callable[[], Dict[str, any]]):
+        """
+        Reloads the configuration on the scheduler thread.
+        May be called from any thread or a signal handler
+
+        :param loader: Returns the new raw configuration
+        """
+        self._pending_reload = loader
+        self._wakeup.set()
+
+    def reload(self, raw_config: Dict[str, any]) -> bool:
+        """
+        Applies a new configuration. Must be called on the scheduler thread (see `request_reload`) or
+        before the scheduler has been started.
+
+        Executors whose configuration didn't change are kept as they are. Changed executors are rebuilt,
+        but keep their unchanged sources (including their state). Writers with an unchanged configuration
+        are reused, writers which aren't used anymore are stopped.
+
+        :param raw_config: New raw configuration
+        :return: True if the configuration has been applied, False if it is invalid and the old one is kept
+        """
+        self.log.info('Reloading configuration')
+        config = Configuration(raw_config, writer_factory=self.config.writer_factory)
+        config.worker_pool = self.config.worker_pool
+        previous = dict((executor.collection_name, executor) for executor in self.executors)
+        executors = []
+        created = []
+        try:
+            config.create_global_writers()
+            source_factory = SourceFactory(config)
+            for item in config.config.get('executors'):
+                old = previous.get(item.get('collection'))
+                if old is not None and old.config == item \
+                        and old.global_config.get_executor_defaults() == config.get_executor_defaults():
+                    executors.append(old)
+                    continue
+                executor = config.create_executor(item, source_factory, previous=old)
+                created.append(executor)
+                executors.append(executor)
+        except Exception as e:
+            self.log.error(f'Invalid configuration, keeping the current one: {e}')
+            kept_sources = self._get_sources(self.executors)
+            for executor in created:
+                executor.shutdown(stop_writers=False, keep_sources=kept_sources)
+            self._release_writers(self.config, self.executors, config, created)
+            return False
+
+        removed = [executor for executor in self.executors if executor not in executors]
+        kept_sources = self._get_sources(executors)
+        for executor in removed:
+            self._remove_executor(executor, kept_sources)
+        for executor in created:
+            self._add_executor(executor)
+
+        if config.worker_pool is not None:
+            config.worker_pool.max_workers = config.get_max_workers(config.config.get('executors'))
+        self._release_writers(config, executors, self.config, removed)
+        self.config = config
+        self.executors = executors
+        self.log.info(f'Configuration reloaded: {len(created)} executors created, {len(removed)} removed, '
+                      f'{len(executors) - len(created)} unchanged')
+        return True
+
+    def _reload(self, loader: Callable[[], Dict[str, any]]):
+        try:
+            raw_config = loader()
+        except Exception as e:
+            self.log.error(f'Could not load configuration, keeping the current one: {e}')
+            return
+        self.reload(raw_config)
+
+    def _add_executor(self, executor: Executor):
+        self._queues[executor] = queue.Queue(2)
+        self._stats[executor] = ExecutorStats(executor.tick_time)
+        self._scheduled_jobs[executor] = self._jobs.add(executor.tick_time, self._schedule_execution, executor)
+        if self._active:
+            self._start_worker(executor)
+
+    def _remove_executor(self, executor: Executor, kept_sources: Set):
+        """
+        Stops scheduling the given executor and waits until its current execution has been completed
+        """
+        job = self._scheduled_jobs.pop(executor, None)
+        if job is not None:
+            self._jobs.remove(job)
+        worker_thread = self._worker_threads.pop(executor, None)
+        if worker_thread is not None:
+            self._stop_queue(self._queues[executor])
+            worker_thread.join(10)
+        executor.shutdown(stop_writers=False, keep_sources=kept_sources, clear_values=True)
+        del self._queues[executor]
+        del self._stats[executor]
+
+    @staticmethod
+    def _get_sources(executors: List[Executor]) -> Set:
+        return set(source for executor in executors for source in executor._sources)
+
+    @staticmethod
+    def _release_writers(config: Configuration, executors: List[Executor],
+                         old_config: Configuration, old_executors: List[Executor]):
+        """
+        Stops the writers of the old executors and configuration which aren't used by the new ones
+        """
+        used: List[Writer] = list(config.writers)
+        for executor in executors:
+            used.extend(executor.writers)
+        unused: List[Writer] = list(old_config.writers)
+        for executor in old_executors:
+            unused.extend(executor.writers)
+
+        stopped = []
+        for writer in unused:
+            if any(writer is other for other in used) or any(writer is other for other in stopped):
+                continue
+            stopped.append(writer)
+            config.writer_factory.release(writer)
+        # Flushing a writer may block (e.g. a full queue), which must not hold up the executors
+        Shutdown.stop_writers(stopped, time.monotonic() + config.stop_timeout, config.stop_timeout)
+
+    def _start_worker(self, executor: Executor):
+        worker_thread = threading.Thread(target=self._work_on_queue, args=[executor],
+                                         name=f'executor-{executor.collection_name}')
+        worker_thread.start()
+        self._worker_threads[executor] = worker_thread
+
     def _schedule_execution(self, executor: Executor):
         """
         Queues a new executor for execution
         :param executor: Executor to be queued
         """
         exec_queue = self._queues[executor]
+        stats = self._stats[executor]
+        stats.scheduled += 1
         if exec_queue.qsize() >= 1:
             # The queue is already nearly full, don't add anything
+            stats.overruns += 1
+            if not stats.behind:
+                self.log.warning(f'Executor {executor.collection_name} is slower than its tick time '
+                                 f'of {stats.interval} seconds, skipping tick')
+            stats.behind = True
+            if executor.adaptive:
+                self._set_interval(executor, min(executor.max_tick_time, stats.interval * self.ADAPTIVE_FACTOR))
             return
 
+        if stats.behind:
+            stats.behind = False
+            self.log.info(f'Executor {executor.collection_name} caught up again')
         self.log.debug(f'Scheduling execution of {executor.collection_name}')
-        exec_queue.put(executor.execute)
+        exec_queue.put((executor.execute, self._clock()))
 
     def _work_on_queue(self, executor: Executor):
         """
@@ -75,19 +457,109 @@ class ExecutionScheduler(Log):
         """
         exec_queue = self._queues[executor]
         while self._active:
-            job_func = exec_queue.get()
-            if job_func is None:
-                continue
-            job_func()
+            item = exec_queue.get()
+            if item is None:
+                # The scheduler has been stopped or the executor removed
+                break
+            self._execute(executor, *item)
             exec_queue.task_done()
         self.log.info(f'Stopped working on queue for executor {executor.collection_name}')
 
+    def _execute(self, executor: Executor, job_func: Callable, queued_at: float):
+        """
+        Runs a single execution and updates the statistics of the executor
+        :param executor: Executor
+        :param job_func: Function which should be executed
+        :param queued_at: Clock time at which the execution has been queued
+        """
+        stats = self._stats[executor]
+        start = self._clock()
+        stats.queue_wait = start - queued_at
+        if stats.last_start is not None:
+            interval = start - stats.last_start
+            if stats.achieved_interval <= 0:
+                stats.achieved_interval = interval
+            else:
+                stats.achieved_interval += self.EMA_WEIGHT * (interval - stats.achieved_interval)
+        stats.last_start = start
+
+        try:
+            job_func()
+        finally:
+            stats.duration = self._clock() - start
+            stats.executions += 1
+            telemetry.record_execution(executor.collection_name, stats.duration)
+
+        if executor.adaptive and not stats.behind and stats.interval > executor.tick_time \
+                and stats.duration < stats.interval / (2 * self.ADAPTIVE_FACTOR):
+            # The executor has recovered, use a shorter interval again
+            self._set_interval(executor, max(executor.tick_time, stats.interval / self.ADAPTIVE_FACTOR))
+
+    def _set_interval(self, executor: Executor, interval: float):
+        stats = self._stats[executor]
+        if interval == stats.interval:
+            return
+        self.log.info(f'Changing interval of {executor.collection_name} from {stats.interval:.2f} '
+                      f'to {interval:.2f} seconds')
+        stats.interval = interval
+        job = self._scheduled_jobs.get(executor)
+        if job is not None:
+            self._jobs.set_interval(job, interval)
+
     def stop(self):
         """
-        Stops the scheduling and terminates all probes
+        Stops the scheduling and terminates all probes.
+        The executors are shut down concurrently, afterwards the writers are flushed and stopped.
+        The shutdown returns once the shutdown timeout of the configuration passed, even if some
+        sources or writers didn't stop yet
         """
+        if self._stopping:
+            # Already stopped (or stopping) on another thread
+            return
+        self._stopping = True
         self._active = False
-        for exec_queue in self._queues.values():
-            exec_queue.put(None)
+        self._wakeup.set()
+        deadline = time.monotonic() + self.config.shutdown_timeout
+        # Keep some time for flushing the writers
+        executors_deadline = deadline - min(self.config.stop_timeout, self.config.shutdown_timeout / 2)
         for executor in self.executors:
-            executor.shutdown()
+            # Running executions don't wait for their remaining sources
+            executor.interrupt()
+        for exec_queue in self._queues.values():
+            self._stop_queue(exec_queue)
+        try:
+            self._join_workers(min(10.0, get_remaining(executors_deadline)))
+            shutdown = Shutdown('executors', executors_deadline)
+            writers = list(self.config.writers)
+            for executor in self.executors:
+                shutdown.add(executor.collection_name,
+                             functools.partial(executor.shutdown, stop_writers=False, deadline=executors_deadline))
+                writers.extend(executor.writers)
+            shutdown.run()
+            Shutdown.stop_writers(writers, deadline, self.config.stop_timeout)
+        finally:
+            self._stopped.set()
+
+    @staticmethod
+    def _stop_queue(exec_queue: queue.Queue):
+        """
+        Discards the pending executions of the given queue and tells its worker to stop
+        """
+        try:
+            while True:
+                exec_queue.get_nowait()
+                exec_queue.task_done()
+        except queue.Empty:
+            pass
+        exec_queue.put_nowait(None)
+
+    def _join_workers(self, timeout: float = 10):
+        """
+        Waits until the currently running executions have been completed
+        :param timeout: Max time to wait for all workers in seconds
+        """
+        deadline = time.monotonic() + timeout
+        for worker_thread in list(self._worker_threads.values()):
+            if worker_thread is threading.current_thread():
+                continue
+            worker_thread.join(max(0.0, deadline - time.monotonic()))
@@ -1,24 +1,37 @@
 import os
 from os import listdir
 from os.path import isfile
-from typing import List
+from typing import List, Optional
 
 from pollect.Requirements import DependencyRequirements
 from pollect.core.Log import Log
+from pollect.core.PluginIndex import INDEX
+from pollect.core.ProcessIsolation import IsolatedSource, ISOLATION_PROCESS, ISOLATION_THREAD
+from pollect.core.WriterQueue import QueuedWriter
 from pollect.sources.Source import Source
 from pollect.writers.Writer import Writer, DryRunWriter
 
 
 class ObjectFactory(Log):
     """
-    Generic factory for creating objects
+    Generic factory for creating objects.
+
+    The modules are imported on demand: the plugin index tells which module defines a class, so only
+    the modules which are actually used get imported (together with their dependencies).
+    Modules which aren't part of the index are only imported if a class can't be found otherwise.
+    """
+
+    _modules: Optional[List[object]] = None
+    """
+    All modules of the package, only imported if a class isn't part of the index
     """
 
     def __init__(self, base_name: str):
         super().__init__()
         self._base_module = base_name
         self._files = self._get_files()
-        self._modules = self._get_modules(self._files)
+        self._index = INDEX.get(base_name, {})
+        self._modules = None
 
     def create(self, class_name: str, *init_args) -> object:
         """
@@ -27,6 +40,15 @@ class ObjectFactory(Log):
         :param init_args: Constructor arguments
         :return: Object
         """
+        return self.get_class(class_name)(*init_args)
+
+    def get_class(self, class_name: str):
+        """
+        Returns the class object of the given class name
+
+        :param class_name: Class name
+        :return: Class
+        """
         class_obj = self._get_class_obj(class_name)
         if class_obj is None:
             # Check if we know the dependencies
@@ -34,7 +56,7 @@ class ObjectFactory(Log):
             raise AttributeError(f'Class {class_name} not found in module {self._base_module} - missing dependencies?\n'
                                  f'{text}\n\n'
                                  f'Try running with --debug for more details\n')
-        return class_obj(*init_args)
+        return class_obj
 
     def _get_files(self) -> List[str]:
         """
@@ -74,7 +96,19 @@ class ObjectFactory(Log):
             except AttributeError:
                 return None
 
-        # Search for the class in all known modules
+        module = self._index.get(class_name)
+        if module is not None:
+            try:
+                module_obj = self._import('pollect.' + self._base_module + '.' + module)
+            except ImportError as e:
+                self.log.debug('Could not import {}: {}'.format(module, str(e)))
+                return None
+            return getattr(module_obj, class_name, None)
+
+        # Search for the class in all modules which aren't indexed
+        if self._modules is None:
+            indexed = set(self._index.values())
+            self._modules = self._get_modules([file for file in self._files if file not in indexed])
         for module_obj in self._modules:
             try:
                 return getattr(module_obj, class_name)
@@ -88,7 +122,33 @@ class SourceFactory:
         self.global_conf = global_conf
         self._object_factory = ObjectFactory('sources')
 
-    def create(self, source_data):
+    def create(self, source_data, isolation: Optional[str] = None):
+        """
+        Creates a new source
+
+        :param source_data: Source configuration
+        :param isolation: Default isolation of the executor, may be overwritten by the source configuration
+        :return: Source
+        """
+        isolation = source_data.get('isolation', isolation)
+        if isolation is None or isolation == ISOLATION_THREAD:
+            return self.create_local(source_data)
+        if isolation != ISOLATION_PROCESS:
+            raise ValueError(f'Invalid isolation {isolation}, must be {ISOLATION_THREAD} or {ISOLATION_PROCESS}')
+
+        # Make sure the class exists before starting the worker process
+        self._object_factory.get_class(source_data.get('type') + 'Source')
+        source_obj = IsolatedSource(source_data)
+        source_obj.setup_source(self.global_conf)
+        return source_obj
+
+    def create_local(self, source_data):
+        """
+        Creates a new source which is executed in the current process
+
+        :param source_data: Source configuration
+        :return: Source
+        """
         source_type = source_data.get('type')
         class_name = source_type + 'Source'
         source_obj = self._object_factory.create(class_name, source_data)
@@ -128,6 +188,9 @@ class WriterFactory:
         writer = self._object_factory.create(class_name, writer_config)
         if not isinstance(writer, Writer):
             raise TypeError('Class ' + class_name + ' does not inherit from "Writer"')
+        queue_size = writer_config.get('queueSize')
+        if queue_size is not None:
+            writer = QueuedWriter(writer, queue_size, writer_config.get('queuePolicy', QueuedWriter.DROP_OLDEST))
         old_writers = self._writer_cache.get(class_name)
         if old_writers is None:
             # New class type
@@ -143,3 +206,17 @@ class WriterFactory:
         # New writer - add it to the singleton cache
         writer.start()
         self._writer_cache[class_name].append(writer)
+        return writer
+
+    def release(self, writer: Writer):
+        """
+        Removes the given writer from the cache, so it won't be reused anymore.
+        The writer has to be stopped by the caller
+
+        :param writer: Writer
+        """
+        for writers in self._writer_cache.values():
+            for idx, cached in enumerate(writers):
+                if cached is writer:
+                    del writers[idx]
+                    return
@@ -0,0 +1,55 @@
+"""
+Maps the class names of all sources and writers to the module which defines them.
+Generated by `python -m pollect.libs.PluginIndexGenerator`, do not edit.
+"""
+
+INDEX = {
+    'sources': {
+        'AppStoreConnectSource': 'AppStoreConnectSource',
+        'AsyncDummySource': 'DummySource',
+        'BaseSource': 'Source',
+        'BindSource': 'BindSource',
+        'CertificateSource': 'CertificateSource',
+        'DiskUsageSource': 'DiskUsageSource',
+        'DummySource': 'DummySource',
+        'EspHomeSource': 'EspHomeSource',
+        'EvccSource': 'EvccSource',
+        'FritzSource': 'FritzSource',
+        'GdcSource': 'GdcSource',
+        'HomematicIpSource': 'HomematicIpSource',
+        'HttpIngressSource': 'HttpIngressSource',
+        'HttpSource': 'HttpSource',
+        'IOSource': 'IOSource',
+        'InterfaceSource': 'InterfaceSource',
+        'K8sNamespaceTrafficSource': 'K8sNamespaceTrafficSource',
+        'LoadAvgSource': 'Source',
+        'MMISource': 'MMISource',
+        'MemoryUsageSource': 'MemoryUsageSource',
+        'OpenhabSource': 'OpenhabSource',
+        'PlexSource': 'PlexSource',
+        'PmccSource': 'PmccSource',
+        'ProcessSource': 'ProcessSource',
+        'SensorsSource': 'SensorsSource',
+        'SmaEnergyMeterSource': 'SmaEnergyMeterSource',
+        'SmaPvModbusSource': 'SmaPvModbusSource',
+        'SmartCtlSource': 'SmartCtlSource',
+        'SnmpGetSource': 'SnmpGetSource',
+        'Source': 'Source',
+        'TcpTimeSource': 'TcpTimeSource',
+        'TelemetrySource': 'TelemetrySource',
+        'TpLinkEapSource': 'TpLinkEapSource',
+        'ViessmannSource': 'ViessmannSource',
+        'ZfsSource': 'ZfsSource',
+        'ZodiacPoolSource': 'ZodiacPoolSource',
+    },
+    'writers': {
+        'DryRunWriter': 'Writer',
+        'InMemoryWriter': 'Writer',
+        'MqttWriter': 'MqttWriter',
+        'OtelWriter': 'OtelWriter',
+        'ParallelInMemoryWriter': 'Writer',
+        'PrometheusSslWriter': 'PrometheusSslWriter',
+        'PrometheusWriter': 'PrometheusWriter',
+        'Writer': 'Writer',
+    },
+}
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import traceback
+from multiprocessing.connection import Connection
+from typing import List, Optional, Dict
+
+from pollect.core.Log import Log
+from pollect.core.ValueSet import ValueSet
+from pollect.sources.Source import BaseSource
+
+ISOLATION_THREAD = 'thread'
+ISOLATION_PROCESS = 'process'
+
+_PROBE = 'probe'
+_STOP = 'stop'
+
+
+def _worker_main(conn: Connection, source_config, raw_config: Dict[str, any], log_level: int):
+    """
+    Entry point of the worker process.
+    Creates the actual source and probes it whenever the parent requests it
+    """
+    # Imported here to avoid a circular import with the factories
+    from pollect.core.Core import Configuration
+    from pollect.core.Factories import SourceFactory
+
+    Log.setup()
+    Log.log_level = log_level
+    try:
+        global_conf = Configuration(raw_config)
+        source = SourceFactory(global_conf).create_local(source_config)
+    except Exception as e:
+        traceback.print_exc()
+        conn.send((False, f'{type(e).__name__}: {e}'))
+        return
+    # Tells the parent that the source is ready, the probe timeout only starts afterwards
+    conn.send((True, None))
+    try:
+        while True:
+            command = conn.recv()
+            if command == _STOP:
+                break
+            try:
+                results = source.probe()
+                conn.send((True, [value_set.serialize() for value_set in results]))
+            except Exception as e:
+                traceback.print_exc()
+                conn.send((False, f'{type(e).__name__}: {e}'))
+    except (EOFError, KeyboardInterrupt):
+        # Parent is gone
+        pass
+    finally:
+        source.shutdown()
+
+
+class IsolatedSource(BaseSource):
+    """
+    Proxy for a source which is executed in its own, persistent worker process.
+    This moves CPU heavy parsing out of the GIL of the main process.
+    The results are transferred as serialized value sets.
+
+    If the source has a probe timeout, the worker process is terminated and restarted
+    when the timeout is exceeded.
+    """
+
+    startup_timeout: float = 60
+    """
+    Max. time in seconds the worker process may take to start and set up the source
+    """
+
+    _process: Optional[multiprocessing.Process] = None
+    _conn: Optional[Connection] = None
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._source_config = config
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context('spawn')
+        self.startup_timeout = float(config.get('startupTimeout', 60))
+
+    def setup_source(self, global_conf):
+        super().setup_source(global_conf)
+        with self._lock:
+            self._start()
+
+    def probe(self) -> List[ValueSet]:
+        # Name and static labels have already been applied by the source in the worker
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self.log.warning(f'Worker process of {self} is not running, restarting')
+                self._start()
+
+            try:
+                self._conn.send(_PROBE)
+                if not self._conn.poll(self.probe_timeout):
+                    self._stop(terminate=True)
+                    raise TimeoutError(f'Worker process of {self} did not respond within {self.probe_timeout} '
+                                       f'seconds and has been terminated')
+                success, data = self._conn.recv()
+            except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+                self._stop(terminate=True)
+                raise RuntimeError(f'Worker process of {self} terminated unexpectedly: {e}')
+
+        if not success:
+            raise RuntimeError(f'Probe in worker process failed: {data}')
+        return [ValueSet.deserialize(value_set) for value_set in data]
+
+    def shutdown(self):
+        with self._lock:
+            self._stop(terminate=False)
+
+    def _start(self):
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(target=_worker_main,
+                                              args=(child_conn, self._source_config,
+                                                    self.global_conf.raw_config, Log.log_level),
+                                              name=f'pollect-{self}', daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+        # Wait until the worker is ready, so starting the interpreter doesn't count towards the probe timeout
+        try:
+            if not self._conn.poll(self.startup_timeout):
+                self._stop(terminate=True)
+                raise TimeoutError(f'Worker process of {self} did not start within {self.startup_timeout} seconds')
+            success, error = self._conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+            self._stop(terminate=True)
+            raise RuntimeError(f'Worker process of {self} terminated during startup: {e}')
+        if not success:
+            self._stop(terminate=True)
+            raise RuntimeError(f'Could not set up {self} in worker process: {error}')
+
+    def _stop(self, terminate: bool):
+        if self._process is None:
+            return
+        if not terminate:
+            try:
+                self._conn.send(_STOP)
+                self._process.join(5)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(5)
+        self._conn.close()
+        self._conn = None
+        self._process = None
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType, CodeType
+from typing import Dict, Optional, List
+
+from pollect.core.Log import Log
+
+_activities: Dict[int, str] = {}
+"""
+Source or writer which is currently run by each thread, mapped by the thread identifier
+"""
+
+
+class Activity:
+    """
+    Marks the current thread as running the given source or writer,
+    so the samples of the profiler can be attributed to it.
+    Does nothing if the profiler isn't running
+    """
+
+    __slots__ = ('label', '_ident', '_previous')
+
+    def __init__(self, label: str):
+        self.label = label
+        self._ident = None
+        self._previous = None
+
+    def __enter__(self):
+        if Profiler.active:
+            self._ident = threading.get_ident()
+            self._previous = _activities.get(self._ident)
+            _activities[self._ident] = self.label
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._ident is None:
+            return
+        if self._previous is None:
+            _activities.pop(self._ident, None)
+        else:
+            _activities[self._ident] = self._previous
+        self._ident = None
+
+
+class Profiler(Log):
+    """
+    Sampling profiler for the threads of pollect.
+
+    The stack of every thread is sampled periodically and attributed to the source or writer the thread is
+    currently running (see `Activity`), or to the thread name otherwise.
+    The samples are written as collapsed stacks (one file per interval) which can be read by
+    flame graph tools such as `flamegraph.pl` or speedscope.
+    """
+
+    active: bool = False
+    """
+    True while any profiler is running
+    """
+
+    _samples: Counter
+
+    def __init__(self, output_dir: str, interval: float = 60, sample_rate: float = 100):
+        """
+        :param output_dir: Directory the collapsed stack files are written to
+        :param interval: Time in seconds after which a new file is started
+        :param sample_rate: Number of samples per second
+        """
+        super().__init__()
+        if sample_rate <= 0:
+            raise ValueError(f'Invalid sample rate {sample_rate}')
+        self.output_dir = output_dir
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self._samples = Counter()
+        self._frame_names: Dict[CodeType, str] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._files = 0
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        Profiler.active = True
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='pollect-profiler', daemon=True)
+        self._thread.start()
+        self.log.info(f'Profiling with {self.sample_rate} samples per second, writing to {self.output_dir}')
+
+    def stop(self):
+        """
+        Stops sampling and writes the remaining samples
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        Profiler.active = False
+        _activities.clear()
+
+    def sample(self):
+        """
+        Takes a single sample of all threads except the profiler itself
+        """
+        own_ident = threading.get_ident()
+        names = dict((thread.ident, thread.name) for thread in threading.enumerate())
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            label = _activities.get(ident) or names.get(ident, f'thread-{ident}')
+            self._samples[self._collapse(label, frame)] += 1
+
+    def flush(self) -> Optional[str]:
+        """
+        Writes the collected samples to a new file
+
+        :return: Path of the file, None if there haven't been any samples
+        """
+        samples = self._samples
+        self._samples = Counter()
+        if len(samples) == 0:
+            return None
+
+        self._files += 1
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.output_dir, f'pollect-{timestamp}-{self._files}.collapsed')
+        with open(path, 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f'{stack} {count}\n')
+        self.log.debug(f'Wrote {sum(samples.values())} samples to {path}')
+        return path
+
+    def _run(self):
+        period = 1 / self.sample_rate
+        next_flush = time.monotonic() + self.interval
+        while not self._stopped.wait(period):
+            self.sample()
+            if time.monotonic() >= next_flush:
+                next_flush += self.interval
+                self.flush()
+        self.flush()
+
+    def _collapse(self, label: str, frame: FrameType) -> str:
+        """
+        Converts the stack of the given frame into the collapsed format (root first, separated by ;)
+        """
+        names: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            name = self._frame_names.get(code)
+            if name is None:
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                name = self._frame_names[code] = f'{module}:{code.co_name}'.replace(';', ':').replace(' ', '_')
+            names.append(name)
+            frame = frame.f_back
+        names.append(label.replace(';', ':').replace(' ', '_'))
+        names.reverse()
+        return ';'.join(names)
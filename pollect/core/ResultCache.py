@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List, Optional, Callable, Tuple
+
+from pollect.core.Log import Log
+from pollect.core.ValueSet import ValueSet
+
+
+class ResultCache(Log):
+    """
+    Caches the results of a single slow source.
+
+    The cached results are returned until they are older than the ttl. Once they reached the refresh-ahead
+    point, a single background refresh is requested while the cached results are still being served.
+    If the results couldn't be refreshed before the ttl expired, they are evicted and the source is probed
+    synchronously again.
+    """
+
+    ttl: float
+    """
+    Time in seconds the results are valid
+    """
+
+    refresh_ahead: float
+    """
+    Fraction of the ttl after which the results are refreshed in the background
+    """
+
+    refreshing: bool = False
+    """
+    True while a background refresh is running
+    """
+
+    failures: int = 0
+    """
+    Number of failed background refreshes since the last successful one
+    """
+
+    _entry: Optional[Tuple[float, List[Tuple]]] = None
+    """
+    Time at which the results have been stored and the serialized results
+    """
+
+    def __init__(self, name: str, ttl: float, refresh_ahead: float, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        if ttl <= 0:
+            raise ValueError(f'Invalid cache ttl {ttl} for {name}')
+        if not 0 <= refresh_ahead <= 1:
+            raise ValueError(f'Invalid refresh ahead {refresh_ahead} for {name}, must be between 0 and 1')
+        self.name = name
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entry = None
+
+    def get(self) -> Optional[List[ValueSet]]:
+        """
+        Returns a copy of the cached results
+
+        :return: Value sets, None if there are no valid results
+        """
+        with self._lock:
+            if self._entry is None:
+                return None
+            stored, data = self._entry
+            if self._clock() - stored >= self.ttl:
+                self.log.debug(f'Cached results of {self.name} expired')
+                self._entry = None
+                return None
+        # The callers modify the value sets, so each caller gets its own copy
+        return [ValueSet.deserialize(value_set) for value_set in data]
+
+    def start_refresh(self) -> bool:
+        """
+        Checks if the cached results should be refreshed in the background.
+        Only one refresh is requested at a time
+
+        :return: True if the caller should refresh the results
+        """
+        with self._lock:
+            if self.refreshing or self._entry is None:
+                return False
+            if self._clock() - self._entry[0] < self.ttl * self.refresh_ahead:
+                return False
+            self.refreshing = True
+            return True
+
+    def put(self, value_sets: List[ValueSet]):
+        """
+        Stores the results of a successful probe
+        """
+        data = [value_set.serialize() for value_set in value_sets]
+        with self._lock:
+            self._entry = (self._clock(), data)
+            self.refreshing = False
+            self.failures = 0
+
+    def refresh_failed(self):
+        """
+        Called if a background refresh failed.
+        The cached results are kept until they expire, the next access requests a new refresh
+        """
+        with self._lock:
+            self.refreshing = False
+            self.failures += 1
+
+    def clear(self):
+        with self._lock:
+            self._entry = None
+            self.refreshing = False
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Tuple, Optional, Iterator, Iterable
+
+from pollect.core.ValueSet import ValueSet, intern_labels
+
+SeriesKey = Tuple[str, Optional[str], Tuple[str, ...], Tuple[str, ...]]
+"""
+Identity of a series: value set name, value name, label names and label values
+"""
+
+
+class SeriesRegistry:
+    """
+    Assigns a compact integer ID to each series.
+
+    A series is identified by its value set name, value name, label names and label values.
+    The ID is assigned once when the series is seen for the first time, afterwards it's resolved
+    with a single hash lookup. Each component which keeps state per series owns its own registry
+    and releases the series it no longer tracks, so the registry only holds the current series.
+    IDs are never reused, a released series gets a new ID once it's seen again.
+    """
+
+    _ids: Dict[SeriesKey, int]
+    _series: Dict[int, SeriesKey]
+
+    def __init__(self):
+        self._ids = {}
+        self._series = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def get_id(self, set_name: str, name: Optional[str], label_names: Tuple[str, ...],
+               label_values: Tuple[str, ...]) -> int:
+        """
+        Returns the ID of the given series, a new ID is assigned if the series is unknown
+
+        :param set_name: Name of the value set
+        :param name: Name of the value, None if the value set name is used
+        :param label_names: Label names
+        :param label_values: Label values
+        :return: Series ID
+        """
+        key = (set_name, name, label_names, label_values)
+        series_id = self._ids.get(key)
+        if series_id is not None:
+            return series_id
+        with self._lock:
+            series_id = self._ids.get(key)
+            if series_id is None:
+                series_id = self._next_id
+                self._next_id += 1
+                self._series[series_id] = key
+                self._ids[key] = series_id
+            return series_id
+
+    def get(self, series_id: int) -> SeriesKey:
+        """
+        Returns the series of the given ID
+
+        :param series_id: Series ID
+        :return: Value set name, value name, label names and label values
+        """
+        return self._series[series_id]
+
+    def release(self, series_ids: Iterable[int]):
+        """
+        Removes the given series, unknown IDs are ignored
+
+        :param series_ids: IDs of the series which are no longer used
+        """
+        with self._lock:
+            for series_id in series_ids:
+                key = self._series.pop(series_id, None)
+                if key is not None:
+                    del self._ids[key]
+
+    def rows(self, value_set: ValueSet) -> Iterator[Tuple[int, Optional[str], Tuple[str, ...], float]]:
+        """
+        Iterates over the values of the given set together with their series IDs
+
+        :param value_set: Value set
+        :return: Series ID, value name, label values and value of each row
+        """
+        set_name = value_set.name
+        label_names = intern_labels(value_set.get_labels())
+        get_id = self.get_id
+        for name, label_values, value in value_set.rows():
+            yield get_id(set_name, name, label_names, label_values), name, label_values, value
+
+    def __len__(self) -> int:
+        return len(self._series)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from typing import List, Optional, Callable, Tuple
+
+from pollect.core.Log import Log
+from pollect.writers.Writer import Writer
+
+
+def get_remaining(deadline: float) -> float:
+    """
+    Returns the time in seconds until the given monotonic clock deadline, at least 0
+    """
+    return max(0.0, deadline - time.monotonic())
+
+
+class Shutdown(Log):
+    """
+    Stops multiple components (executors, sources or writers) concurrently.
+
+    Each component is stopped in its own thread. `run` returns once all components stopped,
+    or their timeout or the overall deadline passed. Components which didn't stop in time are
+    left behind, their threads don't keep the process from exiting.
+    """
+
+    _components: List[Tuple[str, Callable[[], None]]]
+
+    def __init__(self, name: str, deadline: float, timeout: Optional[float] = None):
+        """
+        :param name: Name of the shutdown (used for logging)
+        :param deadline: Monotonic clock time at which the shutdown returns at the latest
+        :param timeout: Max. time in seconds a single component may take to stop, None to only use the deadline
+        """
+        super().__init__()
+        self.name = name
+        self.deadline = deadline
+        self.timeout = timeout
+        self._components = []
+
+    def add(self, name: str, func: Callable[[], None]):
+        """
+        Adds a component which should be stopped
+
+        :param name: Name of the component
+        :param func: Function which stops the component
+        """
+        self._components.append((name, func))
+
+    def run(self) -> List[str]:
+        """
+        Stops all components
+
+        :return: Names of the components which didn't stop in time
+        """
+        start = time.monotonic()
+        deadline = self.deadline
+        if self.timeout is not None:
+            deadline = min(deadline, start + self.timeout)
+
+        threads = []
+        for name, func in self._components:
+            thread = threading.Thread(target=self._stop, args=[name, func], name=f'stop-{name}', daemon=True)
+            thread.start()
+            threads.append((name, thread))
+
+        pending = []
+        for name, thread in threads:
+            thread.join(get_remaining(deadline))
+            if thread.is_alive():
+                pending.append(name)
+        if len(pending) > 0:
+            self.log.warning(f'{self.name}: {", ".join(pending)} did not stop within '
+                             f'{time.monotonic() - start:.1f} seconds, continuing without them')
+        return pending
+
+    def _stop(self, name: str, func: Callable[[], None]):
+        try:
+            func()
+        except Exception as e:
+            self.log.error(f'{self.name}: Could not stop {name}: {e}')
+
+    @staticmethod
+    def stop_writers(writers: List[Writer], deadline: float, timeout: Optional[float] = None) -> List[str]:
+        """
+        Writes the buffered data of the given writers and stops them concurrently.
+        Writers which are listed multiple times are only stopped once
+
+        :param writers: Writers
+        :param deadline: Monotonic clock time at which the shutdown returns at the latest
+        :param timeout: Max. time in seconds a single writer may take to stop
+        :return: Names of the writers which didn't stop in time
+        """
+        shutdown = Shutdown('writers', deadline, timeout)
+        stopped: List[Writer] = []
+        for writer in writers:
+            if any(writer is other for other in stopped):
+                continue
+            stopped.append(writer)
+            shutdown.add(type(writer).__name__, functools.partial(Shutdown._stop_writer, writer))
+        return shutdown.run()
+
+    @staticmethod
+    def _stop_writer(writer: Writer):
+        writer.flush()
+        writer.stop()
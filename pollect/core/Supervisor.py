@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import functools
+import multiprocessing
+import threading
+import time
+import zlib
+from multiprocessing.connection import Connection
+from typing import List, Dict, Optional, Tuple
+
+from pollect.core.Core import Configuration, Executor
+from pollect.core.ExecutionScheduler import ExecutionScheduler
+from pollect.core.Log import Log
+from pollect.core.Shutdown import Shutdown, get_remaining
+from pollect.core.ValueSet import ValueSet
+from pollect.sources.Source import Source
+from pollect.writers.Writer import Writer
+
+
+def get_shard(collection: str, worker_count: int) -> int:
+    """
+    Returns the index of the worker process which executes the given collection.
+    The assignment is stable across restarts
+
+    :param collection: Collection name of the executor
+    :param worker_count: Number of worker processes
+    :return: Worker index
+    """
+    return zlib.crc32(str(collection).encode('utf-8')) % worker_count
+
+
+class ResultPipeWriter(Writer):
+    """
+    Used by the executors of a worker process.
+    Sends all results to the supervisor process which owns the actual writers
+    """
+
+    def __init__(self, conn: Connection, send_lock: threading.Lock, executor_idx: int, executor: Executor,
+                 partial_write: bool):
+        super().__init__(None)
+        self._conn = conn
+        self._send_lock = send_lock
+        self._executor_idx = executor_idx
+        self._partial_write = partial_write
+        self._source_keys: Dict[Source, int] = dict((source, idx) for idx, source in enumerate(executor._sources))
+
+    def supports_partial_write(self) -> bool:
+        return self._partial_write
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def write(self, data: List[ValueSet], source_ref: Optional[Source] = None):
+        source_idx = self._source_keys.get(source_ref)
+        message = (self._executor_idx, source_idx, self._partial_write, [value_set.serialize() for value_set in data])
+        with self._send_lock:
+            self._conn.send(message)
+
+
+def _worker_main(conn: Connection, raw_config: Dict[str, any], executor_indices: List[int],
+                 partial_writes: Dict[int, bool], log_level: int):
+    """
+    Entry point of a worker process.
+    Executes the given executors and sends their results to the supervisor
+    """
+    Log.setup()
+    Log.log_level = log_level
+    config = Configuration(raw_config)
+    executors = config.create_executors(lambda idx, item: idx in executor_indices, with_writers=False)
+    send_lock = threading.Lock()
+    for executor_idx, executor in zip(executor_indices, executors):
+        executor.writers = [ResultPipeWriter(conn, send_lock, executor_idx, executor, partial_writes[executor_idx])]
+
+    scheduler = ExecutionScheduler(config, executors)
+
+    def wait_for_stop():
+        # Any message (or a closed pipe) from the supervisor terminates the worker
+        try:
+            conn.recv()
+        except (EOFError, OSError):
+            pass
+        scheduler.stop()
+
+    threading.Thread(target=wait_for_stop, daemon=True).start()
+    scheduler.create()
+    scheduler.run()
+
+
+class WorkerProcess:
+    """
+    A worker process as seen by the supervisor
+    """
+
+    def __init__(self, index: int, executor_indices: List[int]):
+        self.index = index
+        self.executor_indices = executor_indices
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn: Optional[Connection] = None
+        self.started_at = 0.0
+        self.crashes = 0
+        """
+        Number of consecutive crashes
+        """
+        self.failed = False
+        """
+        True if the worker crashed too often and isn't restarted anymore
+        """
+
+
+class Supervisor(Log):
+    """
+    Splits the executors across multiple worker processes, so pollect can use more than one CPU core.
+
+    The executors are assigned to the workers using a stable hash of their collection name.
+    The workers stream their results back to the supervisor, which owns all writers.
+    That way there is still only a single prometheus endpoint or mqtt connection.
+    """
+
+    _executors: List[Executor]
+    """
+    Executors of the supervisor, only used for their writers
+    """
+
+    _workers: List[WorkerProcess]
+
+    restart_backoff: float = 1
+    """
+    Initial time in seconds before a crashed worker is restarted, doubled with each consecutive crash
+    """
+
+    max_restart_backoff: float = 300
+    """
+    Upper limit of the time in seconds before a crashed worker is restarted
+    """
+
+    max_restarts: int = 10
+    """
+    Number of consecutive crashes after which a worker isn't restarted anymore
+    """
+
+    stable_time: float = 60
+    """
+    Time in seconds a worker has to run before its crashes are no longer considered consecutive
+    """
+
+    def __init__(self, raw_config: Dict[str, any], worker_count: int, dry_run: bool = False):
+        super().__init__()
+        if worker_count < 1:
+            raise ValueError(f'Invalid worker count {worker_count}')
+        self.config = Configuration(raw_config, dry_run)
+        self._raw_config = raw_config
+        self._worker_count = worker_count
+        self._context = multiprocessing.get_context('spawn')
+        self._stopped = threading.Event()
+        self._executors = []
+        self._workers = []
+
+    def create(self):
+        """
+        Creates the writers of all executors and assigns the executors to the workers
+        """
+        self.config.create_global_writers()
+        assignments: Dict[int, List[int]] = {}
+        for idx, item in enumerate(self.config.config.get('executors')):
+            executor = Executor(None, item, self.config)
+            executor.create_writers(self.config.writers, self.config.writer_factory)
+            self._executors.append(executor)
+            assignments.setdefault(get_shard(executor.collection_name, self._worker_count), []).append(idx)
+
+        for worker_idx, executor_indices in sorted(assignments.items()):
+            self._workers.append(WorkerProcess(worker_idx, executor_indices))
+
+    def run(self):
+        """
+        Starts the worker processes and writes their results until the supervisor is stopped
+        """
+        for worker in self._workers:
+            self._start_worker(worker)
+            threading.Thread(target=self._read_results, args=[worker], daemon=True).start()
+        self._stopped.wait()
+        self.log.debug('Stopped supervisor')
+
+    def stop(self):
+        """
+        Stops all worker processes and writers within the shutdown timeout of the configuration
+        """
+        self._stopped.set()
+        deadline = time.monotonic() + self.config.shutdown_timeout
+        # Keep some time for flushing the writers
+        workers_deadline = deadline - min(self.config.stop_timeout, self.config.shutdown_timeout / 2)
+        shutdown = Shutdown('workers', workers_deadline)
+        for worker in self._workers:
+            shutdown.add(f'worker-{worker.index}',
+                         functools.partial(self._stop_worker, worker, get_remaining(workers_deadline) / 2))
+        shutdown.run()
+
+        writers = []
+        for executor in self._executors:
+            writers.extend(executor.writers)
+        Shutdown.stop_writers(writers, deadline, self.config.stop_timeout)
+
+    def _start_worker(self, worker: WorkerProcess):
+        partial_writes = dict((idx, self._executors[idx].writers[0].supports_partial_write())
+                              for idx in worker.executor_indices)
+        parent_conn, child_conn = self._context.Pipe()
+        worker.process = self._context.Process(target=_worker_main,
+                                               args=(child_conn, self._raw_config, worker.executor_indices,
+                                                     partial_writes, Log.log_level),
+                                               name=f'pollect-worker-{worker.index}', daemon=True)
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        child_conn.close()
+        worker.conn = parent_conn
+        self.log.info(f'Started worker {worker.index} (pid {worker.process.pid}) '
+                      f'for {len(worker.executor_indices)} executors')
+
+    def _stop_worker(self, worker: WorkerProcess, timeout: float = 10):
+        if worker.process is None:
+            return
+        try:
+            worker.conn.send(None)
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+        worker.process.join(timeout)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(timeout)
+
+    def _restart_worker(self, worker: WorkerProcess) -> bool:
+        """
+        Restarts a crashed worker with exponential backoff
+
+        :return: False if the worker isn't restarted anymore
+        """
+        if time.monotonic() - worker.started_at >= self.stable_time:
+            worker.crashes = 0
+        worker.crashes += 1
+        if worker.crashes > self.max_restarts:
+            worker.failed = True
+            self.log.critical(f'Worker {worker.index} crashed {worker.crashes} times in a row, giving up. '
+                              f'Executors {worker.executor_indices} are no longer executed')
+            return False
+
+        delay = min(self.restart_backoff * 2 ** (worker.crashes - 1), self.max_restart_backoff)
+        self.log.error(f'Worker {worker.index} terminated unexpectedly ({worker.crashes} consecutive crashes), '
+                       f'restarting in {delay:.1f} seconds')
+        if self._stopped.wait(delay):
+            return False
+        self._start_worker(worker)
+        return True
+
+    def _read_results(self, worker: WorkerProcess):
+        while not self._stopped.is_set():
+            try:
+                executor_idx, source_idx, partial_write, data = worker.conn.recv()
+            except (EOFError, OSError):
+                if self._stopped.is_set():
+                    return
+                self._stop_worker(worker, timeout=1)
+                if not self._restart_worker(worker):
+                    return
+                continue
+
+            executor = self._executors[executor_idx]
+            value_sets = [ValueSet.deserialize(value_set) for value_set in data]
+            # The source is identified by its position, which is the same in all processes
+            source_key: Optional[Tuple[int, int]] = None if source_idx is None else (executor_idx, source_idx)
+            executor._write(value_sets, source_key, partial_write, allow_empty=partial_write)
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import typing
+from typing import List, Dict, Tuple, Optional
+
+from pollect.core.ValueSet import ValueSet, Value
+
+if typing.TYPE_CHECKING:
+    from pollect.core.ExecutionScheduler import ExecutionScheduler
+    from pollect.core.WriterQueue import QueuedWriter
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets, compatible with the prometheus histogram semantics
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    """
+    Default upper bounds of the buckets in seconds
+    """
+
+    count: int = 0
+    sum: float = 0
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        # The last slot counts the observations above the largest bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Returns the cumulative count of each bucket
+
+        :return: Upper bound (as label value) and count
+        """
+        results = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            results.append((str(bound), total))
+        results.append(('+Inf', self.count))
+        return results
+
+
+class SourceStats:
+    """
+    Probe statistics of a single source
+    """
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.values = 0
+        self.errors = 0
+        self.timeouts = 0
+
+
+class WriterStats:
+    """
+    Write statistics of a single writer
+    """
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.errors = 0
+
+
+class Telemetry:
+    """
+    Collects metrics about pollect itself.
+
+    Recording is disabled until a telemetry source is configured,
+    in which case all `record_` methods return immediately.
+    """
+
+    enabled: bool = False
+    """
+    True if metrics are recorded
+    """
+
+    _sources: Dict[Tuple[str, str], SourceStats]
+    _writers: Dict[str, WriterStats]
+    _executions: Dict[str, Histogram]
+    _queues: List[QueuedWriter]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scheduler: Optional[ExecutionScheduler] = None
+        self._sources = {}
+        self._writers = {}
+        self._executions = {}
+        self._queues = []
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        """
+        Removes all recorded metrics
+        """
+        with self._lock:
+            self._sources.clear()
+            self._writers.clear()
+            self._executions.clear()
+
+    def register_scheduler(self, scheduler: ExecutionScheduler):
+        """
+        Sets the scheduler whose executors and worker pool should be reported
+        """
+        self._scheduler = scheduler
+
+    def register_writer_queue(self, writer: QueuedWriter):
+        """
+        Adds a queued writer whose queue should be reported
+        """
+        with self._lock:
+            self._queues.append(writer)
+
+    def unregister_writer_queue(self, writer: QueuedWriter):
+        with self._lock:
+            self._queues = [item for item in self._queues if item is not writer]
+
+    def record_probe(self, collection: str, source: str, duration: float, value_count: int, failed: bool = False):
+        """
+        Records a single probe
+
+        :param collection: Collection of the executor
+        :param source: Name of the source
+        :param duration: Duration of the probe in seconds
+        :param value_count: Number of values the probe returned
+        :param failed: True if the probe raised an error
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._get_source(collection, source)
+            stats.duration.observe(duration)
+            stats.values += value_count
+            if failed:
+                stats.errors += 1
+
+    def record_timeout(self, collection: str, source: str):
+        """
+        Records a probe which didn't complete in time
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._get_source(collection, source).timeouts += 1
+
+    def record_write(self, writer: str, duration: float, failed: bool = False):
+        """
+        Records a single call of `Writer.write`
+
+        :param writer: Name of the writer
+        :param duration: Duration of the write in seconds
+        :param failed: True if the writer raised an error
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._writers.get(writer)
+            if stats is None:
+                stats = self._writers[writer] = WriterStats()
+            stats.duration.observe(duration)
+            if failed:
+                stats.errors += 1
+
+    def record_execution(self, collection: str, duration: float):
+        """
+        Records a single execution of an executor
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._executions.get(collection)
+            if histogram is None:
+                histogram = self._executions[collection] = Histogram()
+            histogram.observe(duration)
+
+    def collect(self) -> List[ValueSet]:
+        """
+        Returns the current state of all metrics
+
+        :return: Value sets
+        """
+        with self._lock:
+            results = []
+            results.extend(self._collect_histograms(
+                'probe_duration_seconds', ['collection', 'source'],
+                dict((key, stats.duration) for key, stats in self._sources.items())))
+            results.extend(self._collect_histograms(
+                'write_duration_seconds', ['writer'],
+                dict(((key,), stats.duration) for key, stats in self._writers.items())))
+            results.extend(self._collect_histograms(
+                'execution_duration_seconds', ['collection'],
+                dict(((key,), histogram) for key, histogram in self._executions.items())))
+
+            probes = ValueSet(['collection', 'source'])
+            for key, stats in self._sources.items():
+                probes.add(Value(stats.values, list(key), 'probe_values'))
+                probes.add(Value(stats.errors, list(key), 'probe_errors'))
+                probes.add(Value(stats.timeouts, list(key), 'probe_timeouts'))
+            results.append(probes)
+
+            writers = ValueSet(['writer'])
+            for key, stats in self._writers.items():
+                writers.add(Value(stats.errors, [key], 'write_errors'))
+            results.append(writers)
+
+            queues = ValueSet(['writer'])
+            for writer in self._queues:
+                labels = [writer.name]
+                queues.add(Value(writer.pending, labels, 'write_queue_size'))
+                queues.add(Value(max(writer.lag, writer.oldest_age), labels, 'write_queue_lag_seconds'))
+                queues.add(Value(writer.dropped, labels, 'write_queue_dropped'))
+            results.append(queues)
+
+        results.extend(self._collect_scheduler())
+        return [value_set for value_set in results if value_set.size() > 0]
+
+    def _collect_scheduler(self) -> List[ValueSet]:
+        scheduler = self._scheduler
+        if scheduler is None:
+            return []
+
+        executors = ValueSet(['collection'])
+        for executor in scheduler.executors:
+            stats = scheduler.get_stats(executor)
+            labels = [executor.collection_name]
+            executors.add(Value(scheduler.get_queue_depth(executor), labels, 'queue_depth'))
+            executors.add(Value(stats.overruns, labels, 'skipped_ticks'))
+            executors.add(Value(executor.skipped_probes, labels, 'skipped_probes'))
+            executors.add(Value(stats.queue_wait, labels, 'queue_wait_seconds'))
+            executors.add(Value(stats.interval, labels, 'interval_seconds'))
+            executors.add(Value(stats.achieved_rate, labels, 'achieved_rate'))
+
+        pool = ValueSet()
+        worker_pool = scheduler.config.worker_pool
+        if worker_pool is not None:
+            pool.add(Value(worker_pool.max_workers, name='pool_max_workers'))
+            pool.add(Value(worker_pool.workers, name='pool_workers'))
+            pool.add(Value(worker_pool.busy, name='pool_busy'))
+            pool.add(Value(worker_pool.busy / worker_pool.max_workers, name='pool_utilisation'))
+        return [executors, pool]
+
+    def _get_source(self, collection: str, source: str) -> SourceStats:
+        key = (collection, source)
+        stats = self._sources.get(key)
+        if stats is None:
+            stats = self._sources[key] = SourceStats()
+        return stats
+
+    @staticmethod
+    def _collect_histograms(name: str, labels: List[str],
+                            histograms: Dict[Tuple[str, ...], Histogram]) -> List[ValueSet]:
+        buckets = ValueSet(labels + ['le'])
+        totals = ValueSet(list(labels))
+        for key, histogram in histograms.items():
+            for bound, count in histogram.cumulative():
+                buckets.add(Value(count, list(key) + [bound], name + '_bucket'))
+            totals.add(Value(histogram.sum, list(key), name + '_sum'))
+            totals.add(Value(histogram.count, list(key), name + '_count'))
+        return [buckets, totals]
+
+
+telemetry = Telemetry()
+"""
+Process wide telemetry instance
+"""
@@ -1,5 +1,5 @@
 from threading import Lock
-from typing import Dict, List
+from typing import Dict, List, Tuple, Optional
 
 from pollect.core.ValueSet import Value, AvgValue
 
@@ -11,7 +11,7 @@ class ValueCache:
     """
 
     def __init__(self):
-        self._items: Dict[str, AvgValue] = {}
+        self._items: Dict[Tuple[Optional[str], Tuple[str, ...]], AvgValue] = {}
         self._lock = Lock()
 
     def flush_values(self) -> List[Value]:
@@ -1,4 +1,44 @@
-from typing import List, Optional
+from __future__ import annotations
+
+import itertools
+import sys
+import time
+from array import array
+from typing import List, Optional, Tuple, Dict, Iterator, Sequence, Iterable
+
+MAX_INTERNED_LABELS = 100000
+"""
+Max. number of distinct label value tuples which are shared, the cache is cleared once it's exceeded
+"""
+
+_label_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def get_time_ms() -> int:
+    """
+    Returns the current unix time in milliseconds
+    """
+    return time.time_ns() // 1_000_000
+
+
+def intern_labels(label_values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """
+    Converts the given label values into a tuple which is shared by all values with the same labels.
+    The label values themselves are interned as well, so each distinct string is only kept once
+
+    :param label_values: Label values
+    :return: Interned tuple
+    """
+    if label_values is None:
+        return ()
+    key = label_values if type(label_values) is tuple else tuple(label_values)
+    interned = _label_tuples.get(key)
+    if interned is None:
+        if len(_label_tuples) >= MAX_INTERNED_LABELS:
+            _label_tuples.clear()
+        interned = tuple(sys.intern(item) if type(item) is str else item for item in key)
+        _label_tuples[interned] = interned
+    return interned
 
 
 class Value:
@@ -6,22 +46,19 @@ class Value:
     Represents a single value
     """
 
-    value: float = 0
+    __slots__ = ('value', 'name', '_label_values')
+
+    value: float
     """
     Current value
     """
 
-    name: Optional[str] = None
+    name: Optional[str]
     """
     Name of this value
     """
 
-    label_values: List[str]
-    """
-    Values for the labels
-    """
-
-    def __init__(self, value: any, label_values: list = None, name: str = None):
+    def __init__(self, value: any, label_values: Optional[Iterable[str]] = None, name: str = None):
         """
         Creates a new value
         :param value: Value (might be bool or float/int)
@@ -34,14 +71,26 @@ class Value:
             self.value = value
 
         self.name = name
-        self.label_values = [] if label_values is None else label_values  # type: List[str]
+        self._label_values = intern_labels(label_values)
+
+    @property
+    def label_values(self) -> Tuple[str, ...]:
+        """
+        Values for the labels.
+        The tuple can't be changed in place, assign new label values instead
+        """
+        return self._label_values
+
+    @label_values.setter
+    def label_values(self, label_values: Optional[Iterable[str]]):
+        self._label_values = intern_labels(label_values)
 
-    def get_key(self) -> str:
+    def get_key(self) -> Tuple[Optional[str], Tuple[str, ...]]:
         """
         Returns the unique key of this value
         :return: Key
         """
-        return self.name + ''.join(self.label_values)
+        return self.name, self.label_values
 
     def __repr__(self):
         return str(self.value) + ' (' + str(self.name) + ', ' + str(self.label_values) + ')'
@@ -51,12 +100,16 @@ class AvgValue:
     """
     Calculates the average of multiple values
     """
-    count: int = 0
-    sum: float = 0
+    __slots__ = ('count', 'sum', 'base')
+
+    count: int
+    sum: float
     base: Value
 
     def __init__(self, base: Value):
         self.base = base
+        self.count = 0
+        self.sum = 0
         self.add(base)
 
     def add(self, value: Value):
@@ -68,22 +121,34 @@ class AvgValue:
 
 
 class ValueSet:
-    labels: List[str] = []
+    __slots__ = ('labels', 'values', 'time', 'start_ms', 'end_ms', 'name', '_static_labels', '_static_values')
+
+    labels: List[str]
     """
-    Label names
+    Label names, without the static labels
     """
 
-    values: List[Value] = []
+    values: List[Value]
     """
-    All values in this set
+    All values in this set, their label values don't contain the static labels
     """
 
-    time: int = 0
+    time: int
     """
     Timestamp when the measurement was made
     """
 
-    name: str = ''
+    start_ms: int
+    """
+    Unix time in milliseconds at which the probe started, 0 if unknown
+    """
+
+    end_ms: int
+    """
+    Unix time in milliseconds at which the probe completed, 0 if unknown
+    """
+
+    name: str
     """
     Name of this value set
     """
@@ -97,6 +162,12 @@ class ValueSet:
         self.labels = []
         if labels is not None:
             self.labels = labels
+        self.time = 0
+        self.start_ms = 0
+        self.end_ms = 0
+        self.name = ''
+        self._static_labels: Tuple[str, ...] = ()
+        self._static_values: Tuple[str, ...] = ()
 
     def add(self, value: Value):
         """
@@ -105,5 +176,167 @@ class ValueSet:
         """
         self.values.append(value)
 
+    def size(self) -> int:
+        """
+        Returns the number of values in this set.
+        Use this instead of `len(values)`, which creates all `Value` objects of a columnar set
+        """
+        return len(self.values)
+
+    def get_labels(self) -> List[str]:
+        """
+        Returns all label names, including the static labels
+        """
+        if len(self._static_labels) == 0:
+            return self.labels
+        return self.labels + list(self._static_labels)
+
+    def rows(self) -> Iterator[Tuple[Optional[str], Sequence[str], float]]:
+        """
+        Iterates over the values without accessing the `Value` objects.
+        The label values contain the static labels
+
+        :return: Name, label values and value of each value
+        """
+        rows = self._own_rows()
+        if len(self._static_values) == 0:
+            return rows
+        static_values = self._static_values
+        return ((name, label_values + static_values, value) for name, label_values, value in rows)
+
+    def _own_rows(self) -> Iterator[Tuple[Optional[str], Sequence[str], float]]:
+        """
+        Iterates over the values without the static labels
+        """
+        return ((value.name, value.label_values, value.value) for value in self.values)
+
+    def set_static_labels(self, names: Sequence[str], label_values: Sequence[str]):
+        """
+        Sets labels which have the same value for all values of this set.
+        They are only added when the set is read with `get_labels` and `rows`, the labels and values
+        themselves aren't modified. Setting the static labels again replaces the previous ones, so sources
+        can return the same value set in every probe.
+
+        :param names: Label names
+        :param label_values: Label value of each label
+        """
+        self._static_labels = intern_labels(names)
+        self._static_values = intern_labels(label_values)
+
+    def serialize(self) -> Tuple:
+        """
+        Converts this value set into a compact tuple of builtin types,
+        which is cheaper to pickle than the value set itself.
+        The static labels are stored as regular labels
+
+        :return: Tuple which can be restored with `deserialize`
+        """
+        values = tuple((value, name, label_values) for name, label_values, value in self.rows())
+        return self.name, tuple(self.get_labels()), self.time, values, self.start_ms, self.end_ms
+
+    @staticmethod
+    def deserialize(data: Tuple) -> ValueSet:
+        """
+        Restores a value set created by `serialize`
+
+        :param data: Serialized value set
+        :return: Value set
+        """
+        name, labels, timestamp, values, start_ms, end_ms = data
+        value_set = ValueSet(list(labels))
+        value_set.name = name
+        value_set.time = timestamp
+        value_set.start_ms = start_ms
+        value_set.end_ms = end_ms
+        value_set.values = [Value(value, label_values, value_name) for value, value_name, label_values in values]
+        return value_set
+
     def __repr__(self):
-        return self.name + ' ' + str(self.labels) + '\n\t' + '\n\t'.join([str(value) for value in self.values])
+        return self.name + ' ' + str(self.get_labels()) + '\n\t' + '\n\t'.join(
+            [str(value) + ' (' + str(name) + ', ' + str(label_values) + ')' for name, label_values, value in self.rows()])
+
+
+class ColumnarValueSet(ValueSet):
+    """
+    Value set for sources with many values.
+
+    Instead of a `Value` object per value, the values are stored in a float array and the names
+    and label values are dictionary encoded: each distinct string is stored once and the rows only
+    keep its index. Writers can iterate the columns with `rows`, `values` creates read-only `Value` objects
+    on demand for all other users. The values can't be changed in place, use `append` or assign `values`.
+    """
+
+    __slots__ = ('_data', '_names', '_name_table', '_name_codes', '_columns', '_tables', '_codes')
+
+    def __init__(self, labels: Optional[List[str]] = None):
+        self._data = array('d')
+        self._names = array('l')
+        self._name_table: List[Optional[str]] = []
+        self._name_codes: Dict[Optional[str], int] = {}
+        self._columns: Optional[List[array]] = None
+        self._tables: List[List[str]] = []
+        self._codes: List[Dict[str, int]] = []
+        super().__init__(labels)
+
+    @property
+    def values(self) -> Tuple[Value, ...]:
+        """
+        Creates a `Value` object for each value.
+        The result is a tuple, since changes of the returned values would not be applied to this set
+        """
+        return tuple(Value(value, label_values, name) for name, label_values, value in self._own_rows())
+
+    @values.setter
+    def values(self, values: List[Value]):
+        self._data = array('d')
+        self._names = array('l')
+        self._columns = None
+        for value in values:
+            self.add(value)
+
+    def add(self, value: Value):
+        self.append(value.value, value.label_values, value.name)
+
+    def append(self, value: float, label_values: Sequence[str] = (), name: Optional[str] = None):
+        """
+        Adds a new value to this set
+
+        :param value: Value
+        :param label_values: Label values, in the order of the labels of this set
+        :param name: Name of this specific value, if None the name of the set is used
+        """
+        columns = self._columns
+        if columns is None:
+            # The first value defines the number of label columns
+            columns = self._columns = [array('l') for _ in label_values]
+            self._tables = [[] for _ in label_values]
+            self._codes = [{} for _ in label_values]
+        elif len(label_values) != len(columns):
+            raise ValueError(f'Incorrect label count for {name}: Got {len(label_values)} label values '
+                             f'but the set has {len(columns)} label columns')
+
+        for column, table, codes, label_value in zip(columns, self._tables, self._codes, label_values):
+            code = codes.get(label_value)
+            if code is None:
+                code = codes[label_value] = len(table)
+                table.append(sys.intern(label_value) if type(label_value) is str else label_value)
+            column.append(code)
+
+        code = self._name_codes.get(name)
+        if code is None:
+            code = self._name_codes[name] = len(self._name_table)
+            self._name_table.append(name)
+        self._names.append(code)
+        self._data.append(value)
+
+    def size(self) -> int:
+        return len(self._data)
+
+    def _own_rows(self) -> Iterator[Tuple[Optional[str], Sequence[str], float]]:
+        if self._columns is None or len(self._columns) == 0:
+            label_rows = itertools.repeat((), len(self._data))
+        else:
+            # Decoding column by column is considerably faster than row by row
+            label_rows = zip(*([table[code] for code in column] for table, column in zip(self._tables, self._columns)))
+        name_table = self._name_table
+        return zip((name_table[code] for code in self._names), label_rows, self._data)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import List, Deque, Tuple, Callable, Optional
+
+from pollect.core.Log import Log
+
+
+class WorkQueue(Executor):
+    """
+    Submits work of a single executor to the shared worker pool.
+    At most `quota` tasks of the queue are executed at the same time.
+    """
+
+    name: str
+    quota: int
+    """
+    Max. number of concurrently running tasks
+    """
+
+    priority: int
+    """
+    Queues with a higher priority are served first
+    """
+
+    active: int
+    """
+    Number of currently running tasks
+    """
+
+    _tasks: Deque[Tuple[Future, Callable, tuple, dict]]
+
+    def __init__(self, pool: WorkerPool, name: str, quota: int, priority: int = 0):
+        if quota < 1:
+            raise ValueError(f'Invalid thread count {quota} for {name}')
+        self._pool = pool
+        self.name = name
+        self.quota = quota
+        self.priority = priority
+        self.active = 0
+        self._tasks = deque()
+        self._shutdown = False
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of tasks which are waiting for a worker
+        """
+        return len(self._tasks)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        with self._pool.condition:
+            if self._shutdown:
+                raise RuntimeError(f'Cannot schedule new work after shutdown of {self.name}')
+            self._tasks.append((future, fn, args, kwargs))
+            self._pool.on_submit()
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False, timeout: Optional[float] = None):
+        """
+        :param timeout: Max. time in seconds to wait for the tasks. Tasks which didn't start until then are cancelled,
+        running tasks are left behind
+        """
+        with self._pool.condition:
+            self._shutdown = True
+            if cancel_futures:
+                self._cancel_tasks()
+            if wait and not self._pool.condition.wait_for(lambda: self.active == 0 and len(self._tasks) == 0,
+                                                          timeout):
+                self._cancel_tasks()
+            self._pool.remove_queue(self)
+
+    def _cancel_tasks(self):
+        while len(self._tasks) > 0:
+            self._tasks.popleft()[0].cancel()
+
+    def runnable(self) -> int:
+        """
+        Returns the number of tasks which could be executed right now
+        """
+        return min(len(self._tasks), self.quota - self.active)
+
+
+class WorkerPool(Log):
+    """
+    Process wide pool of worker threads shared by all executors.
+
+    Each executor submits its work through its own `WorkQueue`, which limits how many
+    workers the executor can occupy. A free worker picks the next task from the queue with the highest
+    priority; queues with the same priority are served round-robin so one executor can't starve another.
+    Workers are started on demand and terminate after being idle, so the number of threads follows the
+    actual concurrency instead of the number of executors.
+    """
+
+    max_workers: int
+    """
+    Max. number of worker threads
+    """
+
+    _queues: List[WorkQueue]
+
+    def __init__(self, max_workers: int, idle_timeout: float = 60):
+        super().__init__()
+        if max_workers < 1:
+            raise ValueError(f'Invalid worker count {max_workers}')
+        self.max_workers = max_workers
+        self.condition = threading.Condition()
+        self._idle_timeout = idle_timeout
+        self._queues = []
+        self._next_queue = 0
+        self._workers = 0
+        self._idle = 0
+        self._starting = 0
+
+    @property
+    def workers(self) -> int:
+        """
+        Number of currently running worker threads
+        """
+        return self._workers
+
+    @property
+    def busy(self) -> int:
+        """
+        Number of workers which are currently executing a task
+        """
+        return self._workers - self._idle
+
+    def create_queue(self, name: str, quota: int, priority: int = 0) -> WorkQueue:
+        """
+        Creates a new queue for submitting work
+
+        :param name: Name of the queue (used for logging)
+        :param quota: Max. number of concurrently running tasks of this queue
+        :param priority: Priority of the queue, higher values are served first
+        :return: Queue
+        """
+        queue = WorkQueue(self, name, quota, priority)
+        with self.condition:
+            self._queues.append(queue)
+        return queue
+
+    def remove_queue(self, queue: WorkQueue):
+        """
+        Removes the given queue from the pool. Must be called while holding the condition lock
+        """
+        if queue in self._queues:
+            self._queues.remove(queue)
+
+    def on_submit(self):
+        """
+        Called after a task has been added to a queue. Must be called while holding the condition lock
+        """
+        runnable = sum(queue.runnable() for queue in self._queues)
+        # Workers which have been started but aren't waiting yet will pick up work as well
+        if runnable > self._idle + self._starting and self._workers < self.max_workers:
+            self._workers += 1
+            self._starting += 1
+            thread = threading.Thread(target=self._work, name=f'pollect-worker-{self._workers}', daemon=True)
+            thread.start()
+        self.condition.notify()
+
+    def _next_task(self) -> Optional[Tuple[WorkQueue, Tuple[Future, Callable, tuple, dict]]]:
+        """
+        Returns the next task which should be executed.
+        Must be called while holding the condition lock
+        """
+        count = len(self._queues)
+        selected = None
+        for offset in range(count):
+            # Start after the queue which has been served last (round-robin)
+            queue = self._queues[(self._next_queue + offset) % count]
+            if queue.runnable() <= 0:
+                continue
+            if selected is None or queue.priority > selected.priority:
+                selected = queue
+
+        if selected is None:
+            return None
+        self._next_queue = (self._queues.index(selected) + 1) % count
+        selected.active += 1
+        return selected, selected._tasks.popleft()
+
+    def _work(self):
+        with self.condition:
+            self._starting -= 1
+        while True:
+            with self.condition:
+                item = self._next_task()
+                while item is None:
+                    self._idle += 1
+                    notified = self.condition.wait(self._idle_timeout)
+                    self._idle -= 1
+                    item = self._next_task()
+                    if item is None and not notified:
+                        # Idle for too long
+                        self._workers -= 1
+                        return
+
+            queue, (future, fn, args, kwargs) = item
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self.condition:
+                    queue.active -= 1
+                    # Wake up workers waiting for free capacity as well as queues waiting for shutdown
+                    self.condition.notify_all()
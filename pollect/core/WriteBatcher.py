@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List, Optional, Dict, Callable
+
+from pollect.core.Log import Log
+from pollect.core.ValueSet import ValueSet
+from pollect.sources.Source import Source
+from pollect.writers.Writer import Batch
+
+
+class WriteBatcher(Log):
+    """
+    Coalesces the partial writes of an executor.
+
+    The results of the sources are collected for a short window after the first result arrived
+    and then written as a single batch. If a source returns multiple results within the window,
+    only the latest one is written.
+    """
+
+    window: float
+    """
+    Time in seconds the results are collected before they are written
+    """
+
+    batches: int = 0
+    """
+    Number of written batches
+    """
+
+    _pending: Dict[Optional[Source], List[ValueSet]]
+
+    def __init__(self, name: str, window: float, write: Callable[[Batch], None]):
+        """
+        :param name: Name of the executor (used for the thread name)
+        :param window: Time in seconds the results are collected before they are written
+        :param write: Function which writes a batch
+        """
+        super().__init__()
+        if window <= 0:
+            raise ValueError(f'Invalid batch window {window} for {name}')
+        self.name = name
+        self.window = window
+        self.batches = 0
+        self._write = write
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._writing = False
+        self._flush_requested = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, data: List[ValueSet], source: Optional[Source]):
+        """
+        Adds the result of a source to the current batch
+        """
+        with self._condition:
+            if not self._stopped:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f'batch-{self.name}', daemon=True)
+                    self._thread.start()
+                # Re-inserting keeps the order in which the results arrived
+                self._pending.pop(source, None)
+                self._pending[source] = data
+                self._condition.notify_all()
+                return
+        # The batcher has been stopped, write the results directly
+        self._write([(data, source)])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Writes the current batch without waiting for the window to pass
+
+        :param timeout: Max. time in seconds to wait until the batch has been written
+        :return: True if all results have been written
+        """
+        with self._condition:
+            if self._thread is None:
+                return True
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: len(self._pending) == 0 and not self._writing, timeout)
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Writes the current batch and stops the batcher.
+        Results which are added afterwards are written directly
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._pending) > 0 or self._stopped)
+                if len(self._pending) == 0:
+                    return
+                deadline = time.monotonic() + self.window
+                # Collect the results of the window, a flush or stop ends the window early
+                while not self._stopped and not self._flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._flush_requested = False
+                batch = list((data, source) for source, data in self._pending.items())
+                self._pending = {}
+                self._writing = True
+
+            try:
+                self._write(batch)
+                self.batches += 1
+            except Exception as e:
+                self.log.error(f'Could not write batch of {self.name}: {e}')
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Deque, Tuple, Callable
+
+from pollect.core.ChangeFilter import ChangeBatch, Changes
+from pollect.core.Profiler import Activity
+from pollect.core.Telemetry import telemetry
+from pollect.core.ValueSet import ValueSet
+from pollect.sources.Source import Source
+from pollect.writers.Writer import Writer, Batch
+
+
+class QueuedWriter(Writer):
+    """
+    Runs a writer behind a bounded queue with its own dispatcher thread,
+    so a slow writer can't hold up the probes or the other writers.
+
+    If the queue is full, either the oldest pending write is dropped (`drop-oldest`)
+    or the caller waits until there is space again (`block`).
+    """
+
+    DROP_OLDEST = 'drop-oldest'
+    BLOCK = 'block'
+    POLICIES = (DROP_OLDEST, BLOCK)
+
+    writer: Writer
+    """
+    Actual writer
+    """
+
+    size: int
+    """
+    Max. number of pending writes
+    """
+
+    policy: str
+    """
+    Policy which is applied if the queue is full
+    """
+
+    dropped: int = 0
+    """
+    Number of writes which have been dropped because the queue was full
+    """
+
+    lag: float = 0
+    """
+    Time in seconds the last write waited in the queue
+    """
+
+    _queue: Deque[Tuple[float, Callable[[list], None], list, Optional[Callable[[list], None]]]]
+    """
+    Time at which the write has been queued, write function of the writer, its batch
+    and the function which is called with the batch if it's dropped or couldn't be written
+    """
+
+    def __init__(self, writer: Writer, size: int, policy: str = DROP_OLDEST):
+        super().__init__(writer.config)
+        if size < 1:
+            raise ValueError(f'Invalid queue size {size} for {type(writer).__name__}')
+        if policy not in QueuedWriter.POLICIES:
+            raise ValueError(f'Invalid queue policy {policy} for {type(writer).__name__}, '
+                             f'must be one of {QueuedWriter.POLICIES}')
+        self.writer = writer
+        self.name = type(writer).__name__
+        self.size = size
+        self.policy = policy
+        self.dropped = 0
+        self.lag = 0
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._writing = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of writes waiting in the queue
+        """
+        return len(self._queue)
+
+    @property
+    def oldest_age(self) -> float:
+        """
+        Time in seconds the oldest pending write is waiting
+        """
+        with self._condition:
+            if len(self._queue) == 0:
+                return 0
+            return time.monotonic() - self._queue[0][0]
+
+    def supports_partial_write(self) -> bool:
+        return self.writer.supports_partial_write()
+
+    def supports_change_only(self) -> bool:
+        return self.writer.supports_change_only()
+
+    def start(self):
+        self.writer.start()
+        with self._condition:
+            self._stopped = False
+        self._thread = threading.Thread(target=self._dispatch, name=f'writer-{self.name}', daemon=True)
+        self._thread.start()
+        telemetry.register_writer_queue(self)
+
+    def stop(self, timeout: float = 10):
+        """
+        Writes the pending data and stops the writer
+
+        :param timeout: Max. time in seconds to wait for the pending writes
+        """
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+        telemetry.unregister_writer_queue(self)
+        self.writer.stop()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until all pending writes have been written
+
+        :param timeout: Max. time in seconds to wait
+        :return: True if the queue is empty
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._queue) == 0 and not self._writing, timeout)
+
+    def write(self, data: List[ValueSet], source_ref: Optional[Source] = None):
+        self.write_batch([(data, source_ref)])
+
+    def write_batch(self, batch: Batch):
+        self._enqueue(self.writer.write_batch, batch)
+
+    def write_changes(self, batch: ChangeBatch):
+        # Changes which aren't written are written again with the next data
+        self._enqueue(self.writer.write_changes, batch, Changes.reset_batch)
+
+    def _enqueue(self, write: Callable[[list], None], batch: list,
+                 on_failure: Optional[Callable[[list], None]] = None):
+        dropped = None
+        with self._condition:
+            if self.policy == QueuedWriter.BLOCK:
+                self._condition.wait_for(lambda: len(self._queue) < self.size or self._stopped)
+            elif len(self._queue) >= self.size:
+                dropped = self._queue.popleft()
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    self.log.warning(f'Queue of {self.name} is full, dropped {self.dropped} writes so far')
+            self._queue.append((time.monotonic(), write, batch, on_failure))
+            self._condition.notify_all()
+        if dropped is not None and dropped[3] is not None:
+            dropped[3](dropped[2])
+
+    def _dispatch(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._queue) > 0 or self._stopped)
+                if len(self._queue) == 0:
+                    # Stopped and all data has been written
+                    return
+                queued_at, write, batch, on_failure = self._queue.popleft()
+                self._writing = True
+                # Wake up callers waiting for space in the queue
+                self._condition.notify_all()
+
+            start = time.monotonic()
+            self.lag = start - queued_at
+            failed = False
+            try:
+                with Activity(f'writer:{self.name}'):
+                    write(batch)
+            except Exception as e:
+                failed = True
+                self.log.error(f'Could not write data: {e}, sources: {[str(item[1]) for item in batch]}')
+                if on_failure is not None:
+                    on_failure(batch)
+            telemetry.record_write(self.name, time.monotonic() - start, failed)
+
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
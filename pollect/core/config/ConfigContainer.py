@@ -27,6 +27,19 @@ class ConfigContainer:
     def items(self):
         return self._data.items()
 
+    def __eq__(self, other):
+        if isinstance(other, ConfigContainer):
+            other = other._data
+        if not isinstance(other, dict):
+            return False
+        return self._data == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    # The underlying dict is mutable, so containers can't be used as dict keys
+    __hash__ = None
+
     def get(self, key: str, default: any = None, required: bool = False,
             ignore_missing_env: Optional[str] = None) -> Optional[any]:
         if key not in self._data:
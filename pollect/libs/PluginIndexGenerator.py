@@ -0,0 +1,98 @@
+"""
+Generates `pollect/core/PluginIndex.py`, which maps the class names of all sources and writers to their module.
+This allows the factories to import only the modules which are actually used by the configuration.
+
+The index has to be regenerated whenever a source or writer is added, renamed or removed:
+
+    python -m pollect.libs.PluginIndexGenerator
+
+With `--check` the index is only compared with the current sources and plugins (e.g. in CI).
+"""
+import argparse
+import ast
+import os
+import sys
+from typing import Dict, List, Optional
+
+PACKAGES = {
+    'sources': 'Source',
+    'writers': 'Writer',
+}
+"""
+Packages which contain plugins, mapped to the suffix of the plugin class names
+"""
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+
+INDEX_FILE = os.path.join(BASE_DIR, 'core', 'PluginIndex.py')
+
+HEADER = '''"""
+Maps the class names of all sources and writers to the module which defines them.
+Generated by `python -m pollect.libs.PluginIndexGenerator`, do not edit.
+"""
+'''
+
+
+def scan_package(package: str, suffix: str) -> Dict[str, str]:
+    """
+    Finds all plugin classes of the given package without importing the modules
+
+    :param package: Package name relative to `pollect`
+    :param suffix: Suffix of the class names
+    :return: Class name mapped to the module name
+    """
+    index = {}
+    directory = os.path.join(BASE_DIR, package)
+    for file in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file)
+        if not file.endswith('.py') or not os.path.isfile(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and node.name.endswith(suffix) and node.name not in index:
+                index[node.name] = file[:-3]
+    return index
+
+
+def generate() -> str:
+    """
+    Returns the source code of the index module
+    """
+    lines = [HEADER, 'INDEX = {']
+    for package, suffix in PACKAGES.items():
+        lines.append(f"    '{package}': {{")
+        for class_name, module in sorted(scan_package(package, suffix).items()):
+            lines.append(f"        '{class_name}': '{module}',")
+        lines.append('    },')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    """
+    :param args: Command line arguments, None to use `sys.argv`
+    :return: Exit code
+    """
+    parser = argparse.ArgumentParser(description='Generates the index of all sources and writers')
+    parser.add_argument('--check', dest='check', action='store_true',
+                        help='Only check if the index is up to date, without writing it')
+    args = parser.parse_args(args)
+
+    content = generate()
+    if args.check:
+        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+            if f.read() != content:
+                print(f'{INDEX_FILE} is outdated, run python -m pollect.libs.PluginIndexGenerator')
+                return 1
+        print(f'{INDEX_FILE} is up to date')
+        return 0
+
+    with open(INDEX_FILE, 'w', encoding='utf-8') as f:
+        f.write(content)
+    print(f'Wrote {INDEX_FILE}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
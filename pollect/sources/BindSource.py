@@ -3,7 +3,7 @@ from urllib.error import URLError
 from xml.etree import ElementTree
 
 from pollect.core import Helper
-from pollect.core.ValueSet import ValueSet, Value
+from pollect.core.ValueSet import ColumnarValueSet
 from pollect.sources.Source import Source
 
 
@@ -35,7 +35,8 @@ class BindSource(Source):
             value = int(counter.text)
             counter_data['server.queries|' + key] = value
 
-        data = ValueSet(labels=['queryType'])
+        # The cache can contain a lot of rrsets
+        data = ColumnarValueSet(labels=['queryType'])
         for view_name in self.views:
             low_view_name = view_name.lower()
 
@@ -57,8 +58,7 @@ class BindSource(Source):
             for rrset in cache:
                 name = file.get_elem('.//name', root=rrset).text.replace('!', '')
                 value = file.get_elem('.//counter', root=rrset).text
-                data.add(Value(int(value), name=low_view_name + '.cache.rrsets',
-                               label_values=[name.lower()]))
+                data.append(int(value), [name.lower()], low_view_name + '.cache.rrsets')
 
         if self._last_time is not None:
             # Calculate delta for counter values
@@ -66,9 +66,7 @@ class BindSource(Source):
             for key, value in counter_data.items():
                 name, query_type = key.split('|', 2)
                 if key in self._last_counters:
-                    data.add(Value((value - self._last_counters[key]) / time_delta,
-                                   name=name + '_per_sec',
-                                   label_values=[query_type]))
+                    data.append((value - self._last_counters[key]) / time_delta, [query_type], name + '_per_sec')
 
         self._last_time = time.time()
         self._last_counters = counter_data
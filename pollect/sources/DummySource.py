@@ -1,3 +1,4 @@
+import asyncio
 import threading
 from time import sleep
 from typing import Optional
@@ -7,18 +8,56 @@ from pollect.sources.Source import Source
 
 
 class DummySource(Source):
+    """
+    Returns static values, used for testing and benchmarking
+    """
+
+    count: int = 1
+    """
+    Number of values in the value set
+    """
+
+    label_count: int = 0
+    """
+    Number of labels of each value, the first label makes each value unique
+    """
+
     def __init__(self, config):
         super().__init__(config)
         self.value = config.get('value')
         self.sleep_time = config.get('sleep', 0)
         self.callback = config.get('callback', None)
+        self.count = int(config.get('count', 1))
+        self.label_count = int(config.get('labelCount', 0 if self.count == 1 else 1))
+        if self.count > 1 and self.label_count < 1:
+            raise ValueError('Multiple values require at least one label')
 
     def _probe(self) -> Optional[ValueSet]:
         if self.sleep_time > 0:
             sleep(self.sleep_time)
-        data = ValueSet()
-        data.add(Value(self.value))
+        return self._create_data()
+
+    def _create_data(self) -> ValueSet:
+        data = ValueSet([f'label{x}' for x in range(self.label_count)])
+        if self.label_count == 0:
+            data.add(Value(self.value))
+        else:
+            for idx in range(self.count):
+                label_values = [str(idx)] + [f'value{x}' for x in range(1, self.label_count)]
+                data.add(Value(self.value, label_values))
+
         if self.callback is not None:
             threading.Thread(target=self.callback).start()
             self.callback = None
         return data
+
+
+class AsyncDummySource(DummySource):
+    """
+    Same as the dummy source but probed on the event loop of the executor
+    """
+
+    async def _probe(self) -> Optional[ValueSet]:
+        if self.sleep_time > 0:
+            await asyncio.sleep(self.sleep_time)
+        return self._create_data()
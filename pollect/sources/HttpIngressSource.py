@@ -71,7 +71,7 @@ class HttpIngressSource(Source):
             value = data.get('value', 0)
             value_set = self._get_metric(name)
 
-            if metric_def.is_counter() and len(value_set.values) > 0:
+            if metric_def.is_counter() and value_set.size() > 0:
                 # Increment the previous value
                 value += value_set.values[0].value
 
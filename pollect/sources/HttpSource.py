@@ -25,7 +25,7 @@ class HttpSource(Source):
             data = ValueSet(labels=['url'])
             for url in self.url:
                 value = self._probe_url(url)
-                value.label_values = [url]
+                value.label_values = (url,)
                 data.add(value)
         else:
             data = ValueSet()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import os
 import typing
 from abc import abstractmethod
@@ -7,15 +9,16 @@ from typing import Optional, List
 
 from pollect.core import OSEnv
 from pollect.core.Log import Log
-from pollect.core.ValueSet import ValueSet, Value
+from pollect.core.ValueSet import ValueSet, Value, get_time_ms
 
 if typing.TYPE_CHECKING:
     from pollect.core.Core import Configuration
+    from pollect.core.config.ConfigContainer import ConfigContainer
 
 
-class Source(Log):
+class BaseSource(Log):
     """
-    A single metrics source. May return multiple metrics and labels
+    Configuration and lifecycle of a metrics source, independent of how it's probed
     """
 
     type: str = None
@@ -33,14 +36,85 @@ class Source(Log):
     Static labels which should be added to all values
     """
 
+    tick_time: Optional[float] = None
+    """
+    Probe interval of this source in seconds, None to probe it in every tick of the executor
+    """
+
+    every: Optional[int] = None
+    """
+    Probe interval of this source as multiple of the executor tick time
+    """
+
+    probe_timeout: Optional[float] = None
+    """
+    Max. duration of a probe in seconds, None to use the default of the executor
+    """
+
+    on_timeout: Optional[str] = None
+    """
+    Policy (drop, last, nan) which is applied if the probe didn't complete in time
+    """
+
+    cache_ttl: Optional[float] = None
+    """
+    Time in seconds the results of this source are cached, None to probe the source in every tick
+    """
+
+    refresh_ahead: float = 0.8
+    """
+    Fraction of the cache ttl after which the cached results are refreshed in the background
+    """
+
+    circuit_breaker: Optional[bool] = None
+    """
+    True if the source should be paused after consecutive failures, None to use the default of the executor
+    """
+
+    failure_threshold: int = 3
+    """
+    Number of consecutive failures after which the source is paused
+    """
+
+    backoff: Optional[float] = None
+    """
+    Initial time in seconds a failing source is paused, None to use the tick time of the executor
+    """
+
+    max_backoff: float = 600
+    """
+    Upper limit of the time in seconds a failing source is paused
+    """
+
+    config: ConfigContainer
+    """
+    Configuration of this source
+    """
+
     global_conf: Configuration
 
     def __init__(self, config):
         super().__init__(config['type'])
+        self.config = config
         self.name = config.get('name')
 
         self.labels = config.get('labels', {})
         self.type = config['type']
+        tick_time = config.get('tickTime')
+        self.tick_time = None if tick_time is None else float(tick_time)
+        every = config.get('every')
+        self.every = None if every is None else int(every)
+        probe_timeout = config.get('probeTimeout')
+        self.probe_timeout = None if probe_timeout is None else float(probe_timeout)
+        self.on_timeout = config.get('onTimeout')
+        cache_ttl = config.get('cacheTtl')
+        self.cache_ttl = None if cache_ttl is None else float(cache_ttl)
+        self.refresh_ahead = float(config.get('refreshAhead', 0.8))
+        self.circuit_breaker = config.get('circuitBreaker')
+        self.failure_threshold = int(config.get('failureThreshold', 3))
+        backoff = config.get('backoff')
+        self.backoff = None if backoff is None else float(backoff)
+        self.max_backoff = float(config.get('maxBackoff', 600))
 
     def setup_source(self, global_conf):
         """
@@ -51,26 +125,22 @@ class Source(Log):
         """
         self.global_conf = global_conf
 
+    @abstractmethod
     def probe(self) -> List[ValueSet]:
         """
         Probes the data and returns it
 
-        :return: Single value or dict of values where the key is appendix for the data path
+        :return: Value sets
         """
-        results = self._probe()
-        if results is None:
-            return []
-        if isinstance(results, ValueSet):
-            results = [results]
-        for result in results:
-            result.name = self._get_suffix()
 
-            # Add static labels from config
-            result.labels.extend(self.labels.keys())
-            for value in result.values:
-                value.label_values.extend(self.labels.values())
+    def is_async(self) -> bool:
+        """
+        Indicates if this source is probed with `probe_async` on the event loop of the executor
+        instead of the thread pool
 
-        return results
+        :return: True if the source is async
+        """
+        return False
 
     def shutdown(self):
         """
@@ -78,14 +148,6 @@ class Source(Log):
         """
         pass
 
-    @abstractmethod
-    def _probe(self) -> Optional[ValueSet] or List[ValueSet]:
-        """
-        Probes the data and returns it
-
-        :return: Single value or dict of values where the key is appendix for the data path
-        """
-
     def _get_suffix(self) -> str:
         """
         Returns the suffix which should be added
@@ -101,6 +163,84 @@ class Source(Log):
         return self._get_suffix()
 
 
+class Source(BaseSource):
+    """
+    A single metrics source. May return multiple metrics and labels
+    """
+
+    provides_timestamps: bool = False
+    """
+    True if the source sets `start_ms` and `end_ms` of its value sets to the time of the measurement itself,
+    otherwise they are set to the time of each probe
+    """
+
+    def probe(self) -> List[ValueSet]:
+        """
+        Probes the data and returns it
+
+        :return: Single value or dict of values where the key is appendix for the data path
+        """
+        start_ms = get_time_ms()
+        if self.is_async():
+            # Async sources are usually executed by the event loop of the executor,
+            # this is only a fallback if the probe is called directly
+            return self._process_results(asyncio.run(self._probe()), start_ms)
+        return self._process_results(self._probe(), start_ms)
+
+    async def probe_async(self) -> List[ValueSet]:
+        """
+        Probes the data of a source which implements `_probe` as coroutine
+
+        :return: Value sets
+        """
+        start_ms = get_time_ms()
+        return self._process_results(await self._probe(), start_ms)
+
+    def is_async(self) -> bool:
+        """
+        Indicates if this source implements `_probe` as coroutine.
+        Async sources are executed on the event loop of the executor instead of the thread pool
+
+        :return: True if the source is async
+        """
+        return inspect.iscoroutinefunction(self._probe)
+
+    def _process_results(self, results: Optional[ValueSet] or List[ValueSet], start_ms: int) -> List[ValueSet]:
+        """
+        Converts the result of `_probe` into a list and applies the source name, probe time and static labels
+
+        :param results: Result of the probe
+        :param start_ms: Unix time in milliseconds at which the probe started
+        :return: Value sets
+        """
+        if results is None:
+            return []
+        end_ms = get_time_ms()
+        if isinstance(results, ValueSet):
+            results = [results]
+        for result in results:
+            result.name = self._get_suffix()
+            if not self.provides_timestamps or result.end_ms == 0:
+                # Sets which are returned in every probe get the time of the current probe
+                result.start_ms = start_ms
+                result.end_ms = end_ms
+
+            # Static labels from config are applied when the set is written, so sets which are returned
+            # in every probe aren't modified
+            result.set_static_labels(tuple(self.labels.keys()), tuple(self.labels.values()))
+
+        return results
+
+    @abstractmethod
+    def _probe(self) -> Optional[ValueSet] or List[ValueSet]:
+        """
+        Probes the data and returns it.
+        May also be implemented as `async def` for non-blocking sources
+
+        :return: Single value or dict of values where the key is appendix for the data path
+        """
+
+
 class LoadAvgSource(Source):
     def _probe(self):
         if not OSEnv.is_linux():
@@ -1,4 +1,4 @@
-import socket
+import asyncio
 import time
 
 from pollect.core.ValueSet import ValueSet, Value
@@ -16,17 +16,15 @@ class TcpTimeSource(Source):
         self.port = config.get('port')
         self.timeout = config.get('timeout', 10)
 
-    def _probe(self):
+    async def _probe(self):
         data = ValueSet()
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.settimeout(self.timeout)
         try:
             start = time.time() * 1000
-            self.sock.connect((self.host, self.port))
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
             end = time.time() * 1000
-            self.sock.shutdown(socket.SHUT_RDWR)
-            self.sock.close()
+            writer.close()
+            await writer.wait_closed()
             data.add(Value(int(end - start)))
-        except socket.timeout:
+        except asyncio.TimeoutError:
             data.add(Value(self.timeout * 1000))
         return data
@@ -0,0 +1,19 @@
+from typing import List
+
+from pollect.core.Telemetry import telemetry
+from pollect.core.ValueSet import ValueSet
+from pollect.sources.Source import Source
+
+
+class TelemetrySource(Source):
+    """
+    Exports metrics about pollect itself, such as probe and write durations.
+    The metrics are only recorded once this source has been configured
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        telemetry.enable()
+
+    def _probe(self) -> List[ValueSet]:
+        return telemetry.collect()
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import json
 import re
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple
 
 import paho.mqtt.client as mqtt
 
-from pollect.core.ValueSet import ValueSet
+from pollect.core.ChangeFilter import ChangeBatch
+from pollect.core.SeriesRegistry import SeriesKey
+from pollect.core.ValueSet import ValueSet, intern_labels
+from pollect.libs import Utils
 from pollect.sources.Source import Source
 from pollect.writers.Writer import Writer
 
@@ -32,10 +35,17 @@ class MqttWriter(Writer):
 
         self._ha_autodiscovery = self.config.get('hassAutodiscovery', False)
         self._discovery_sent = {}
+        self._paths: Dict[Optional[Source], Dict[SeriesKey, Optional[str]]] = {}
+        """
+        Topic of each series which has been written by a source, None if the series isn't included
+        """
 
     def supports_partial_write(self) -> bool:
         return True
 
+    def supports_change_only(self) -> bool:
+        return True
+
     def start(self):
         self._client = mqtt.Client(client_id='pollect')
         self._client.on_connect_fail = self._on_connect_fail
@@ -54,29 +64,75 @@ class MqttWriter(Writer):
         if not self._client.is_connected():
             self.log.warning('Not connected to mqtt broker')
             return
+        # The data contains all series of the source, so only their topics are kept
+        self._paths[source_ref] = self._publish(data, self._paths.get(source_ref, {}), {})
+
+    def write_changes(self, batch: ChangeBatch):
+        if not self._client.is_connected():
+            # The changes are written again once the connection is back
+            raise ConnectionError('Not connected to mqtt broker')
+        for changes, source_ref in batch:
+            paths = Utils.put_if_absent(self._paths, source_ref, {})
+            # Only the changed series are part of the data, the topics of the unchanged ones are kept
+            self._publish(changes.data, paths, paths)
+            for key in changes.removed:
+                path = paths.pop(key, None)
+                if path is None:
+                    continue
+                # An empty retained message removes the retained value of the topic
+                self.log.debug('Removing message: %s', path)
+                self._client.publish(path, None, retain=True)
+
+    def _publish(self, data: List[ValueSet], previous: Dict[SeriesKey, Optional[str]],
+                 current: Dict[SeriesKey, Optional[str]]) -> Dict[SeriesKey, Optional[str]]:
+        """
+        Publishes the given data
+
+        :param data: Value sets
+        :param previous: Known topic of each series
+        :param current: Receives the topic of each published series
+        :return: Current topics
+        """
         for value_set in data:
-            for value_obj in value_set.values:
-                path = value_set.name
-                if value_obj.name is not None:
-                    path += '/' + value_obj.name
-                for x in range(len(value_set.labels)):
-                    path += '/' + value_set.labels[x] + '/' + value_obj.label_values[x]
-                path = path.lower()
-
-                if len(self._includes) > 0:
-                    included = False
-                    for pattern in self._includes:
-                        if pattern.fullmatch(path):
-                            included = True
-                            break
-                    if not included:
-                        continue
+            label_names = intern_labels(value_set.get_labels())
+            # Iterating the rows doesn't require value objects, which is faster for columnar value sets
+            for name, label_values, value in value_set.rows():
+                key = (value_set.name, name, label_names, label_values)
+                if key in previous:
+                    path = previous[key]
+                else:
+                    path = self._get_path(value_set, name, label_values)
+                current[key] = path
+                if path is None:
+                    continue
 
                 if self._ha_autodiscovery and path not in self._discovery_sent:
-                    self._send_discovery(value_obj.name, path)
+                    self._send_discovery(name, path)
 
                 self.log.debug('Publishing message: %s', path)
-                self._client.publish(path, value_obj.value, retain=True)
+                self._client.publish(path, value, retain=True)
+        return current
+
+    def _get_path(self, value_set: ValueSet, name: Optional[str], label_values: Tuple[str, ...]) -> Optional[str]:
+        """
+        Returns the topic of a single value
+
+        :return: Topic, None if the value isn't included
+        """
+        path = value_set.name
+        if name is not None:
+            path += '/' + name
+        labels = value_set.get_labels()
+        for x in range(len(labels)):
+            path += '/' + labels[x] + '/' + label_values[x]
+        path = path.lower()
+
+        if len(self._includes) > 0:
+            for pattern in self._includes:
+                if pattern.fullmatch(path):
+                    return path
+            return None
+        return path
 
     def _send_discovery(self, name: str, path: str):
         discovery_msg = {
@@ -23,16 +23,24 @@ class OtelWriter(Writer):
     def start(self):
         pass
 
+    def supports_change_only(self) -> bool:
+        # Gauges keep their last value, so unchanged values don't need to be set again
+        return True
+
+    def flush(self):
+        self._provider.force_flush()
+
     def stop(self):
         self._reader.shutdown()
         self._exporter.shutdown()
 
     def write(self, data: List[ValueSet], source_ref: Optional[Source] = None):
         for value_set in data:
-            for value_obj in value_set.values:
+            labels = value_set.get_labels()
+            for _, label_values, value in value_set.rows():
                 gauge = self._get_or_create_gauge(value_set.name)
-                attributes = self._get_attributes_from_labels(value_set.labels, value_obj.label_values)
-                gauge.set(value_obj.value, attributes=attributes)
+                attributes = self._get_attributes_from_labels(labels, label_values)
+                gauge.set(value, attributes=attributes)
 
     def _get_or_create_gauge(self, name: str) -> ObservableGauge:
         """
@@ -1,14 +1,33 @@
 from __future__ import annotations
 import threading
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Type, Sequence, Tuple
 from wsgiref.simple_server import WSGIServer
 
 from prometheus_client import Gauge, registry, exposition, REGISTRY
+from prometheus_client.samples import Sample
 
-from pollect.core.ValueSet import ValueSet, Value
+from pollect.core.SeriesRegistry import SeriesRegistry
+from pollect.core.ValueSet import ValueSet
 from pollect.libs import Utils
 from pollect.sources.Source import Source
-from pollect.writers.Writer import Writer
+from pollect.writers.Writer import Writer, Batch
+
+
+class TimestampedGauge(Gauge):
+    """
+    Gauge which exports the time of the probe together with its value
+    """
+
+    _timestamp: Optional[float] = None
+    """
+    Unix time in seconds at which the value has been measured, None if unknown
+    """
+
+    def set_timestamp(self, timestamp: Optional[float]):
+        self._timestamp = timestamp
+
+    def _child_samples(self) -> Iterable[Sample]:
+        return (Sample('', {}, self._value.get(), self._timestamp, None),)
 
 
 class PromMetric:
@@ -21,9 +40,9 @@ class PromMetric:
     Prometheus metric
     """
 
-    updated: Dict[str, bool]
+    updated: Dict[int, bool]
     """
-    Indicates if the metric with the given label values has been updated in the current run
+    Indicates if the series with the given ID has been updated in the current run
     """
 
     def __init__(self, metric: Gauge):
@@ -34,35 +53,46 @@ class PromMetric:
         for key in self.updated.keys():
             self.updated[key] = False
 
-    def update(self, value_set: ValueSet, value_obj: Value):
-        if len(value_set.labels) > 0:
-            if len(value_obj.label_values) != len(value_set.labels):
-                raise ValueError('Incorrect label count for ' + str(value_obj) + ': Got ' +
-                                 str(len(value_set.labels)) + ' labels and ' +
-                                 str(len(value_obj.label_values)) + ' label names')
+    def set(self, series_id: int, label_values: Sequence[str], value: float, timestamp: Optional[float] = None):
+        """
+        Sets the value of a single series, the number of label values isn't validated
 
-            self.metric.labels(*value_obj.label_values).set(value_obj.value)
-            label_key = '\t'.join(value_obj.label_values)
-            self.updated[label_key] = True
-            return
+        :param series_id: ID of the series in the series registry of the source
+        :param label_values: Label values, empty if the metric doesn't have labels
+        :param value: Value
+        :param timestamp: Time of the probe in seconds, only exported by timestamped gauges
+        """
+        self.updated[series_id] = True
+        if len(label_values) > 0:
+            child = self.metric.labels(*label_values)
+        else:
+            child = self.metric
 
-        self.metric.set(value_obj.value)
-        self.updated[''] = True
+        child.set(value)
+        if isinstance(child, TimestampedGauge):
+            child.set_timestamp(timestamp)
 
-    def remove_not_updated(self, cache: MetricsCache):
+    def remove_not_updated(self, cache: MetricsCache, series: SeriesRegistry):
+        """
+        Removes the series which haven't been updated in the current run
+
+        :param cache: Metrics cache
+        :param series: Series registry of the source, the removed series are released
+        """
         for key in list(self.updated.keys()):
             if self.updated[key] is True:
                 continue
             del self.updated[key]
 
-            if key == '':
+            labels = series.get(key)[3]
+            series.release((key,))
+            if len(labels) == 0:
                 # In case we don't have any labels
                 # we can just unregister the metric, since no other
                 # source is using it
                 # (Since > 1 sources using the same metric name will cause issues anyways)
                 cache.unregister(self)
                 continue
-            labels = key.split('\t')
             self.metric.remove(*labels)
 
 
@@ -77,11 +107,21 @@ class MetricsCache:
     Maps a source object to the metrics created by that object 
     """
 
+    _source_series: Dict[object, SeriesRegistry]
+    """
+    Maps a source object to the IDs of the series exported by that object
+    """
+
     _prom_counter: Dict[str, Gauge]
 
-    def __init__(self):
+    def __init__(self, gauge_type: Type[Gauge] = Gauge):
+        """
+        :param gauge_type: Class of the created gauges
+        """
         self._source_metrics = {}
+        self._source_series = {}
         self._prom_counter = {}
+        self._gauge_type = gauge_type
 
     def get_or_create(self, path: str, label_names: List[str]) -> Gauge:
         """
@@ -92,7 +132,7 @@ class MetricsCache:
         """
         gauge = self._prom_counter.get(path)
         if gauge is None:
-            gauge = Gauge(path, path, labelnames=label_names)
+            gauge = self._gauge_type(path, path, labelnames=label_names)
             self._prom_counter[path] = gauge
             return gauge
         return gauge
@@ -104,6 +144,7 @@ class MetricsCache:
         for value in self._prom_counter.values():
             registry.REGISTRY.unregister(value)
         self._source_metrics.clear()
+        self._source_series.clear()
         self._prom_counter.clear()
 
     def unregister(self, metric: PromMetric):
@@ -125,6 +166,12 @@ class MetricsCache:
     def get_metrics(self, source_ref) -> Dict[str, PromMetric]:
         return Utils.put_if_absent(self._source_metrics, source_ref, {})
 
+    def get_series(self, source_ref) -> SeriesRegistry:
+        series = self._source_series.get(source_ref)
+        if series is None:
+            series = self._source_series[source_ref] = SeriesRegistry()
+        return series
+
 
 class PrometheusWriter(Writer):
     _port: int
@@ -134,7 +181,10 @@ class PrometheusWriter(Writer):
     def __init__(self, config):
         super().__init__(config)
         self._port = self.config.get('port', 8080)
-        self._cache = MetricsCache()
+        self._timestamps = bool(self.config.get('timestamps', False))
+        self._cache = MetricsCache(TimestampedGauge if self._timestamps else Gauge)
+        self._lock = threading.Lock()
+        self._paths: Dict[Tuple[str, Optional[str]], str] = {}
 
     def supports_partial_write(self) -> bool:
         return True
@@ -162,7 +212,10 @@ class PrometheusWriter(Writer):
         if self._httpd is None:
             return
         self._httpd.shutdown()
+        self._httpd.server_close()
         self._httpd = None
+        # Unregister the metrics, so a new writer can export them again
+        self.clear()
 
     def clear(self):
         """
@@ -171,27 +224,71 @@ class PrometheusWriter(Writer):
         self._cache.clear()
 
     def write(self, data: List[ValueSet], source_ref: Optional[Source] = None):
-        # Get the previous metrics for the given source
-        existing_metrics = self._cache.get_metrics(source_ref)
-
-        for value in existing_metrics.values():
-            value.reset_state()
-
+        self.write_batch([(data, source_ref)])
+
+    def write_batch(self, batch: Batch):
+        # Partial writes of different sources may arrive concurrently
+        with self._lock:
+            updated = []
+            for data, source_ref in batch:
+                # Get the previous metrics for the given source
+                existing_metrics = self._cache.get_metrics(source_ref)
+                series = self._cache.get_series(source_ref)
+                for value in existing_metrics.values():
+                    value.reset_state()
+                try:
+                    self._update(data, existing_metrics, series)
+                except Exception as e:
+                    # Only this source is skipped, its previous series are kept
+                    self.log.error(f'Could not write data of {source_ref}: {e}')
+                    continue
+                updated.append((existing_metrics, series))
+
+            # Remove the stale series of all sources of the batch at once
+            for existing_metrics, series in updated:
+                for value in list(existing_metrics.values()):
+                    value.remove_not_updated(self._cache, series)
+
+    def _update(self, data: List[ValueSet], existing_metrics: Dict[str, PromMetric], series: SeriesRegistry):
         for value_set in data:
-            for value_obj in value_set.values:
-                path = value_set.name
-                if value_obj.name is not None:
-                    path += '_' + value_obj.name
-
-                path = path.replace('-', '_').replace('.', '_').replace('!', '')
-
-                if path not in existing_metrics:
-                    # New metric for the current source
-                    gauge = self._cache.get_or_create(path, label_names=value_set.labels)
-                    existing_metrics[path] = PromMetric(gauge)
-
-                prom_metric = existing_metrics[path]
-                prom_metric.update(value_set, value_obj)
-
-        for value in list(existing_metrics.values()):
-            value.remove_not_updated(self._cache)
+            timestamp = None
+            if self._timestamps and value_set.end_ms > 0:
+                timestamp = value_set.end_ms / 1000
+            label_count = len(value_set.get_labels())
+            # The rows are read without accessing the value objects (faster for columnar value sets)
+            # and the metric is only looked up once per value name
+            metrics: Dict[Optional[str], PromMetric] = {}
+            for series_id, name, label_values, value in series.rows(value_set):
+                if len(label_values) != label_count:
+                    # The series with the label values isn't exported, so it isn't kept
+                    series.release((series_id,))
+                    if label_count > 0:
+                        raise ValueError(f'Incorrect label count for {value_set.name}: Got {label_count} labels '
+                                         f'and {len(label_values)} label values {label_values}')
+                    # Label values of a set without labels are ignored
+                    label_values = ()
+                    series_id = series.get_id(value_set.name, name, (), label_values)
+                prom_metric = metrics.get(name)
+                if prom_metric is None:
+                    prom_metric = metrics[name] = self._get_metric(value_set, name, existing_metrics)
+                prom_metric.set(series_id, label_values, value, timestamp)
+
+    def _get_metric(self, value_set: ValueSet, name: Optional[str],
+                    existing_metrics: Dict[str, PromMetric]) -> PromMetric:
+        """
+        Returns the metric of the given value name, creates it if the source didn't export it before
+        """
+        key = (value_set.name, name)
+        path = self._paths.get(key)
+        if path is None:
+            path = value_set.name
+            if name is not None:
+                path += '_' + name
+            path = self._paths[key] = path.replace('-', '_').replace('.', '_').replace('!', '')
+
+        prom_metric = existing_metrics.get(path)
+        if prom_metric is None:
+            # New metric for the current source
+            gauge = self._cache.get_or_create(path, label_names=value_set.get_labels())
+            prom_metric = existing_metrics[path] = PromMetric(gauge)
+        return prom_metric
@@ -1,10 +1,16 @@
 from abc import abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from pollect.core.ChangeFilter import ChangeBatch
 from pollect.core.Log import Log
 from pollect.core.ValueSet import ValueSet
 from pollect.sources.Source import Source
 
+Batch = List[Tuple[List[ValueSet], Optional[Source]]]
+"""
+Data of multiple sources, each with the source which collected it
+"""
+
 
 class Writer(Log):
     """
@@ -23,6 +29,15 @@ class Writer(Log):
         """
         return False
 
+    def supports_change_only(self) -> bool:
+        """
+        Indicates if the writer only needs the values which changed since the last write.
+        If true and the executor has a change filter, `write_changes` is called instead of `write`.
+        Writers which export the current state of all values (e.g. prometheus) must not support this
+        :return: Change only support
+        """
+        return False
+
     @abstractmethod
     def start(self):
         """
@@ -35,6 +50,11 @@ class Writer(Log):
         Stops the writer
         """
 
+    def flush(self):
+        """
+        Writes any buffered data. Called before the writer is stopped
+        """
+
     @abstractmethod
     def write(self, data: List[ValueSet], source_ref: Optional[Source] = None):
         """
@@ -45,6 +65,26 @@ class Writer(Log):
         This is used to detect if a metric has been removed
         """
 
+    def write_batch(self, batch: Batch):
+        """
+        Writes the data of multiple sources at once.
+        Writers which can apply the whole batch in a single pass should overwrite this
+
+        :param batch: Data and source of each partial write
+        """
+        for data, source_ref in batch:
+            self.write(data, source_ref)
+
+    def write_changes(self, batch: ChangeBatch):
+        """
+        Writes the values which changed since the last write.
+        By default, only the changed values are written. Writers which need to handle the removed
+        series (e.g. to delete them) should overwrite this
+
+        :param batch: Changes and source of each write
+        """
+        self.write_batch([(changes.data, source_ref) for changes, source_ref in batch])
+
     def __eq__(self, other):
         if not isinstance(other, Writer):
             return False
@@ -94,6 +134,11 @@ class InMemoryWriter(Writer):
         self.write_calls += 1
         self.data.append(data)
 
+    def write_batch(self, batch: Batch):
+        # A batch is stored as a single write
+        self.write_calls += 1
+        self.data.append([value_set for data, _ in batch for value_set in data])
+
 
 class ParallelInMemoryWriter(InMemoryWriter):
 
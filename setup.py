@@ -30,10 +30,9 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type='text/markdown',
     url='https://github.com/davidgiga1993/pollect',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*']),
     python_requires='>3.6',
     install_requires=[
-        'schedule',
         'prometheus-client',
         'PyYAML',
         'requests',
@@ -0,0 +1,40 @@
+from typing import List
+
+from pollect.core.ValueSet import ValueSet, Value
+
+
+class FakeClock:
+    """
+    Clock which only advances when `now` is changed
+    """
+
+    def __init__(self, now: float = 1000):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def labelled_values(name: str, **values: float) -> List[ValueSet]:
+    """
+    Creates the data of a source with one value per value of the `type` label
+
+    :param name: Name of the value set
+    :param values: Value of each label value
+    """
+    value_set = ValueSet(['type'])
+    value_set.name = name
+    for label, value in values.items():
+        value_set.add(Value(value, [label]))
+    return [value_set]
+
+
+def single_value(value: float) -> List[ValueSet]:
+    """
+    Creates the data of a source with a single value without labels
+
+    :param value: Value
+    """
+    value_set = ValueSet()
+    value_set.add(Value(value))
+    return [value_set]
@@ -0,0 +1,99 @@
+import math
+from typing import List
+from unittest import TestCase
+
+from pollect.core.ChangeFilter import ChangeFilter, Deadband
+from pollect.core.ValueSet import ValueSet
+from tests.helpers import FakeClock, labelled_values
+
+
+def _values(data: List[ValueSet]) -> dict:
+    return {label_values[0]: value for value_set in data for _, label_values, value in value_set.rows()}
+
+
+class TestChangeFilter(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_changes(self):
+        change_filter = ChangeFilter('test', {}, self.clock)
+        changes = change_filter.apply(labelled_values('pollect.test', a=1, b=2), None)
+        self.assertEqual({'a': 1, 'b': 2}, _values(changes.data))
+
+        changes = change_filter.apply(labelled_values('pollect.test', a=1, b=3), None)
+        self.assertEqual({'b': 3}, _values(changes.data))
+        self.assertEqual([('pollect.test', None, ('type',), ('a',))], changes.unchanged)
+        self.assertEqual([], changes.removed)
+
+    def test_removed(self):
+        change_filter = ChangeFilter('test', {}, self.clock)
+        change_filter.apply(labelled_values('pollect.test', a=1, b=2), None)
+        changes = change_filter.apply(labelled_values('pollect.test', a=1), None)
+        self.assertEqual([], changes.data)
+        self.assertEqual([('pollect.test', None, ('type',), ('b',))], changes.removed)
+        self.assertEqual(1, len(change_filter._last[None]))
+        # The last values are kept per source
+        self.assertEqual({'a': 1}, _values(change_filter.apply(labelled_values('pollect.test', a=1), 'other').data))
+
+    def test_deadband(self):
+        change_filter = ChangeFilter('test', {
+            'absolute': 0.5,
+            'metrics': {'pollect.test': {'relative': 0.1}}
+        }, self.clock)
+        change_filter.apply(labelled_values('pollect.test', a=10), None)
+        # Compared against the last written value, so small changes don't add up unnoticed
+        self.assertEqual([], change_filter.apply(labelled_values('pollect.test', a=10.6), None).data)
+        self.assertEqual([], change_filter.apply(labelled_values('pollect.test', a=10.9), None).data)
+        self.assertEqual({'a': 11.1}, _values(change_filter.apply(labelled_values('pollect.test', a=11.1), None).data))
+
+    def test_max_silence(self):
+        change_filter = ChangeFilter('test', {'maxSilence': 60}, self.clock)
+        change_filter.apply(labelled_values('pollect.test', a=1), None)
+        self.clock.now += 59
+        self.assertEqual([], change_filter.apply(labelled_values('pollect.test', a=1), None).data)
+        self.clock.now += 1
+        self.assertEqual({'a': 1}, _values(change_filter.apply(labelled_values('pollect.test', a=1), None).data))
+
+    def test_default_max_silence(self):
+        change_filter = ChangeFilter('test', {}, self.clock)
+        change_filter.apply(labelled_values('pollect.test', a=1), None)
+        self.clock.now += 300
+        self.assertEqual({'a': 1}, _values(change_filter.apply(labelled_values('pollect.test', a=1), None).data))
+        # The heartbeat can be disabled
+        change_filter = ChangeFilter('test', {'maxSilence': None}, self.clock)
+        change_filter.apply(labelled_values('pollect.test', a=1), None)
+        self.clock.now += 3600
+        self.assertEqual([], change_filter.apply(labelled_values('pollect.test', a=1), None).data)
+
+    def test_reset(self):
+        change_filter = ChangeFilter('test', {}, self.clock)
+        change_filter.apply(labelled_values('pollect.test', a=1, b=2), None)
+        changes = change_filter.apply(labelled_values('pollect.test', a=2), None)
+        changes.reset()
+        # The failed changes are written again, the other values are still filtered
+        changes = change_filter.apply(labelled_values('pollect.test', a=2, c=3), None)
+        self.assertEqual({'a': 2, 'c': 3}, _values(changes.data))
+        self.assertEqual([('pollect.test', None, ('type',), ('b',))], changes.removed)
+        self.assertEqual([], change_filter.apply(labelled_values('pollect.test', a=2, c=3), None).removed)
+
+    def test_static_labels(self):
+        change_filter = ChangeFilter('test', {}, self.clock)
+        data = labelled_values('pollect.test', a=1)
+        data[0].set_static_labels(['host'], ['h1'])
+        changed = change_filter.apply(data, None).data[0]
+        self.assertEqual(['type', 'host'], changed.labels)
+        self.assertEqual(('a', 'h1'), changed.values[0].label_values)
+
+    def test_deadband_nan(self):
+        deadband = Deadband(absolute=1)
+        self.assertFalse(deadband.exceeds(math.nan, math.nan))
+        self.assertTrue(deadband.exceeds(1, math.nan))
+        self.assertTrue(deadband.exceeds(math.nan, 1))
+        self.assertFalse(deadband.exceeds(1, 2))
+        self.assertTrue(deadband.exceeds(1, -0.5))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ChangeFilter('test', {'absolute': -1})
+        with self.assertRaises(ValueError):
+            ChangeFilter('test', {'maxSilence': 0})
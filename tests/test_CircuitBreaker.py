@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from pollect.core.CircuitBreaker import CircuitBreaker
+from tests.helpers import FakeClock
+
+
+class TestCircuitBreaker(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker('test', 2, 10, 30, self.clock)
+
+    def _fail(self, count: int):
+        for _ in range(count):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def test_open(self):
+        self._fail(1)
+        self.assertEqual(CircuitBreaker.CLOSED, self.breaker.state)
+        self._fail(1)
+        self.assertEqual(CircuitBreaker.OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+        self.clock.now += 9
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open(self):
+        self._fail(2)
+        self.clock.now += 10
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(CircuitBreaker.HALF_OPEN, self.breaker.state)
+        # Only a single trial
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(CircuitBreaker.CLOSED, self.breaker.state)
+        self.assertEqual(0, self.breaker.failures)
+        self.assertTrue(self.breaker.allow())
+
+    def test_backoff(self):
+        self._fail(2)
+        for expected in [20, 30, 30]:
+            self.clock.now += self.breaker.backoff
+            self._fail(1)
+            self.assertEqual(expected, self.breaker.backoff)
+            self.assertEqual(CircuitBreaker.OPEN, self.breaker.state)
+
+    def test_success_resets(self):
+        self._fail(1)
+        self.breaker.record_success()
+        self._fail(1)
+        self.assertEqual(CircuitBreaker.CLOSED, self.breaker.state)
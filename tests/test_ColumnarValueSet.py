@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from pollect.core.ValueSet import ColumnarValueSet, ValueSet, Value
+
+
+class TestColumnarValueSet(TestCase):
+    def _create(self) -> ColumnarValueSet:
+        value_set = ColumnarValueSet(['zone', 'type'])
+        value_set.append(1, ['a', 'A'], 'rrsets')
+        value_set.append(2.5, ['b', 'A'], 'rrsets')
+        value_set.add(Value(True, ['a', 'AAAA']))
+        return value_set
+
+    def test_rows(self):
+        value_set = self._create()
+        self.assertEqual(3, value_set.size())
+        self.assertEqual([('rrsets', ('a', 'A'), 1), ('rrsets', ('b', 'A'), 2.5), (None, ('a', 'AAAA'), 1)],
+                         list(value_set.rows()))
+        # Each distinct label value is only stored once
+        self.assertEqual([['a', 'b'], ['A', 'AAAA']], value_set._tables)
+
+    def test_values(self):
+        values = self._create().values
+        self.assertEqual([1, 2.5, 1], [value.value for value in values])
+        self.assertEqual(['rrsets', 'rrsets', None], [value.name for value in values])
+        self.assertEqual(('b', 'A'), values[1].label_values)
+        # The values are created on demand, so they can't be replaced in place
+        with self.assertRaises(TypeError):
+            values[0] = values[1]
+
+    def test_static_labels(self):
+        value_set = self._create()
+        value_set.set_static_labels(['host'], ['dns1'])
+        self.assertEqual(['zone', 'type', 'host'], value_set.get_labels())
+        self.assertEqual((None, ('a', 'AAAA', 'dns1'), 1), list(value_set.rows())[2])
+        # The static labels aren't part of the values themselves
+        self.assertEqual(['zone', 'type'], value_set.labels)
+        self.assertEqual(('a', 'AAAA'), value_set.values[2].label_values)
+
+        restored = ValueSet.deserialize(value_set.serialize())
+        self.assertEqual(['zone', 'type', 'host'], restored.labels)
+        self.assertEqual(('a', 'AAAA', 'dns1'), restored.values[2].label_values)
+
+    def test_serialize(self):
+        value_set = self._create()
+        value_set.name = 'bind'
+        restored = ValueSet.deserialize(value_set.serialize())
+        self.assertEqual(value_set.serialize(), restored.serialize())
+        self.assertEqual(['zone', 'type'], restored.labels)
+
+    def test_label_count(self):
+        value_set = self._create()
+        with self.assertRaises(ValueError):
+            value_set.append(1, ['a'])
@@ -22,6 +22,11 @@ class TestConfigContainer(TestCase):
         self.assertIsNotNone(child)
         self.assertIn('otherhello', child.values())
 
+    def test_unhashable(self):
+        self.assertEqual(ConfigContainer({'a': 1}), {'a': 1})
+        with self.assertRaises(TypeError):
+            hash(ConfigContainer({'a': 1}))
+
     def test_resolve(self):
         c = ConfigContainer({
             'key': '${VALUE}',
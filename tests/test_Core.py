@@ -1,5 +1,7 @@
 import datetime
+import math
 import os
+import time
 import threading
 from time import sleep
 from typing import Dict, Callable
@@ -7,10 +9,48 @@ from unittest import TestCase
 
 import requests
 
+from pollect.core.CircuitBreaker import CircuitBreaker
 from pollect.core.Core import Configuration
 from pollect.core.ExecutionScheduler import ExecutionScheduler
 from pollect.core.Factories import SourceFactory, WriterFactory
-from pollect.writers.Writer import InMemoryWriter, ParallelInMemoryWriter
+from pollect.core.ValueSet import ValueSet, Value
+from pollect.sources.Source import Source
+from pollect.writers.Writer import InMemoryWriter, ParallelInMemoryWriter, ChangeBatch
+
+
+class ChangeOnlyWriter(ParallelInMemoryWriter):
+    def __init__(self, config):
+        super().__init__(config)
+        self.changes = []
+
+    def supports_change_only(self) -> bool:
+        return True
+
+    def write_changes(self, batch: ChangeBatch):
+        self.changes.extend(changes for changes, _ in batch)
+
+
+class FailingChangeOnlyWriter(ChangeOnlyWriter):
+    def __init__(self, config):
+        super().__init__(config)
+        self.fail = True
+
+    def write_changes(self, batch: ChangeBatch):
+        if self.fail:
+            self.fail = False
+            raise ConnectionError('Not connected')
+        super().write_changes(batch)
+
+
+class PushSource(Source):
+    def __init__(self, config):
+        super().__init__(config)
+        self.data = ValueSet()
+        self.data.add(Value(1))
+
+    def _probe(self):
+        # The last pushed value is returned in every probe
+        return self.data
 
 
 class TestCore(TestCase):
@@ -263,6 +303,589 @@ class TestCore(TestCase):
 
         test.run(raw_config, verify)
 
+    def test_exec_async(self):
+        test = IntegrationTest()
+        timestamps = []
+        lock = threading.Lock()
+
+        def callback():
+            with lock:
+                timestamps.append(datetime.datetime.now())
+                if len(timestamps) == 3:
+                    test.stop_callback()
+
+        raw_config = {
+            "tickTime": 30,
+            "threads": 1,
+            "writer": {
+                "type": "ParallelInMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [{"type": "AsyncDummy", "value": x, "sleep": 2, "callback": callback}
+                                for x in range(3)]
+                }
+            ]
+        }
+
+        def verify(config: Configuration):
+            self.assertEqual(3, len(timestamps))
+            # All sources have been probed at the same time, even though only one thread is available
+            self.assertTrue((max(timestamps) - min(timestamps)).total_seconds() < 1)
+
+        test.run(raw_config, verify)
+
+    def test_exec_async_merge(self):
+        test = IntegrationTest()
+        raw_config = {
+            "tickTime": 30,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {
+                            "type": "AsyncDummy",
+                            "value": 1,
+                        },
+                        {
+                            "type": "Dummy",
+                            "value": 2,
+                            "sleep": 1,
+                            "callback": test.stop_callback,
+                        },
+                    ]
+                }
+            ]
+        }
+
+        def run(config: Configuration):
+            writer = config.writers[0]
+            self.assertEqual(writer.write_calls, 1)
+            self.assertEqual(1, writer.data[0][0].values[0].value)
+            self.assertEqual(2, writer.data[0][1].values[0].value)
+
+        test.run(raw_config, run)
+
+    def test_spread_offsets(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "spread": 0.5,
+                    "sources": [{"type": "Dummy", "name": f"source{x}"} for x in range(10)]
+                }
+            ]
+        }
+        first = Configuration(raw_config).create_executors()[0]
+        second = Configuration(raw_config).create_executors()[0]
+        offsets = [offset for offset, _, _ in first._probe_order]
+        self.assertEqual(offsets, [offset for offset, _, _ in second._probe_order])
+        self.assertEqual(sorted(offsets), offsets)
+        self.assertTrue(all(0 <= offset < 5 for offset in offsets))
+        self.assertGreater(len(set(offsets)), 1)
+
+    def test_exec_spread(self):
+        test = IntegrationTest()
+        timestamps = []
+        lock = threading.Lock()
+
+        def callback():
+            with lock:
+                timestamps.append(datetime.datetime.now())
+                if len(timestamps) == 3:
+                    test.stop_callback()
+
+        raw_config = {
+            "tickTime": 2,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "spread": 1,
+                    "sources": [{"type": "Dummy", "value": x, "callback": callback} for x in range(3)]
+                }
+            ]
+        }
+
+        def verify(config: Configuration):
+            writer = config.writers[0]
+            # Still merged into a single write, in the order of the sources
+            self.assertEqual(1, writer.write_calls)
+            self.assertEqual([0, 1, 2], [value_set.values[0].value for value_set in writer.data[0]])
+            self.assertTrue((max(timestamps) - min(timestamps)).total_seconds() < 2)
+
+        test.run(raw_config, verify)
+
+    def test_source_intervals(self):
+        raw_config = {
+            "tickTime": 1,
+            "writer": {
+                "type": "ParallelInMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {"type": "Dummy", "value": 1},
+                        {"type": "Dummy", "value": 2, "every": 2},
+                        {"type": "Dummy", "value": 3, "tickTime": 3},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        calls = []
+        try:
+            for _ in range(6):
+                executor.execute()
+                sleep(0.2)
+                calls.append(writer.write_calls)
+        finally:
+            executor.shutdown()
+        # Ticks 0 - 5: 3, 1, 2, 2, 2, 1 sources due
+        self.assertEqual([3, 4, 6, 8, 10, 11], calls)
+
+    def test_source_intervals_merge(self):
+        raw_config = {
+            "tickTime": 1,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {"type": "Dummy", "value": 1},
+                        {"type": "Dummy", "value": 2, "every": 3},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        try:
+            for _ in range(3):
+                executor.execute()
+        finally:
+            executor.shutdown()
+
+        # Sources which aren't due are written with their last values
+        self.assertEqual(3, writer.write_calls)
+        for data in writer.data:
+            self.assertEqual([1, 2], [value_set.values[0].value for value_set in data])
+            self.assertEqual('pollect.Dummy', data[1].name)
+        self.assertIs(writer.data[0][1], writer.data[2][1])
+
+    def test_probe_timeout(self):
+        for policy, expected in [('drop', [1]), ('last', [1, 2]), ('nan', [1, 'nan'])]:
+            raw_config = {
+                "tickTime": 10,
+                "writer": {
+                    "type": "InMemory"
+                },
+                "executors": [
+                    {
+                        "collection": "pollect",
+                        "probeTimeout": 0.5,
+                        "sources": [
+                            {"type": "Dummy", "value": 1},
+                            {"type": "Dummy", "value": 2, "onTimeout": policy},
+                        ]
+                    }
+                ]
+            }
+            config = Configuration(raw_config)
+            executor = config.create_executors()[0]
+            writer = config.writers[0]
+            try:
+                executor.execute()
+                executor._sources[1].sleep_time = 2
+                start = time.monotonic()
+                executor.execute()
+                self.assertLess(time.monotonic() - start, 1.5)
+                # The previous probe is still running, so the source is skipped
+                executor.execute()
+            finally:
+                executor.shutdown()
+
+            self.assertEqual(3, writer.write_calls)
+            for data in writer.data[1:]:
+                values = [value_set.values[0].value for value_set in data]
+                values = ['nan' if math.isnan(value) else value for value in values]
+                self.assertEqual(expected, values, policy)
+
+    def test_shutdown_during_execution(self):
+        raw_config = {
+            "tickTime": 10,
+            "stopTimeout": 0.2,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "threads": 1,
+                    "sources": [
+                        {"type": "Dummy", "value": 1, "sleep": 1},
+                        {"type": "Dummy", "value": 2},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        errors = []
+
+        def execute():
+            try:
+                executor.execute()
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=execute)
+        thread.start()
+        sleep(0.2)
+        # The probe of the second source is still queued and gets cancelled
+        executor.shutdown()
+        thread.join(5)
+        self.assertEqual([], errors)
+        self.assertEqual([[1]], [[value_set.values[0].value for value_set in data] for data in writer.data])
+
+    def test_cache(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {"type": "Dummy", "value": 1, "sleep": 0.5, "cacheTtl": 60, "refreshAhead": 0},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        source = executor._sources[0]
+        cache = executor._caches[source]
+        try:
+            executor.execute()
+            source.value = 2
+            start = time.monotonic()
+            executor.execute()
+            # The cached value is returned while the source is refreshed in the background
+            self.assertLess(time.monotonic() - start, 0.4)
+            self.assertTrue(cache.refreshing)
+            sleep(1)
+            self.assertFalse(cache.refreshing)
+            executor.execute()
+        finally:
+            executor.shutdown()
+
+        values = [data[0].values[0].value for data in writer.data]
+        self.assertEqual([1, 1, 2], values)
+        self.assertEqual(['pollect.Dummy'] * 3, [data[0].name for data in writer.data])
+
+    def test_probe_timestamps(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {"type": "Dummy", "name": "fast", "value": 1},
+                        {"type": "Dummy", "name": "slow", "value": 2, "sleep": 0.2},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        before = int(time.time() * 1000)
+        try:
+            executor.execute()
+        finally:
+            executor.shutdown()
+        after = int(time.time() * 1000) + 1
+
+        fast, slow = writer.data[0]
+        for value_set in [fast, slow]:
+            self.assertLessEqual(before, value_set.start_ms)
+            self.assertLessEqual(value_set.start_ms, value_set.end_ms)
+            self.assertLessEqual(value_set.end_ms, after)
+            self.assertEqual(value_set.end_ms // 1000, value_set.time)
+        # Each source keeps the time of its own probe
+        self.assertGreaterEqual(slow.end_ms - slow.start_ms, 200)
+        self.assertLess(fast.end_ms - fast.start_ms, 200)
+
+    def test_push_source_timestamps(self):
+        source = PushSource({'type': 'Push'})
+        first = source.probe()[0].end_ms
+        sleep(0.01)
+        second = source.probe()[0]
+        self.assertGreater(second.end_ms, first)
+        self.assertLessEqual(second.start_ms, second.end_ms)
+
+        # Sources which provide the time of the measurement keep it
+        source.provides_timestamps = True
+        source.data.start_ms = source.data.end_ms = 1700000000000
+        self.assertEqual(1700000000000, source.probe()[0].end_ms)
+
+    def test_static_labels(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {"type": "Dummy", "name": "push", "value": 1, "labels": {"host": "a"}},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        # Push based sources return the same value set in every probe
+        value_set = ValueSet(['type'])
+        value_set.add(Value(1, ['b']))
+        executor._sources[0]._probe = lambda: value_set
+        try:
+            for _ in range(3):
+                executor.execute()
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(3, len(writer.data))
+        self.assertIs(value_set, writer.data[-1][0])
+        self.assertEqual(['type'], value_set.labels)
+        self.assertEqual(('b',), value_set.values[0].label_values)
+        self.assertEqual(['type', 'host'], value_set.get_labels())
+        self.assertEqual([(None, ('b', 'a'), 1)], list(value_set.rows()))
+
+    def test_change_only(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "ParallelInMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "changeOnly": True,
+                    "sources": [
+                        {"type": "Dummy", "name": "a", "value": 1},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        change_writer = ChangeOnlyWriter({})
+        executor.writers.append(change_writer)
+        try:
+            for _ in range(3):
+                executor.execute()
+                for future in executor._running.values():
+                    future.result(5)
+        finally:
+            executor.shutdown()
+
+        # Writers without change only support still get all values
+        self.assertEqual(3, len(writer.data))
+        self.assertEqual(3, len(change_writer.changes))
+        first, second, _ = change_writer.changes
+        self.assertEqual([1], [value.value for value in first.data[0].values])
+        self.assertEqual([], second.data)
+        self.assertEqual(1, len(second.unchanged))
+
+    def test_change_only_failure(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "ParallelInMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "changeOnly": True,
+                    "sources": [
+                        {"type": "Dummy", "name": "a", "value": 1},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        change_writer = FailingChangeOnlyWriter({})
+        executor.writers.append(change_writer)
+        source = executor._sources[0]
+        try:
+            for _ in range(2):
+                executor._write(source.probe(), source, True)
+        finally:
+            executor.shutdown()
+
+        # The value didn't change, but the first write failed
+        self.assertEqual(1, len(change_writer.changes))
+        self.assertEqual([1], [value.value for value in change_writer.changes[0].data[0].values])
+
+    def test_batch_window(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "ParallelInMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "batchWindow": 200,
+                    "sources": [
+                        {"type": "Dummy", "name": "a", "value": 1},
+                        {"type": "Dummy", "name": "b", "value": 2},
+                        {"type": "Dummy", "name": "c", "value": 3},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        try:
+            executor.execute()
+            for future in executor._running.values():
+                future.result(5)
+            self.assertTrue(executor._batcher.flush(5))
+        finally:
+            executor.shutdown()
+
+        # All sources have been written at once
+        self.assertEqual(1, writer.write_calls)
+        self.assertEqual([1, 2, 3], sorted(value_set.values[0].value for value_set in writer.data[0]))
+
+    def test_circuit_breaker(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {"type": "Dummy", "value": 1, "failureThreshold": 2},
+                        {"type": "Dummy", "value": 2, "circuitBreaker": False},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        probes = []
+
+        def failing_probe():
+            probes.append(1)
+            raise ConnectionError('Offline')
+
+        for source in executor._sources:
+            source._probe = failing_probe
+        try:
+            for _ in range(4):
+                executor.execute()
+        finally:
+            executor.shutdown()
+
+        # The first source is paused after two failures, the second one is probed in every tick
+        self.assertEqual(2 + 4, len(probes))
+        self.assertEqual(CircuitBreaker.OPEN, executor._breakers[executor._sources[0]].state)
+        self.assertNotIn(executor._sources[1], executor._breakers)
+
+    def test_probe_timeout_async(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "ParallelInMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {"type": "AsyncDummy", "value": 1, "sleep": 5, "probeTimeout": 0.2, "onTimeout": "drop"},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        writer = config.writers[0]
+        try:
+            start = time.monotonic()
+            executor.execute()
+            self.assertLess(time.monotonic() - start, 1)
+            # The coroutine has been cancelled, so the next probe isn't skipped
+            sleep(0.1)
+            self.assertTrue(executor._running[executor._sources[0]].cancelled())
+        finally:
+            executor.shutdown()
+        # Dropped values are written as empty result
+        self.assertEqual([[]], writer.data)
+
+    def test_circuit_breaker_timeout_async(self):
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "ParallelInMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "sources": [
+                        {"type": "AsyncDummy", "value": 1, "sleep": 5, "probeTimeout": 0.2, "onTimeout": "drop",
+                         "backoff": 0.1, "maxBackoff": 1},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        breaker = executor._breakers[executor._sources[0]]
+        # The backoff passed, the next probe is the trial probe
+        breaker.state = CircuitBreaker.OPEN
+        breaker.backoff = 0.1
+        try:
+            executor.execute()
+            sleep(0.1)
+        finally:
+            executor.shutdown()
+        # The cancelled trial probe opens the circuit again instead of keeping it half-open
+        self.assertEqual(CircuitBreaker.OPEN, breaker.state)
+        self.assertEqual(0.2, breaker.backoff)
+
     @staticmethod
     def _run_and_stop_old(executor: ExecutionScheduler, wait_time: int, call):
         executor.create()
@@ -0,0 +1,303 @@
+import os
+import tempfile
+import threading
+import time
+from typing import List, Dict
+from unittest import TestCase
+
+from pollect.core.ConfigWatcher import ConfigWatcher
+from pollect.core.Core import Configuration
+from pollect.core.ExecutionScheduler import JobQueue, ExecutionScheduler
+from tests.helpers import FakeClock
+
+
+class TestJobQueue(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.jobs = JobQueue(self.clock)
+        self.runs: List[float] = []
+
+    def _record(self, name: str = ''):
+        self.runs.append(self.clock.now)
+
+    def test_due_immediately(self):
+        self.jobs.add(10, self._record)
+        self.assertEqual(0, self.jobs.next_delay())
+        self.assertEqual(1, self.jobs.run_pending())
+        self.assertEqual(10, self.jobs.next_delay())
+        self.assertEqual(0, self.jobs.run_pending())
+
+    def test_fractional_interval(self):
+        self.jobs.add(0.25, self._record)
+        for _ in range(8):
+            self.jobs.run_pending()
+            self.clock.now += self.jobs.next_delay()
+        self.assertEqual(8, len(self.runs))
+        self.assertAlmostEqual(1000 + 7 * 0.25, self.runs[-1])
+
+    def test_no_drift(self):
+        job = self.jobs.add(10, self._record)
+        for x in range(1000):
+            # Each wakeup is slightly late
+            self.clock.now += self.jobs.next_delay() + 0.3
+            self.jobs.run_pending()
+        # The due time is still aligned to the original phase
+        self.assertAlmostEqual(1000 + 1000 * 10, job.next_run)
+        self.assertEqual(1000, len(self.runs))
+
+    def test_skip_missed_slots(self):
+        job = self.jobs.add(10, self._record)
+        self.jobs.run_pending()
+        # Stalled for 3.5 intervals
+        self.clock.now += 35
+        self.assertEqual(1, self.jobs.run_pending())
+        self.assertEqual(1040, job.next_run)
+        self.assertEqual(5, self.jobs.next_delay())
+
+    def test_order(self):
+        self.jobs.add(3, self._record, 'a')
+        self.jobs.add(2, self._record, 'b', start=1001)
+        self.jobs.run_pending()
+        self.assertEqual(1, self.jobs.next_delay())
+        self.clock.now += 1
+        self.assertEqual(1, self.jobs.run_pending())
+        self.assertEqual(2, self.jobs.next_delay())
+        self.clock.now += 2
+        self.assertEqual(2, self.jobs.run_pending())
+        self.assertEqual([1000, 1001, 1003, 1003], self.runs)
+
+    def test_remove(self):
+        job = self.jobs.add(1, self._record)
+        self.jobs.remove(job)
+        self.assertIsNone(self.jobs.next_delay())
+        self.assertEqual(0, self.jobs.run_pending())
+
+    def test_failing_job(self):
+        def fail():
+            raise ValueError('failed')
+
+        self.jobs.add(1, fail)
+        self.jobs.add(1, self._record)
+        self.assertEqual(2, self.jobs.run_pending())
+        self.assertEqual(1, len(self.runs))
+
+
+class TestExecutionScheduler(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _create(self, adaptive: bool) -> ExecutionScheduler:
+        raw_config = {
+            "tickTime": 10,
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "adaptive": adaptive,
+                    "maxTickTime": 20,
+                    "sources": [{"type": "Dummy", "value": 1}]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        scheduler = ExecutionScheduler(config, config.create_executors(), self.clock)
+        scheduler.create()
+        self.addCleanup(lambda: [executor.shutdown() for executor in scheduler.executors])
+        return scheduler
+
+    def _execute_queued(self, scheduler: ExecutionScheduler, duration: float = 0):
+        executor = scheduler.executors[0]
+        job_func, queued_at = scheduler._queues[executor].get_nowait()
+
+        def run():
+            job_func()
+            self.clock.now += duration
+
+        scheduler._execute(executor, run, queued_at)
+
+    def test_overruns(self):
+        scheduler = self._create(False)
+        executor = scheduler.executors[0]
+        stats = scheduler.get_stats(executor)
+        scheduler._jobs.run_pending()
+        for _ in range(3):
+            self.clock.now += 10
+            scheduler._jobs.run_pending()
+        # The first execution never started, so all following ticks are skipped
+        self.assertEqual(4, stats.scheduled)
+        self.assertEqual(3, stats.overruns)
+        self.assertTrue(stats.behind)
+        self.assertEqual(10, stats.interval)
+
+        self._execute_queued(scheduler, duration=1)
+        self.assertEqual(30, stats.queue_wait)
+        self.assertEqual(1, stats.duration)
+        self.clock.now += scheduler._jobs.next_delay()
+        scheduler._jobs.run_pending()
+        self.assertFalse(stats.behind)
+        self.assertEqual(3, stats.overruns)
+
+    def test_achieved_rate(self):
+        scheduler = self._create(False)
+        stats = scheduler.get_stats(scheduler.executors[0])
+        for _ in range(5):
+            scheduler._jobs.run_pending()
+            self._execute_queued(scheduler, duration=2)
+            self.clock.now += scheduler._jobs.next_delay()
+        self.assertEqual(5, stats.executions)
+        self.assertAlmostEqual(10, stats.achieved_interval)
+        self.assertAlmostEqual(0.1, stats.achieved_rate)
+
+    def test_adaptive(self):
+        scheduler = self._create(True)
+        executor = scheduler.executors[0]
+        stats = scheduler.get_stats(executor)
+        job = scheduler._scheduled_jobs[executor]
+        scheduler._jobs.run_pending()
+        self.clock.now += 10
+        scheduler._jobs.run_pending()
+        self.assertEqual(15, stats.interval)
+        self.assertEqual(15, job.interval)
+        self.clock.now += 10
+        scheduler._jobs.run_pending()
+        # Limited by maxTickTime
+        self.assertEqual(20, stats.interval)
+        self.assertEqual(20, job.interval)
+
+        # Recovered
+        for expected in [20, 20 / 1.5, 10]:
+            self._execute_queued(scheduler, duration=1)
+            self.clock.now += scheduler._jobs.next_delay()
+            scheduler._jobs.run_pending()
+            self.assertFalse(stats.behind)
+            self.assertAlmostEqual(expected, job.interval)
+
+
+class TestReload(TestCase):
+    @staticmethod
+    def _raw_config(executors: List[Dict[str, any]]) -> Dict[str, any]:
+        return {
+            'tickTime': 10,
+            'writer': {'type': 'InMemory'},
+            'executors': executors,
+        }
+
+    def _create(self, executors: List[Dict[str, any]]) -> ExecutionScheduler:
+        config = Configuration(self._raw_config(executors))
+        scheduler = ExecutionScheduler(config, config.create_executors())
+        scheduler.create()
+        self.addCleanup(scheduler.stop)
+        return scheduler
+
+    def test_reload(self):
+        scheduler = self._create([
+            {'collection': 'kept', 'sources': [{'type': 'Dummy', 'value': 1}]},
+            {'collection': 'changed', 'sources': [{'type': 'Dummy', 'value': 2}, {'type': 'Dummy', 'value': 3}]},
+            {'collection': 'removed', 'sources': [{'type': 'Dummy', 'value': 4}]},
+        ])
+        kept, changed, removed = scheduler.executors
+        writer = scheduler.config.writers[0]
+
+        self.assertTrue(scheduler.reload(self._raw_config([
+            {'collection': 'kept', 'sources': [{'type': 'Dummy', 'value': 1}]},
+            {'collection': 'changed', 'sources': [{'type': 'Dummy', 'value': 2}, {'type': 'Dummy', 'value': 5}]},
+            {'collection': 'added', 'sources': [{'type': 'Dummy', 'value': 6}]},
+        ])))
+
+        self.assertEqual(['kept', 'changed', 'added'], [executor.collection_name for executor in scheduler.executors])
+        self.assertIs(kept, scheduler.executors[0])
+        self.assertIsNot(changed, scheduler.executors[1])
+        # The unchanged source keeps its state
+        self.assertIs(changed._sources[0], scheduler.executors[1]._sources[0])
+        self.assertIsNot(changed._sources[1], scheduler.executors[1]._sources[1])
+        self.assertTrue(removed._stopped.is_set())
+        self.assertNotIn(removed, scheduler._scheduled_jobs)
+        self.assertIn(scheduler.executors[2], scheduler._scheduled_jobs)
+        # The writer config didn't change, so all executors still use the same writer
+        self.assertIs(writer, scheduler.config.writers[0])
+        for executor in scheduler.executors:
+            self.assertIs(writer, executor.writers[0])
+
+    def test_global_change(self):
+        scheduler = self._create([{'collection': 'a', 'sources': [{'type': 'Dummy', 'value': 1}]}])
+        executor = scheduler.executors[0]
+        raw_config = self._raw_config([{'collection': 'a', 'sources': [{'type': 'Dummy', 'value': 1}]}])
+        raw_config['tickTime'] = 5
+        self.assertTrue(scheduler.reload(raw_config))
+        self.assertIsNot(executor, scheduler.executors[0])
+        self.assertEqual(5, scheduler.executors[0].tick_time)
+        self.assertEqual(5, scheduler._scheduled_jobs[scheduler.executors[0]].interval)
+
+    def test_blocking_flush(self):
+        scheduler = self._create([{'collection': 'a', 'sources': [{'type': 'Dummy', 'value': 1}]}])
+        old_writer = scheduler.config.writers[0]
+        release = threading.Event()
+        old_writer.flush = lambda: release.wait(5)
+        raw_config = self._raw_config([{'collection': 'a', 'sources': [{'type': 'Dummy', 'value': 1}]}])
+        raw_config['writer'] = {'type': 'InMemory', 'name': 'new'}
+        raw_config['stopTimeout'] = 0.2
+        start = time.monotonic()
+        self.assertTrue(scheduler.reload(raw_config))
+        # The old writer is abandoned after the stop timeout
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertIsNot(old_writer, scheduler.config.writers[0])
+        release.set()
+
+    def test_stop_slow_probe(self):
+        raw_config = self._raw_config([{'collection': 'a', 'sources': [{'type': 'Dummy', 'value': 1, 'sleep': 3}]}])
+        raw_config['shutdownTimeout'] = 2
+        raw_config['stopTimeout'] = 0.5
+        config = Configuration(raw_config)
+        scheduler = ExecutionScheduler(config, config.create_executors())
+        scheduler.create()
+        flushed = threading.Event()
+
+        def flush():
+            time.sleep(0.2)
+            flushed.set()
+
+        config.writers[0].flush = flush
+        execution = threading.Thread(target=scheduler.executors[0].execute, daemon=True)
+        execution.start()
+        time.sleep(0.1)
+        start = time.monotonic()
+        scheduler.stop()
+        # The running probe is abandoned after the stop timeout, so the writer can still be flushed
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(flushed.is_set())
+
+    def test_stop_full_queue(self):
+        scheduler = self._create([{'collection': 'a', 'sources': [{'type': 'Dummy', 'value': 1}]}])
+        executor = scheduler.executors[0]
+        for _ in range(2):
+            scheduler._queues[executor].put((executor.execute, 0))
+        stop = threading.Thread(target=scheduler.stop, daemon=True)
+        stop.start()
+        stop.join(5)
+        self.assertFalse(stop.is_alive())
+        # Stopping again returns immediately
+        scheduler.stop()
+
+    def test_invalid(self):
+        scheduler = self._create([{'collection': 'a', 'sources': [{'type': 'Dummy', 'value': 1}]}])
+        executors = list(scheduler.executors)
+        self.assertFalse(scheduler.reload(self._raw_config([
+            {'collection': 'a', 'sources': [{'type': 'Dummy', 'value': 1}, {'type': 'DoesNotExist'}]},
+        ])))
+        self.assertEqual(executors, scheduler.executors)
+        self.assertFalse(executors[0]._stopped.is_set())
+
+
+class TestConfigWatcher(TestCase):
+    def test_check(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'config.yml')
+            with open(path, 'w') as f:
+                f.write('tickTime: 10\n')
+            watcher = ConfigWatcher(path, lambda: None)
+            self.assertFalse(watcher.check())
+            os.utime(path, ns=(0, 1000))
+            self.assertTrue(watcher.check())
+            self.assertFalse(watcher.check())
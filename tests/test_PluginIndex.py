@@ -0,0 +1,42 @@
+import os
+import sys
+from unittest import TestCase
+
+from pollect.core.Factories import SourceFactory, WriterFactory
+from pollect.core.PluginIndex import INDEX
+from pollect.libs import PluginIndexGenerator
+
+
+class TestPluginIndex(TestCase):
+    def test_up_to_date(self):
+        """
+        Makes sure the index has been regenerated after adding, renaming or removing a source or writer
+        """
+        with open(PluginIndexGenerator.INDEX_FILE, 'r', encoding='utf-8') as f:
+            self.assertEqual(PluginIndexGenerator.generate(), f.read(),
+                             'Plugin index is outdated, run python -m pollect.libs.PluginIndexGenerator')
+
+    def test_check(self):
+        modified = os.stat(PluginIndexGenerator.INDEX_FILE).st_mtime_ns
+        self.assertEqual(0, PluginIndexGenerator.main(['--check']))
+        with self.assertRaises(SystemExit):
+            PluginIndexGenerator.main(['--help'])
+        # Neither the check nor the help rewrite the index
+        self.assertEqual(modified, os.stat(PluginIndexGenerator.INDEX_FILE).st_mtime_ns)
+
+    def test_all_modules_indexed(self):
+        for package, factory in [('sources', SourceFactory({})), ('writers', WriterFactory())]:
+            modules = set(INDEX[package].values())
+            for file in factory._object_factory._files:
+                if file == '__init__':
+                    continue
+                self.assertIn(file, modules, f'{package}/{file} is not indexed')
+
+    def test_lazy_import(self):
+        factory = SourceFactory(None)
+        self.assertIsNotNone(factory.create({'type': 'Dummy'}))
+        self.assertIn('pollect.sources.DummySource', sys.modules)
+        self.assertIsNone(factory._object_factory._modules)
+        # Classes which are not defined in the module of the same name
+        self.assertIsNotNone(factory.create({'type': 'LoadAvg'}))
+        self.assertIsNotNone(factory.create({'type': 'AsyncDummy'}))
@@ -0,0 +1,98 @@
+import os
+from unittest import TestCase
+
+from pollect.core.Core import Configuration
+from pollect.core.Factories import SourceFactory
+from pollect.core.ProcessIsolation import IsolatedSource
+from pollect.core.ValueSet import ValueSet, Value
+
+
+class TestProcessIsolation(TestCase):
+    def test_serialize(self):
+        value_set = ValueSet(labels=['a', 'b'])
+        value_set.name = 'test'
+        value_set.time = 123
+        value_set.start_ms = 122500
+        value_set.end_ms = 123250
+        value_set.add(Value(1.5, label_values=['x', 'y'], name='first'))
+        value_set.add(Value(2, label_values=['z', 'w']))
+
+        restored = ValueSet.deserialize(value_set.serialize())
+        self.assertEqual('test', restored.name)
+        self.assertEqual(123, restored.time)
+        self.assertEqual(122500, restored.start_ms)
+        self.assertEqual(123250, restored.end_ms)
+        self.assertEqual(['a', 'b'], restored.labels)
+        self.assertEqual(2, len(restored.values))
+        self.assertEqual(1.5, restored.values[0].value)
+        self.assertEqual('first', restored.values[0].name)
+        self.assertEqual(('x', 'y'), restored.values[0].label_values)
+        self.assertIsNone(restored.values[1].name)
+
+    def test_probe(self):
+        config = Configuration({})
+        source = SourceFactory(config).create({'type': 'Dummy', 'value': 5, 'labels': {'host': 'a'},
+                                               'isolation': 'process'})
+        try:
+            self.assertIsInstance(source, IsolatedSource)
+            self.assertNotEqual(os.getpid(), source._process.pid)
+            for _ in range(2):
+                results = source.probe()
+                self.assertEqual(1, len(results))
+                self.assertEqual('Dummy', results[0].name)
+                self.assertEqual(['host'], results[0].labels)
+                self.assertEqual(5, results[0].values[0].value)
+                self.assertEqual(('a',), results[0].values[0].label_values)
+        finally:
+            source.shutdown()
+        self.assertIsNone(source._process)
+
+    def test_timeout(self):
+        config = Configuration({})
+        source = SourceFactory(config).create({'type': 'Dummy', 'value': 5, 'sleep': 10, 'probeTimeout': 0.5},
+                                              'process')
+        try:
+            first_pid = source._process.pid
+            with self.assertRaises(TimeoutError):
+                source.probe()
+            # The hanging worker has been terminated
+            self.assertIsNone(source._process)
+            source._source_config['sleep'] = 0
+            self.assertEqual(5, source.probe()[0].values[0].value)
+            self.assertNotEqual(first_pid, source._process.pid)
+        finally:
+            source.shutdown()
+
+    def test_setup_failure(self):
+        config = Configuration({})
+        with self.assertRaises(RuntimeError):
+            # Missing the required host of the source
+            SourceFactory(config).create({'type': 'SmaEnergyMeter'}, 'process')
+
+    def test_executor(self):
+        raw_config = {
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "pollect",
+                    "isolation": "process",
+                    "sources": [
+                        {"type": "Dummy", "value": 1},
+                        {"type": "Dummy", "value": 2, "isolation": "thread"},
+                    ]
+                }
+            ]
+        }
+        config = Configuration(raw_config)
+        executor = config.create_executors()[0]
+        try:
+            self.assertIsInstance(executor._sources[0], IsolatedSource)
+            self.assertNotIsInstance(executor._sources[1], IsolatedSource)
+            executor.execute()
+        finally:
+            executor.shutdown()
+        data = config.writers[0].data[0]
+        self.assertEqual(['pollect.Dummy', 'pollect.Dummy'], [value_set.name for value_set in data])
+        self.assertEqual([1, 2], [value_set.values[0].value for value_set in data])
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from pollect.core.Profiler import Profiler, Activity
+
+
+class TestProfiler(TestCase):
+    def test_activity(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            profiler = Profiler(output_dir, sample_rate=1000)
+            started = threading.Event()
+            release = threading.Event()
+
+            def probe():
+                with Activity('source:test/Dummy'):
+                    started.set()
+                    release.wait(5)
+
+            thread = threading.Thread(target=probe, name='probe-thread')
+            profiler.start()
+            try:
+                thread.start()
+                started.wait(1)
+                profiler.sample()
+            finally:
+                release.set()
+                thread.join()
+                profiler.stop()
+
+            files = os.listdir(output_dir)
+            self.assertEqual(1, len(files))
+            with open(os.path.join(output_dir, files[0])) as f:
+                lines = f.read().splitlines()
+
+            stacks = [line.rsplit(' ', 1)[0] for line in lines]
+            probe_stacks = [stack for stack in stacks if stack.startswith('source:test/Dummy;')]
+            self.assertGreater(len(probe_stacks), 0)
+            self.assertIn('test_Profiler:probe', probe_stacks[0])
+            self.assertTrue(all(int(line.rsplit(' ', 1)[1]) > 0 for line in lines))
+
+    def test_inactive(self):
+        with Activity('source:test/Dummy') as activity:
+            self.assertIsNone(activity._ident)
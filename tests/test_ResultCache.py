@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from pollect.core.ResultCache import ResultCache
+from tests.helpers import FakeClock, labelled_values
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResultCache('test', 10, 0.5, self.clock)
+
+    def test_copies(self):
+        self.assertIsNone(self.cache.get())
+        self.cache.put(labelled_values('Dummy', a=1))
+        first = self.cache.get()
+        first[0].name = 'changed'
+        first[0].values[0].label_values = ['a', 'b']
+        second = self.cache.get()
+        self.assertEqual('Dummy', second[0].name)
+        self.assertEqual(('a',), second[0].values[0].label_values)
+
+    def test_refresh_ahead(self):
+        self.cache.put(labelled_values('Dummy', a=1))
+        self.clock.now += 4
+        self.assertFalse(self.cache.start_refresh())
+        self.clock.now += 1
+        self.assertTrue(self.cache.start_refresh())
+        # Only a single refresh at a time
+        self.assertFalse(self.cache.start_refresh())
+        self.cache.put(labelled_values('Dummy', a=2))
+        self.assertFalse(self.cache.start_refresh())
+        self.assertEqual(2, self.cache.get()[0].values[0].value)
+
+    def test_refresh_failed(self):
+        self.cache.put(labelled_values('Dummy', a=1))
+        self.clock.now += 6
+        self.assertTrue(self.cache.start_refresh())
+        self.cache.refresh_failed()
+        self.assertEqual(1, self.cache.failures)
+        # The stale results are still served and the refresh is retried
+        self.assertEqual(1, self.cache.get()[0].values[0].value)
+        self.assertTrue(self.cache.start_refresh())
+
+    def test_expired(self):
+        self.cache.put(labelled_values('Dummy', a=1))
+        self.clock.now += 10
+        self.assertIsNone(self.cache.get())
+        self.assertFalse(self.cache.start_refresh())
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ResultCache('test', 0, 0.5)
+        with self.assertRaises(ValueError):
+            ResultCache('test', 10, 1.5)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from pollect.core.SeriesRegistry import SeriesRegistry
+from pollect.core.ValueCache import ValueCache
+from pollect.core.ValueSet import ValueSet, Value, ColumnarValueSet
+
+
+class TestSeriesRegistry(TestCase):
+    def test_get_id(self):
+        registry = SeriesRegistry()
+        first = registry.get_id('set', 'a', ('type',), ('bc',))
+        self.assertEqual(first, registry.get_id('set', 'a', ('type',), ('b' + 'c',)))
+        # Name and label values aren't concatenated, so they can't collide
+        self.assertNotEqual(first, registry.get_id('set', 'ab', ('type',), ('c',)))
+        self.assertNotEqual(first, registry.get_id('set', 'a', ('kind',), ('bc',)))
+        self.assertEqual(('set', 'a', ('type',), ('bc',)), registry.get(first))
+        self.assertEqual(3, len(registry))
+
+    def test_release(self):
+        registry = SeriesRegistry()
+        first = registry.get_id('set', 'a', (), ())
+        second = registry.get_id('set', 'b', (), ())
+        registry.release([first, 100])
+        self.assertEqual(1, len(registry))
+        self.assertEqual(second, registry.get_id('set', 'b', (), ()))
+        # Released IDs aren't reused
+        self.assertNotIn(registry.get_id('set', 'a', (), ()), [first, second])
+
+    def test_rows(self):
+        registry = SeriesRegistry()
+        value_set = ValueSet(['type'])
+        value_set.name = 'set'
+        value_set.add(Value(1, ['a'], 'first'))
+        value_set.add(Value(2, ['b']))
+
+        columnar = ColumnarValueSet(['type'])
+        columnar.name = 'set'
+        columnar.append(1, ['a'], 'first')
+        columnar.append(2, ['b'])
+
+        rows = list(registry.rows(value_set))
+        self.assertEqual([(0, 'first', ('a',), 1), (1, None, ('b',), 2)], rows)
+        # Both representations resolve to the same series
+        self.assertEqual([0, 1], [row[0] for row in registry.rows(columnar)])
+        self.assertEqual(2, len(registry))
+
+    def test_value_cache(self):
+        cache = ValueCache()
+        cache.add(Value(1, ['bc'], 'a'), average=True)
+        cache.add(Value(3, ['c'], 'ab'), average=True)
+        cache.add(Value(5, ['bc'], 'a'), average=True)
+        values = cache.flush_values()
+        self.assertEqual([3, 3], [value.value for value in values])
+        self.assertEqual(['a', 'ab'], [value.name for value in values])
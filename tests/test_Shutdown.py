@@ -0,0 +1,86 @@
+import threading
+import time
+from unittest import TestCase
+
+from pollect.core.Core import Configuration
+from pollect.core.Shutdown import Shutdown
+from pollect.writers.Writer import InMemoryWriter
+
+
+class SlowWriter(InMemoryWriter):
+    def __init__(self, config, delay: float = 0):
+        super().__init__(config)
+        self.delay = delay
+        self.calls = []
+
+    def flush(self):
+        self.calls.append('flush')
+
+    def stop(self):
+        time.sleep(self.delay)
+        self.calls.append('stop')
+
+
+class TestShutdown(TestCase):
+    def test_concurrent(self):
+        stopped = []
+        barrier = threading.Barrier(3, timeout=5)
+
+        def stop(name: str):
+            # Only completes if all components are stopped at the same time
+            barrier.wait()
+            stopped.append(name)
+
+        shutdown = Shutdown('test', time.monotonic() + 5)
+        for name in ['a', 'b', 'c']:
+            shutdown.add(name, lambda item=name: stop(item))
+        self.assertEqual([], shutdown.run())
+        self.assertEqual(['a', 'b', 'c'], sorted(stopped))
+
+    def test_timeout(self):
+        release = threading.Event()
+        shutdown = Shutdown('test', time.monotonic() + 5, timeout=0.2)
+        shutdown.add('fast', lambda: None)
+        shutdown.add('slow', lambda: release.wait(5))
+        shutdown.add('failing', lambda: 1 / 0)
+        start = time.monotonic()
+        self.assertEqual(['slow'], shutdown.run())
+        self.assertLess(time.monotonic() - start, 1)
+        release.set()
+
+    def test_deadline(self):
+        release = threading.Event()
+        shutdown = Shutdown('test', time.monotonic() + 0.2, timeout=5)
+        shutdown.add('slow', lambda: release.wait(5))
+        self.assertEqual(['slow'], shutdown.run())
+        release.set()
+
+    def test_stop_writers(self):
+        writer = SlowWriter({})
+        slow_writer = SlowWriter({'slow': True}, delay=5)
+        pending = Shutdown.stop_writers([writer, slow_writer, writer], time.monotonic() + 5, timeout=0.2)
+        self.assertEqual(['SlowWriter'], pending)
+        # Writers are flushed before they are stopped, and only once
+        self.assertEqual(['flush', 'stop'], writer.calls)
+        self.assertEqual(['flush'], slow_writer.calls)
+
+    def test_executor(self):
+        config = Configuration({
+            'tickTime': 10,
+            'stopTimeout': 0.2,
+            'writer': {'type': 'InMemory'},
+            'executors': [{
+                'collection': 'pollect',
+                'sources': [{'type': 'Dummy', 'name': f's{idx}', 'value': 1} for idx in range(3)]
+            }]
+        })
+        executor = config.create_executors()[0]
+        release = threading.Event()
+        for source in executor._sources:
+            source.shutdown = lambda: release.wait(5)
+
+        start = time.monotonic()
+        executor.shutdown()
+        # The sources are stopped concurrently and abandoned after the stop timeout
+        self.assertLess(time.monotonic() - start, 1)
+        release.set()
@@ -0,0 +1,93 @@
+import threading
+import time
+from unittest import TestCase
+
+from pollect.core.Supervisor import Supervisor, get_shard
+
+
+class TestSupervisor(TestCase):
+    def test_shard(self):
+        self.assertEqual(get_shard('a', 4), get_shard('a', 4))
+        shards = set(get_shard(f'collection{x}', 4) for x in range(100))
+        self.assertEqual({0, 1, 2, 3}, shards)
+
+    def _run(self, writer_type: str, check) -> Supervisor:
+        raw_config = {
+            "tickTime": 0.5,
+            "writer": {
+                "type": writer_type
+            },
+            "executors": [
+                {
+                    "collection": name,
+                    "sources": [
+                        {"type": "Dummy", "value": x},
+                        {"type": "Dummy", "value": x * 10},
+                    ]
+                } for x, name in enumerate(['a', 'b', 'c', 'd'])
+            ]
+        }
+        supervisor = Supervisor(raw_config, 2)
+        supervisor.create()
+        thread = threading.Thread(target=supervisor.run)
+        thread.start()
+        writer = supervisor.config.writers[0]
+        try:
+            deadline = time.monotonic() + 30
+            while not check(writer) and time.monotonic() < deadline:
+                time.sleep(0.1)
+        finally:
+            supervisor.stop()
+            thread.join(15)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(check(writer))
+        return supervisor
+
+    def test_run(self):
+        def check(writer) -> bool:
+            names = set(value_set.name for data in list(writer.data) for value_set in data)
+            return names == {'a.Dummy', 'b.Dummy', 'c.Dummy', 'd.Dummy'}
+
+        supervisor = self._run('InMemory', check)
+        self.assertEqual([[0, 1, 2], [3]], sorted(worker.executor_indices for worker in supervisor._workers))
+        for data in supervisor.config.writers[0].data:
+            # Each write contains the complete result of one executor
+            self.assertEqual(2, len(data))
+            self.assertEqual(data[0].values[0].value * 10, data[1].values[0].value)
+
+    def test_crash_backoff(self):
+        raw_config = {
+            "writer": {
+                "type": "InMemory"
+            },
+            "executors": [
+                {
+                    "collection": "broken",
+                    "sources": [{"type": "DoesNotExist"}]
+                }
+            ]
+        }
+        supervisor = Supervisor(raw_config, 1)
+        supervisor.restart_backoff = 0.1
+        supervisor.max_restarts = 2
+        supervisor.create()
+        thread = threading.Thread(target=supervisor.run)
+        thread.start()
+        worker = supervisor._workers[0]
+        try:
+            deadline = time.monotonic() + 60
+            while not worker.failed and time.monotonic() < deadline:
+                time.sleep(0.1)
+        finally:
+            supervisor.stop()
+            thread.join(15)
+        # The worker fails at startup, it's restarted with backoff until the supervisor gives up
+        self.assertTrue(worker.failed)
+        self.assertEqual(3, worker.crashes)
+
+    def test_partial(self):
+        def check(writer) -> bool:
+            values = set(data[0].values[0].value for data in list(writer.data))
+            return values == {0, 1, 2, 3, 10, 20, 30}
+
+        self._run('ParallelInMemory', check)
@@ -0,0 +1,83 @@
+from typing import Dict, Tuple
+from unittest import TestCase
+
+from pollect.core.Core import Configuration
+from pollect.core.Telemetry import Histogram, Telemetry, telemetry
+from pollect.writers.Writer import ParallelInMemoryWriter
+
+
+class TestHistogram(TestCase):
+    def test_cumulative(self):
+        histogram = Histogram((1, 5))
+        for value in [0.5, 1, 2, 10]:
+            histogram.observe(value)
+        self.assertEqual([('1', 2), ('5', 3), ('+Inf', 4)], histogram.cumulative())
+        self.assertEqual(4, histogram.count)
+        self.assertEqual(13.5, histogram.sum)
+
+
+class TestTelemetry(TestCase):
+    def test_disabled(self):
+        instance = Telemetry()
+        instance.record_probe('a', 'Dummy', 0.1, 1)
+        instance.record_write('InMemoryWriter', 0.1)
+        self.assertEqual([], instance.collect())
+
+    def test_collect(self):
+        instance = Telemetry()
+        instance.enable()
+        instance.record_probe('a', 'Dummy', 0.1, 3)
+        instance.record_probe('a', 'Dummy', 0.2, 0, failed=True)
+        instance.record_timeout('a', 'Dummy')
+        instance.record_write('InMemoryWriter', 0.01)
+
+        values = self._get_values(instance)
+        self.assertEqual(2, values['probe_duration_seconds_count', ('a', 'Dummy')])
+        self.assertEqual(1, values['probe_duration_seconds_bucket', ('a', 'Dummy', '0.1')])
+        self.assertEqual(2, values['probe_duration_seconds_bucket', ('a', 'Dummy', '+Inf')])
+        self.assertEqual(3, values['probe_values', ('a', 'Dummy')])
+        self.assertEqual(1, values['probe_errors', ('a', 'Dummy')])
+        self.assertEqual(1, values['probe_timeouts', ('a', 'Dummy')])
+        self.assertEqual(1, values['write_duration_seconds_count', ('InMemoryWriter',)])
+        self.assertEqual(0, values['write_errors', ('InMemoryWriter',)])
+
+    def test_source(self):
+        telemetry.reset()
+        config = Configuration({
+            'tickTime': 1,
+            'writer': {'type': 'ParallelInMemory'},
+            'executors': [{
+                'collection': 'pollect',
+                'sources': [
+                    {'type': 'Dummy', 'value': 1},
+                    {'type': 'Telemetry'},
+                ]
+            }]
+        })
+        try:
+            executor = config.create_executors()[0]
+            self.assertTrue(telemetry.enabled)
+            for _ in range(2):
+                executor.execute()
+                # Partial writes happen in the worker pool
+                for future in executor._running.values():
+                    future.result(5)
+            writer = config.writers[0]
+            self.assertIsInstance(writer, ParallelInMemoryWriter)
+
+            # The second tick contains the probe of the first one
+            names = set(value.name for data in writer.data for value_set in data for value in value_set.values)
+            self.assertIn('probe_duration_seconds_bucket', names)
+            self.assertIn('write_duration_seconds_count', names)
+            executor.shutdown()
+        finally:
+            telemetry.enabled = False
+            telemetry.reset()
+
+    @staticmethod
+    def _get_values(instance: Telemetry) -> Dict[Tuple[str, Tuple[str, ...]], float]:
+        values = {}
+        for value_set in instance.collect():
+            for value in value_set.values:
+                values[value.name, tuple(value.label_values)] = value.value
+        return values
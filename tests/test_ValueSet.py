@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from pollect.core.ValueSet import ValueSet, Value, intern_labels
+
+
+class TestValueSet(TestCase):
+    def test_interned_labels(self):
+        first = Value(1, ['eth0', 'rx'])
+        second = Value(2, ('eth' + '0', 'rx'))
+        self.assertEqual(('eth0', 'rx'), first.label_values)
+        # Values with the same labels share a single tuple
+        self.assertIs(first.label_values, second.label_values)
+        self.assertIs(intern_labels(None), Value(3).label_values)
+
+    def test_assign_labels(self):
+        value = Value(1, ['a'])
+        with self.assertRaises(AttributeError):
+            value.label_values.append('b')
+        value.label_values = ['a', 'b']
+        self.assertEqual(('a', 'b'), value.label_values)
+
+    def test_slots(self):
+        value_set = ValueSet(['type'])
+        value = Value(1, ['a'])
+        with self.assertRaises(AttributeError):
+            value.unknown = 1
+        with self.assertRaises(AttributeError):
+            value_set.unknown = 1
+        self.assertEqual(0, value_set.time)
+        self.assertEqual('', value_set.name)
+
+    def test_static_labels(self):
+        value_set = ValueSet(['type'])
+        value_set.add(Value(1, ['a']))
+        # Sources may return the same set in every probe, the static labels are replaced instead of added
+        for host in ['h1', 'h2']:
+            value_set.set_static_labels(['host'], [host])
+        self.assertEqual(['type', 'host'], value_set.get_labels())
+        self.assertEqual([(None, ('a', 'h2'), 1)], list(value_set.rows()))
+        self.assertEqual(['type'], value_set.labels)
+        self.assertIs(intern_labels(['a']), value_set.values[0].label_values)
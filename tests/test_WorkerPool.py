@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import List
+from unittest import TestCase
+
+from pollect.core.WorkerPool import WorkerPool
+
+
+class TestWorkerPool(TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.order: List[str] = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def _blocking_task(self, name: str):
+        self.started.set()
+        self.release.wait(5)
+        with self.lock:
+            self.order.append(name)
+
+    def _task(self, name: str):
+        with self.lock:
+            self.order.append(name)
+
+    def test_result(self):
+        pool = WorkerPool(2)
+        queue = pool.create_queue('a', 1)
+        self.assertEqual(3, queue.submit(lambda x: x + 1, 2).result(1))
+        with self.assertRaises(ValueError):
+            queue.submit(int, 'abc').result(1)
+
+    def test_quota(self):
+        pool = WorkerPool(10)
+        queue = pool.create_queue('a', 2)
+        running = 0
+        max_running = 0
+
+        def task():
+            nonlocal running, max_running
+            with self.lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.05)
+            with self.lock:
+                running -= 1
+
+        futures = [queue.submit(task) for _ in range(6)]
+        for future in futures:
+            future.result(2)
+        self.assertEqual(2, max_running)
+        self.assertLessEqual(pool.workers, 2)
+
+    def test_fairness(self):
+        pool = WorkerPool(1)
+        queue_a = pool.create_queue('a', 1)
+        queue_b = pool.create_queue('b', 1)
+        futures = [queue_a.submit(self._blocking_task, 'a0')]
+        self.started.wait(1)
+        futures.extend(queue_a.submit(self._task, f'a{x}') for x in range(1, 3))
+        futures.extend(queue_b.submit(self._task, f'b{x}') for x in range(2))
+        self.release.set()
+        for future in futures:
+            future.result(2)
+        # The queues are served alternating even though a submitted more work first
+        self.assertEqual(['a0', 'b0', 'a1', 'b1', 'a2'], self.order)
+
+    def test_priority(self):
+        pool = WorkerPool(1)
+        low = pool.create_queue('low', 1)
+        high = pool.create_queue('high', 1, priority=10)
+        futures = [low.submit(self._blocking_task, 'low0')]
+        self.started.wait(1)
+        futures.append(low.submit(self._task, 'low1'))
+        futures.extend(high.submit(self._task, f'high{x}') for x in range(2))
+        self.release.set()
+        for future in futures:
+            future.result(2)
+        self.assertEqual(['low0', 'high0', 'high1', 'low1'], self.order)
+
+    def test_idle_workers_terminate(self):
+        pool = WorkerPool(4, idle_timeout=0.1)
+        queue = pool.create_queue('a', 4)
+        futures = [queue.submit(time.sleep, 0.05) for _ in range(4)]
+        for future in futures:
+            future.result(2)
+        self.assertEqual(4, pool.workers)
+        time.sleep(0.5)
+        self.assertEqual(0, pool.workers)
+
+    def test_shutdown(self):
+        pool = WorkerPool(1)
+        queue = pool.create_queue('a', 1)
+        running = queue.submit(self._blocking_task, 'a0')
+        self.started.wait(1)
+        queued = queue.submit(self._task, 'a1')
+        threading.Timer(0.1, self.release.set).start()
+        queue.shutdown(wait=True, cancel_futures=True)
+        self.assertTrue(running.done())
+        self.assertTrue(queued.cancelled())
+        with self.assertRaises(RuntimeError):
+            queue.submit(self._task, 'a2')
@@ -0,0 +1,50 @@
+import threading
+from typing import List
+from unittest import TestCase
+
+from pollect.core.WriteBatcher import WriteBatcher
+from pollect.writers.Writer import Batch
+from tests.helpers import single_value
+
+
+class TestWriteBatcher(TestCase):
+    def setUp(self):
+        self.batches: List[Batch] = []
+        self.written = threading.Event()
+
+    def _write(self, batch: Batch):
+        self.batches.append(batch)
+        self.written.set()
+
+    def test_coalesce(self):
+        batcher = WriteBatcher('test', 0.2, self._write)
+        batcher.add(single_value(1), 'a')
+        batcher.add(single_value(2), 'b')
+        # Only the latest result of a source is written
+        batcher.add(single_value(3), 'a')
+        self.assertTrue(self.written.wait(5))
+        batcher.stop(5)
+
+        self.assertEqual(1, len(self.batches))
+        self.assertEqual(['b', 'a'], [source for _, source in self.batches[0]])
+        self.assertEqual([2, 3], [data[0].values[0].value for data, _ in self.batches[0]])
+        self.assertEqual(1, batcher.batches)
+
+    def test_flush(self):
+        batcher = WriteBatcher('test', 60, self._write)
+        batcher.add(single_value(1), 'a')
+        self.assertTrue(batcher.flush(5))
+        self.assertEqual(1, len(self.batches))
+
+        batcher.add(single_value(2), 'a')
+        batcher.stop(5)
+        self.assertEqual(2, len(self.batches))
+
+        # Results are written directly after the batcher stopped
+        batcher.add(single_value(3), 'a')
+        self.assertEqual(3, len(self.batches))
+        self.assertEqual([('a',)], [tuple(source for _, source in batch) for batch in self.batches[2:]])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            WriteBatcher('test', 0, self._write)
@@ -0,0 +1,138 @@
+import threading
+from unittest import TestCase
+
+from pollect.core.ChangeFilter import Changes, ChangeFilter
+from pollect.core.Factories import WriterFactory
+from pollect.core.Telemetry import Telemetry
+from pollect.core.WriterQueue import QueuedWriter
+from pollect.core.config.ConfigContainer import ConfigContainer
+from pollect.writers.Writer import InMemoryWriter, ParallelInMemoryWriter, Batch
+from tests.helpers import single_value
+
+
+class BlockingWriter(InMemoryWriter):
+    """
+    Writer which waits until it's released
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.release = threading.Event()
+        self.entered = threading.Event()
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def write_batch(self, batch: Batch):
+        self.entered.set()
+        self.release.wait(5)
+        super().write_batch(batch)
+
+
+class TestQueuedWriter(TestCase):
+    def test_write(self):
+        writer = QueuedWriter(InMemoryWriter({}), 10)
+        writer.start()
+        for idx in range(3):
+            writer.write(single_value(idx))
+        self.assertTrue(writer.flush(5))
+        writer.stop()
+        self.assertEqual([0, 1, 2], [data[0].values[0].value for data in writer.writer.data])
+
+    def test_drop_oldest(self):
+        inner = BlockingWriter({})
+        writer = QueuedWriter(inner, 2)
+        writer.start()
+        writer.write(single_value(0))
+        # The first write is in progress, the queue is empty again
+        self.assertTrue(inner.entered.wait(5))
+        for idx in range(1, 5):
+            writer.write(single_value(idx))
+        self.assertEqual(2, writer.pending)
+        self.assertEqual(2, writer.dropped)
+        self.assertGreater(writer.oldest_age, 0)
+
+        inner.release.set()
+        writer.stop()
+        self.assertTrue(inner.stopped)
+        self.assertEqual([0, 3, 4], [data[0].values[0].value for data in inner.data])
+
+    def test_block(self):
+        inner = BlockingWriter({})
+        writer = QueuedWriter(inner, 1, QueuedWriter.BLOCK)
+        writer.start()
+        writer.write(single_value(0))
+        self.assertTrue(inner.entered.wait(5))
+        writer.write(single_value(1))
+
+        done = threading.Event()
+
+        def write():
+            writer.write(single_value(2))
+            done.set()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.assertFalse(done.wait(0.2))
+        inner.release.set()
+        self.assertTrue(done.wait(5))
+        thread.join()
+        writer.stop()
+        self.assertEqual(0, writer.dropped)
+        self.assertEqual([0, 1, 2], [data[0].values[0].value for data in inner.data])
+
+    def test_write_changes(self):
+        writer = QueuedWriter(InMemoryWriter({}), 10)
+        writer.start()
+        writer.write_changes([(Changes(single_value(1), [], [5]), None)])
+        writer.write(single_value(2))
+        self.assertTrue(writer.flush(5))
+        writer.stop()
+        # Both kinds of writes are kept in order
+        self.assertEqual([1, 2], [data[0].values[0].value for data in writer.writer.data])
+
+    def test_reset_changes(self):
+        inner = BlockingWriter({})
+        writer = QueuedWriter(inner, 1)
+        writer.start()
+        writer.write(single_value(0))
+        self.assertTrue(inner.entered.wait(5))
+        change_filter = ChangeFilter('test', {})
+        writer.write_changes(change_filter.apply_batch([(single_value(1), None)]))
+        # The value didn't change, but the queued changes are dropped
+        writer.write_changes(change_filter.apply_batch([(single_value(1), None)]))
+        self.assertEqual(1, writer.dropped)
+        # So they are written again with the next data
+        writer.write_changes(change_filter.apply_batch([(single_value(1), None)]))
+        self.assertEqual(2, writer.dropped)
+        inner.release.set()
+        writer.stop()
+        self.assertEqual([0, 1], [data[0].values[0].value for data in inner.data])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            QueuedWriter(InMemoryWriter({}), 0)
+        with self.assertRaises(ValueError):
+            QueuedWriter(InMemoryWriter({}), 1, 'drop-newest')
+
+    def test_factory(self):
+        factory = WriterFactory()
+        config = ConfigContainer({'type': 'ParallelInMemory', 'queueSize': 5})
+        writer = factory.create(config)
+        self.assertIsInstance(writer, QueuedWriter)
+        self.assertIsInstance(writer.writer, ParallelInMemoryWriter)
+        self.assertTrue(writer.supports_partial_write())
+        # The same configuration returns the same queue
+        self.assertIs(writer, factory.create(ConfigContainer({'type': 'ParallelInMemory', 'queueSize': 5})))
+        writer.stop()
+
+    def test_telemetry(self):
+        instance = Telemetry()
+        writer = QueuedWriter(InMemoryWriter({}), 10)
+        instance.register_writer_queue(writer)
+        names = set(value.name for value_set in instance.collect() for value in value_set.values)
+        self.assertIn('write_queue_lag_seconds', names)
+        self.assertIn('write_queue_dropped', names)
+        instance.unregister_writer_queue(writer)
+        self.assertEqual([], instance.collect())
@@ -2,7 +2,7 @@ from unittest import TestCase
 
 import requests
 
-from pollect.core.ValueSet import ValueSet, Value
+from pollect.core.ValueSet import ValueSet, Value, ColumnarValueSet
 
 from pollect.writers.PrometheusWriter import PrometheusWriter
 
@@ -99,6 +99,14 @@ class TestPrometheusWriter(TestCase):
         self.assertIn('test{a="1"} 0.0', reply.text)
         self.assertNotIn('test2{a="1"} 0.0', reply.text)
 
+    def test_removal_releases_series(self):
+        for x in range(3):
+            value_set = ValueSet(labels=['a'])
+            value_set.values.append(Value(0, name='test', label_values=[str(x)]))
+            self.writer.write([value_set], 1)
+        # Only the current series is kept
+        self.assertEqual(1, len(self.writer._cache.get_series(1)))
+
     def test_removal_partial_write(self):
         value_set = ValueSet()
         value_set.values.append(Value(0, name='test1'))
@@ -116,3 +124,76 @@ class TestPrometheusWriter(TestCase):
         reply = requests.get('http://localhost:9123')
         self.assertNotIn('test1 0.0', reply.text)
         self.assertIn('test2 0.0', reply.text)
+
+    def test_timestamps(self):
+        writer = PrometheusWriter({'port': 9124, 'timestamps': True})
+        writer.start()
+        try:
+            value_set = ValueSet(labels=['a'])
+            value_set.end_ms = 1700000000123
+            value_set.values.append(Value(1, name='stamped', label_values=['1']))
+            no_time = ValueSet()
+            no_time.values.append(Value(2, name='unstamped'))
+            writer.write([value_set, no_time])
+
+            reply = requests.get('http://localhost:9124')
+            self.assertIn('stamped{a="1"} 1.0 1700000000123', reply.text)
+            self.assertIn('unstamped 2.0\n', reply.text)
+        finally:
+            writer.stop()
+
+    def test_columnar(self):
+        value_set = ColumnarValueSet(labels=['a'])
+        value_set.name = 'columnar'
+        value_set.append(1, ['1'], 'test')
+        value_set.append(2, ['2'], 'test')
+        value_set.append(3, ['1'], 'other')
+        self.writer.write([value_set], 'columnar')
+
+        reply = requests.get('http://localhost:9123')
+        self.assertIn('columnar_test{a="1"} 1.0', reply.text)
+        self.assertIn('columnar_test{a="2"} 2.0', reply.text)
+        self.assertIn('columnar_other{a="1"} 3.0', reply.text)
+
+        # Series which are missing in the next write are removed
+        value_set = ColumnarValueSet(labels=['a'])
+        value_set.name = 'columnar'
+        value_set.append(4, ['2'], 'test')
+        self.writer.write([value_set], 'columnar')
+        reply = requests.get('http://localhost:9123')
+        self.assertNotIn('columnar_test{a="1"}', reply.text)
+        self.assertIn('columnar_test{a="2"} 4.0', reply.text)
+        self.assertNotIn('columnar_other{a="1"}', reply.text)
+
+    def test_write_batch(self):
+        value_set_a = ValueSet()
+        value_set_a.values.append(Value(0, name='test1'))
+        value_set_b = ValueSet()
+        value_set_b.values.append(Value(0, name='test2'))
+        self.writer.write_batch([([value_set_a], 1), ([value_set_b], 2)])
+
+        reply = requests.get('http://localhost:9123')
+        self.assertIn('test1 0.0', reply.text)
+        self.assertIn('test2 0.0', reply.text)
+
+        # The sources of the batch are still tracked separately
+        value_set_b.values[0].value = 1
+        self.writer.write_batch([([], 1), ([value_set_b], 2)])
+        reply = requests.get('http://localhost:9123')
+        self.assertNotIn('test1 0.0', reply.text)
+        self.assertIn('test2 1.0', reply.text)
+
+    def test_write_batch_error(self):
+        value_set_a = ValueSet()
+        value_set_a.values.append(Value(0, name='test1'))
+        value_set_b = ValueSet()
+        value_set_b.values.append(Value(0, name='test2'))
+        self.writer.write_batch([([value_set_a], 1), ([value_set_b], 2)])
+
+        # The invalid value only skips the first source
+        value_set_a.values[0].value = 'invalid'
+        value_set_b.values[0].value = 1
+        self.writer.write_batch([([value_set_a], 1), ([value_set_b], 2)])
+        reply = requests.get('http://localhost:9123')
+        self.assertIn('test1 0.0', reply.text)
+        self.assertIn('test2 1.0', reply.text)